@@ -0,0 +1,27 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Scale benchmarks of the plugin views.
+
+The views are requested through the Django test client of a configured
+Horizon, with the service catalog of the user pointing at a local HTTP
+stand-in for Neutron (with the Contrail IPAM and policy extensions and
+LBaaS v2), Nova and Keystone. The stand-in serves a synthetic cloud built
+by a seeded generator, so runs are repeatable.
+
+Run from an environment where Horizon and this plugin are installed and
+configured (see README.md)::
+
+    python -m contrail_openstack_dashboard.benchmarks.run --scale large
+
+Latency percentiles and the peak RSS of every scenario are reported and
+compared against a stored baseline, see run.py for the options.
+"""
@@ -0,0 +1,362 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Seeded generator of a synthetic tenant.
+
+Resources are plain dicts in the format of the respective APIs. Everything
+but the external network and the other projects belongs to the benchmark
+project, which is the project the scenarios run in.
+"""
+
+import random
+import uuid
+
+DOMAIN = 'default-domain'
+ACTIONS = ('pass', 'deny')
+PROTOCOLS = ('any', 'tcp', 'udp', 'icmp')
+DIRECTIONS = ('<>', '>')
+
+SCALES = {
+    'small': {'networks': 50, 'ports': 200, 'servers': 50, 'routers': 5,
+              'policies': 10, 'ipams': 5, 'loadbalancers': 5,
+              'projects': 20},
+    'medium': {'networks': 500, 'ports': 2000, 'servers': 500,
+               'routers': 50, 'policies': 100, 'ipams': 20,
+               'loadbalancers': 50, 'projects': 1000},
+    'large': {'networks': 5000, 'ports': 20000, 'servers': 5000,
+              'routers': 500, 'policies': 1000, 'ipams': 50,
+              'loadbalancers': 500, 'projects': 10000},
+}
+
+
+class Dataset(object):
+    """A generated cloud, one list of resources per collection."""
+
+    def __init__(self, project_id, project_name):
+        self.project_id = project_id
+        self.project_name = project_name
+        self.collections = dict((name, []) for name in (
+            'networks', 'subnets', 'ports', 'routers', 'ipams', 'policys',
+            'loadbalancers', 'listeners', 'pools', 'members',
+            'healthmonitors', 'servers', 'projects'))
+
+    def __getitem__(self, collection):
+        return self.collections[collection]
+
+    def sort(self):
+        # Neutron pages in id order
+        for items in self.collections.values():
+            items.sort(key=lambda item: item['id'])
+
+
+class Generator(object):
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128)))
+
+    def fq_name(self, project_name, name):
+        return [DOMAIN, project_name, name]
+
+    def generate(self, scale):
+        counts = SCALES[scale] if not isinstance(scale, dict) else scale
+        data = Dataset(self.uuid(), 'bench')
+        self._projects(data, counts['projects'])
+        external = self._external_network(data)
+        networks = [self._network(data, i)
+                    for i in range(counts['networks'])]
+        routers = [self._router(data, i, external, networks)
+                   for i in range(counts['routers'])]
+        servers = [self._server(data, i)
+                   for i in range(counts['servers'])]
+        self._ports(data, counts['ports'], networks, routers, servers)
+        for i in range(counts['policies']):
+            self._policy(data, i, networks)
+        for i in range(counts['ipams']):
+            self._ipam(data, i)
+        for i in range(counts['loadbalancers']):
+            self._loadbalancer(data, i, networks)
+        data.sort()
+        return data
+
+    def _projects(self, data, count):
+        data['projects'].append({'id': data.project_id,
+                                 'name': data.project_name,
+                                 'enabled': True,
+                                 'description': '',
+                                 'domain_id': 'default'})
+        for i in range(count - 1):
+            data['projects'].append({'id': self.uuid(),
+                                     'name': 'project-%05d' % i,
+                                     'enabled': True,
+                                     'description': '',
+                                     'domain_id': 'default'})
+
+    def _subnet(self, data, network, cidr_prefix, tenant_id):
+        subnet = {'id': self.uuid(),
+                  'name': '%s-subnet' % network['name'],
+                  'network_id': network['id'],
+                  'tenant_id': tenant_id,
+                  'ip_version': 4,
+                  'cidr': '%s.0/24' % cidr_prefix,
+                  'gateway_ip': '%s.1' % cidr_prefix,
+                  'allocation_pools': [{'start': '%s.2' % cidr_prefix,
+                                        'end': '%s.254' % cidr_prefix}],
+                  'enable_dhcp': True,
+                  'dns_nameservers': [],
+                  'host_routes': [],
+                  'ipv6_ra_mode': None,
+                  'ipv6_address_mode': None}
+        data['subnets'].append(subnet)
+        network['subnets'].append(subnet['id'])
+        return subnet
+
+    def _base_network(self, data, name, tenant_id, project_name):
+        return {'id': self.uuid(),
+                'name': name,
+                'tenant_id': tenant_id,
+                'fq_name': self.fq_name(project_name, name),
+                'status': 'ACTIVE',
+                'admin_state_up': True,
+                'shared': False,
+                'router:external': False,
+                'subnets': []}
+
+    def _external_network(self, data):
+        network = self._base_network(data, 'public', self.uuid(), 'admin')
+        network['router:external'] = True
+        network['shared'] = True
+        data['networks'].append(network)
+        self._subnet(data, network, '172.24.4', network['tenant_id'])
+        return network
+
+    def _network(self, data, index):
+        network = self._base_network(data, 'net-%05d' % index,
+                                     data.project_id, data.project_name)
+        data['networks'].append(network)
+        self._subnet(data, network,
+                     '10.%d.%d' % (index // 256, index % 256),
+                     data.project_id)
+        return network
+
+    def _router_rule(self, networks):
+        def endpoint():
+            if self.rng.random() < 0.2:
+                return 'any'
+            return '10.%d.%d.0/24' % divmod(
+                self.rng.randrange(len(networks)), 256)
+        return {'source': endpoint(),
+                'destination': endpoint(),
+                'action': self.rng.choice(('permit', 'deny')),
+                'nexthops': []}
+
+    def _router(self, data, index, external, networks):
+        router = {'id': self.uuid(),
+                  'name': 'router-%04d' % index,
+                  'tenant_id': data.project_id,
+                  'status': 'ACTIVE',
+                  'admin_state_up': True,
+                  'external_gateway_info': {'network_id': external['id'],
+                                            'enable_snat': True},
+                  'router_rules': [self._router_rule(networks)
+                                   for i in range(self.rng.randint(1, 20))]}
+        data['routers'].append(router)
+        return router
+
+    def _server(self, data, index):
+        server = {'id': self.uuid(),
+                  'name': 'server-%05d' % index,
+                  'tenant_id': data.project_id,
+                  'user_id': 'bench',
+                  'status': 'ACTIVE',
+                  'OS-EXT-STS:task_state': None,
+                  'OS-EXT-STS:power_state': 1,
+                  'OS-EXT-AZ:availability_zone': 'nova',
+                  'addresses': {},
+                  'flavor': {'id': '1', 'links': []},
+                  'image': {'id': 'image', 'links': []},
+                  'key_name': None,
+                  'metadata': {},
+                  'created': '2016-01-01T00:00:00Z',
+                  'updated': '2016-01-01T00:00:00Z',
+                  'links': []}
+        data['servers'].append(server)
+        return server
+
+    def _port(self, data, network, subnet, host, device_owner, device_id):
+        port = {'id': self.uuid(),
+                'name': '',
+                'tenant_id': data.project_id,
+                'network_id': network['id'],
+                'mac_address': 'fa:16:3e:%02x:%02x:%02x' % (
+                    self.rng.randint(0, 255), self.rng.randint(0, 255),
+                    self.rng.randint(0, 255)),
+                'fixed_ips': [{'subnet_id': subnet['id'],
+                               'ip_address': '%s.%d' % (
+                                   subnet['cidr'].rsplit('.', 1)[0], host)}],
+                'device_owner': device_owner,
+                'device_id': device_id,
+                'status': 'ACTIVE',
+                'admin_state_up': True,
+                'security_groups': [],
+                'binding:vnic_type': 'normal'}
+        data['ports'].append(port)
+        return port
+
+    def _ports(self, data, count, networks, routers, servers):
+        subnets = dict((s['network_id'], s) for s in data['subnets'])
+        hosts = dict((n['id'], 2) for n in networks)
+
+        def add(network, device_owner, device_id):
+            host = hosts[network['id']]
+            hosts[network['id']] = host + 1 if host < 254 else 2
+            return self._port(data, network, subnets[network['id']], host,
+                              device_owner, device_id)
+
+        # every router gets an interface on a share of the networks
+        for i, network in enumerate(networks):
+            if routers and len(data['ports']) < count:
+                add(network, 'network:router_interface',
+                    routers[i % len(routers)]['id'])
+        while len(data['ports']) < count and servers and networks:
+            server = self.rng.choice(servers)
+            network = self.rng.choice(networks)
+            port = add(network, 'compute:nova', server['id'])
+            server['addresses'].setdefault(network['name'], []).append(
+                {'addr': port['fixed_ips'][0]['ip_address'],
+                 'version': 4,
+                 'OS-EXT-IPS:type': 'fixed',
+                 'OS-EXT-IPS-MAC:mac_addr': port['mac_address']})
+
+    def _policy_address(self, networks):
+        if self.rng.random() < 0.2:
+            return {'security_group': None,
+                    'subnet': {'ip_prefix': '10.0.0.0', 'ip_prefix_len': 8},
+                    'virtual_network': None,
+                    'network_policy': None}
+        return {'security_group': None,
+                'subnet': None,
+                'virtual_network': ':'.join(
+                    self.rng.choice(networks)['fq_name']),
+                'network_policy': None}
+
+    def _policy_ports(self):
+        if self.rng.random() < 0.5:
+            return [{'start_port': -1, 'end_port': -1}]
+        start = self.rng.randint(1, 60000)
+        return [{'start_port': start,
+                 'end_port': start + self.rng.randint(0, 100)}]
+
+    def _policy(self, data, index, networks):
+        name = 'policy-%04d' % index
+        rules = [{'rule_uuid': self.uuid(),
+                  'direction': self.rng.choice(DIRECTIONS),
+                  'protocol': self.rng.choice(PROTOCOLS),
+                  'application': [],
+                  'action_list': {'simple_action': self.rng.choice(ACTIONS),
+                                  'gateway_name': None,
+                                  'apply_service': None,
+                                  'assign_routing_instance': None,
+                                  'mirror_to': None},
+                  'src_addresses': [self._policy_address(networks)],
+                  'dst_addresses': [self._policy_address(networks)],
+                  'src_ports': self._policy_ports(),
+                  'dst_ports': self._policy_ports(),
+                  'rule_sequence': {'major': -1, 'minor': -1}}
+                 for i in range(self.rng.randint(1, 50))]
+        data['policys'].append({
+            'id': self.uuid(),
+            'name': name,
+            'fq_name': self.fq_name(data.project_name, name),
+            'tenant_id': data.project_id,
+            'entries': {'policy_rule': rules},
+            'nets_using': []})
+
+    def _ipam(self, data, index):
+        name = 'ipam-%03d' % index
+        data['ipams'].append({
+            'id': self.uuid(),
+            'name': name,
+            'fq_name': self.fq_name(data.project_name, name),
+            'tenant_id': data.project_id,
+            'mgmt': {'ipam_method': 'dhcp',
+                     'ipam_dns_method': 'default-dns-server',
+                     'dhcp_option_list': {'dhcp_option': [
+                         {'dhcp_option_name': '4',
+                          'dhcp_option_value': '10.0.0.%d' % (index % 250)},
+                         {'dhcp_option_name': '15',
+                          'dhcp_option_value': 'bench.example.org'}]}}})
+
+    def _loadbalancer(self, data, index, networks):
+        index_network = self.rng.randrange(len(networks))
+        subnet_id = networks[index_network]['subnets'][0]
+        prefix = '10.%d.%d' % divmod(index_network, 256)
+        lb_id, listener_id, pool_id, monitor_id = (self.uuid(), self.uuid(),
+                                                   self.uuid(), self.uuid())
+        members = [{'id': self.uuid(),
+                    'pool_id': pool_id,
+                    'tenant_id': data.project_id,
+                    'address': '%s.%d' % (prefix, 10 + i),
+                    'protocol_port': 80,
+                    'subnet_id': subnet_id,
+                    'weight': 1,
+                    'admin_state_up': True}
+                   for i in range(self.rng.randint(0, 10))]
+        data['members'].extend(members)
+        data['healthmonitors'].append({'id': monitor_id,
+                                       'tenant_id': data.project_id,
+                                       'type': 'HTTP',
+                                       'delay': 5,
+                                       'timeout': 5,
+                                       'max_retries': 3,
+                                       'http_method': 'GET',
+                                       'url_path': '/',
+                                       'expected_codes': '200',
+                                       'admin_state_up': True,
+                                       'pools': [{'id': pool_id}]})
+        data['pools'].append({'id': pool_id,
+                              'name': 'pool-%04d' % index,
+                              'tenant_id': data.project_id,
+                              'protocol': 'HTTP',
+                              'lb_algorithm': 'ROUND_ROBIN',
+                              'admin_state_up': True,
+                              'listeners': [{'id': listener_id}],
+                              'members': [{'id': m['id']} for m in members],
+                              'healthmonitor_id': monitor_id})
+        data['listeners'].append({'id': listener_id,
+                                  'name': 'listener-%04d' % index,
+                                  'tenant_id': data.project_id,
+                                  'protocol': 'HTTP',
+                                  'protocol_port': 80,
+                                  'admin_state_up': True,
+                                  'default_pool_id': pool_id,
+                                  'loadbalancers': [{'id': lb_id}]})
+        data['loadbalancers'].append({
+            'id': lb_id,
+            'name': 'lb-%04d' % index,
+            'description': '',
+            'tenant_id': data.project_id,
+            'vip_subnet_id': subnet_id,
+            'vip_address': '%s.5' % prefix,
+            'vip_port_id': self.uuid(),
+            'provider': 'haproxy',
+            'provisioning_status': 'ACTIVE',
+            'operating_status': 'ONLINE',
+            'admin_state_up': True,
+            'listeners': [{'id': listener_id}],
+            'pools': [{'id': pool_id}]})
+
+
+def generate(scale='small', seed=0):
+    """Return the Dataset of the given scale, the same for the same seed."""
+    return Generator(seed).generate(scale)
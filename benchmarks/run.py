@@ -0,0 +1,219 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Run the benchmark scenarios and compare them against a baseline.
+
+Every scenario runs in a process of its own, forked once Django is set up
+and the stand-in serves, so that its peak RSS is its own. The baseline is
+a JSON file holding the results of a previous run per scale; a scenario
+regresses when its p50, p99 or peak RSS exceed the baseline by more than
+the tolerance, in which case the exit status is 1.
+
+Django is set up from DJANGO_SETTINGS_MODULE, openstack_dashboard.settings
+by default, which has to enable the plugin panels.
+"""
+
+from __future__ import print_function
+
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from contrail_openstack_dashboard.benchmarks import generator
+from contrail_openstack_dashboard.benchmarks import scenarios
+from contrail_openstack_dashboard.benchmarks import standin
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'baseline.json')
+METRICS = ('p50_ms', 'p99_ms', 'peak_rss_kb')
+
+
+class Token(object):
+    """Stands in for the keystone token of the benchmark user."""
+
+    def __init__(self, project_id, project_name):
+        from django.utils import timezone
+        self.id = 'benchmark-token'
+        self.expires = datetime.datetime(2100, 1, 1, tzinfo=timezone.utc)
+        self.project = {'id': project_id, 'name': project_name}
+        self.user = {'id': 'bench', 'name': 'bench', 'roles': []}
+        self.tenant = self.project
+        self.roles = [{'name': 'admin'}, {'name': '_member_'}]
+
+
+def setup_django(data, service):
+    """Set up Django and log every request in as the benchmark user."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'openstack_dashboard.settings')
+    import django
+    from django.conf import settings
+    if hasattr(django, 'setup'):
+        django.setup()
+    settings.ALLOWED_HOSTS = list(settings.ALLOWED_HOSTS) + ['testserver']
+
+    from openstack_auth import user as auth_user
+    from openstack_auth import utils as auth_utils
+
+    token = Token(data.project_id, data.project_name)
+    user = auth_user.User(id='bench',
+                          token=token,
+                          user='bench',
+                          tenant_id=data.project_id,
+                          tenant_name=data.project_name,
+                          service_catalog=service.service_catalog(),
+                          roles=token.roles,
+                          enabled=True,
+                          services_region='RegionOne',
+                          authorized_tenants=[],
+                          endpoint=service.url + '/keystone/v2.0')
+    # the same as the horizon test helpers do
+    auth_utils.patch_middleware_get_user()
+    auth_utils.get_user = lambda request: user
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = int(math.ceil(percent / 100.0 * len(values))) - 1
+    return values[max(0, index)]
+
+
+def measure(scenario, data, iterations, warmup):
+    """Request the page of the scenario and return its metrics."""
+    from django.core.urlresolvers import reverse
+    from django.test import client
+
+    args, query = scenario.get_params(data)
+    url = reverse(scenario.view_name, args=args)
+    browser = client.Client()
+    timings = []
+    size = 0
+    server_timing = None
+    for i in range(warmup + iterations):
+        start = time.time()
+        response = browser.get(url, query)
+        if getattr(response, 'streaming', False):
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        elapsed = time.time() - start
+        if response.status_code != 200:
+            raise RuntimeError('%s returned %d' % (url,
+                                                   response.status_code))
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+        server_timing = response.get('Server-Timing')
+    return {'iterations': iterations,
+            'p50_ms': round(percentile(timings, 50), 1),
+            'p99_ms': round(percentile(timings, 99), 1),
+            'mean_ms': round(sum(timings) / len(timings), 1),
+            'bytes': size,
+            'peak_rss_kb': resource.getrusage(
+                resource.RUSAGE_SELF).ru_maxrss,
+            'server_timing': server_timing}
+
+
+def _run_forked(scenario, data, iterations, warmup):
+    parent, child = multiprocessing.Pipe()
+
+    def target():
+        try:
+            child.send(('ok', measure(scenario, data, iterations, warmup)))
+        except Exception as e:
+            child.send(('error', '%s: %s' % (type(e).__name__, e)))
+
+    process = multiprocessing.Process(target=target)
+    process.start()
+    status, result = parent.recv()
+    process.join()
+    if status != 'ok':
+        raise RuntimeError(result)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric in METRICS:
+            if previous.get(metric) and \
+                    result[metric] > previous[metric] * (1 + tolerance):
+                regressions.append('%s %s: %s > %s (+%d%%)' % (
+                    name, metric, result[metric], previous[metric],
+                    (result[metric] / float(previous[metric]) - 1) * 100))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scale', default='small',
+                        choices=sorted(generator.SCALES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--scenario', action='append',
+                        choices=list(scenarios.SCENARIOS),
+                        help='scenario to run, all by default')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the baseline of the '
+                             'scale')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative regression, default 0.2')
+    parser.add_argument('--output', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    print('Generating %s dataset (seed %d)' % (args.scale, args.seed))
+    data = generator.generate(args.scale, args.seed)
+    service = standin.StandIn(data).start()
+    setup_django(data, service)
+
+    results = {}
+    try:
+        for name in args.scenario or scenarios.SCENARIOS:
+            result = _run_forked(scenarios.SCENARIOS[name], data,
+                                 args.iterations, args.warmup)
+            results[name] = result
+            print('%-20s p50 %8.1f ms  p99 %8.1f ms  rss %8d kB  %9d B'
+                  % (name, result['p50_ms'], result['p99_ms'],
+                     result['peak_rss_kb'], result['bytes']))
+    finally:
+        service.stop()
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    regressions = compare(results, baselines.get(args.scale, {}),
+                          args.tolerance)
+    for regression in regressions:
+        print('REGRESSION %s' % regression)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({args.scale: results}, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        baselines.setdefault(args.scale, {}).update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""The pages requested by the benchmarks.
+
+A scenario is a view name, and a function returning the view arguments
+and query string for a dataset.
+"""
+
+import collections
+
+Scenario = collections.namedtuple('Scenario',
+                                  ['name', 'view_name', 'get_params'])
+
+
+def _no_params(data):
+    return [], {}
+
+
+def _largest_policy(data):
+    policy = max(data['policys'],
+                 key=lambda p: len(p['entries']['policy_rule']))
+    return [policy['id']], {}
+
+
+def _router_with_most_rules(data):
+    router = max(data['routers'], key=lambda r: len(r['router_rules']))
+    return [router['id']], {'tab': 'router_details__rulesgrid'}
+
+
+SCENARIOS = collections.OrderedDict((s.name, s) for s in (
+    Scenario('topology_json',
+             'horizon:project:networking_topology:json', _no_params),
+    Scenario('networking_tabs',
+             'horizon:project:networking:index', _no_params),
+    Scenario('policy_detail',
+             'horizon:project:networking:policy:detail', _largest_policy),
+    Scenario('router_rules_grid',
+             'horizon:project:l3routers:detail', _router_with_most_rules),
+    Scenario('loadbalancer_list',
+             'horizon:project:loadbalancersv2:index', _no_params),
+))
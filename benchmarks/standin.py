@@ -0,0 +1,270 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Local HTTP stand-in for the OpenStack APIs the plugin reads from.
+
+Only what the benchmark scenarios need is implemented: list and show of
+the Neutron core resources, the Contrail IPAM and policy extensions and
+LBaaS v2 (with filters, fields, limit/marker pagination and links), the
+server list and show of Nova and the project list of Keystone v2 and v3.
+Writes are answered with 501.
+
+The services are mounted under /neutron, /nova and /keystone of a single
+server, see StandIn.service_catalog().
+"""
+
+import json
+import re
+import threading
+
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+from six.moves.urllib import parse
+
+# query parameters which are not resource filters
+NON_FILTERS = ('fields', 'limit', 'marker', 'page_reverse', 'sort_key',
+               'sort_dir', 'all_tenants', 'project_id', 'detailed')
+
+NEUTRON_EXTENSIONS = ('agent', 'binding', 'dhcp_agent_scheduler',
+                      'external-net', 'extraroute', 'ipam', 'lbaasv2',
+                      'policy', 'provider', 'quotas', 'route-table',
+                      'router', 'router_rules', 'security-group',
+                      'service-type')
+
+NEUTRON_COLLECTIONS = {
+    'networks': 'network',
+    'subnets': 'subnet',
+    'ports': 'port',
+    'routers': 'router',
+    'ipams': 'ipam',
+    'policys': 'policy',
+    'lbaas/loadbalancers': 'loadbalancer',
+    'lbaas/listeners': 'listener',
+    'lbaas/pools': 'pool',
+    'lbaas/healthmonitors': 'healthmonitor',
+}
+
+
+class NotFound(Exception):
+    pass
+
+
+def _match(item, filters):
+    for key, values in filters.items():
+        value = item.get(key)
+        if isinstance(value, bool) or value is None:
+            value = str(value).lower()
+            values = [v.lower() for v in values]
+        if str(value) not in values:
+            return False
+    return True
+
+
+def _select(items, query, collection, base_url):
+    """Filter, project and page items as the Neutron API does.
+
+    :returns: a tuple of (items, links)
+    """
+    filters = dict((k, v) for k, v in query.items() if k not in NON_FILTERS)
+    if filters:
+        items = [item for item in items if _match(item, filters)]
+
+    links = []
+    limit = int(query.get('limit', [0])[0])
+    if limit:
+        marker = query.get('marker', [None])[0]
+        reverse = query.get('page_reverse', ['False'])[0].lower() == 'true'
+        ids = [item['id'] for item in items]
+        position = ids.index(marker) if marker in ids else None
+        if reverse:
+            end = position if position is not None else len(items)
+            start = max(0, end - limit)
+            more = start > 0
+        else:
+            start = position + 1 if position is not None else 0
+            end = start + limit
+            more = end < len(items)
+        items = items[start:end]
+        if items and more:
+            page_query = dict(query, marker=[items[0 if reverse else -1]
+                                             ['id']])
+            links.append({'rel': 'previous' if reverse else 'next',
+                          'href': '%s?%s' % (base_url, parse.urlencode(
+                              page_query, doseq=True))})
+
+    fields = query.get('fields')
+    if fields:
+        items = [dict((k, v) for k, v in item.items() if k in fields)
+                 for item in items]
+    return items, links
+
+
+class StandIn(object):
+    """Serves a generator.Dataset over HTTP."""
+
+    def __init__(self, data, host='127.0.0.1', port=0):
+        self.data = data
+        self.index = dict(
+            (name, dict((item['id'], item) for item in items))
+            for name, items in data.collections.items())
+        handler = type('Handler', (_Handler,), {'standin': self})
+        self.server = _Server((host, port), handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       name='benchmark-standin')
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def service_catalog(self, region='RegionOne'):
+        """Return a Keystone v2 service catalog pointing to the stand-in."""
+        def service(type, name, path):
+            url = self.url + path
+            return {'type': type, 'name': name,
+                    'endpoints_links': [],
+                    'endpoints': [{'region': region, 'id': name,
+                                   'publicURL': url, 'internalURL': url,
+                                   'adminURL': url}]}
+        return [service('network', 'neutron', '/neutron'),
+                service('compute', 'nova',
+                        '/nova/v2/%s' % self.data.project_id),
+                service('identity', 'keystone', '/keystone/v2.0')]
+
+    def get(self, path, query):
+        """Return the response body of a GET request as a dict."""
+        service, _sep, path = path.strip('/').partition('/')
+        handler = getattr(self, '_get_%s' % service, None)
+        if handler is None:
+            raise NotFound(service)
+        return handler(path, query)
+
+    def _get_neutron(self, path, query):
+        path = re.sub(r'^v2\.0/', '', path)
+        if path.endswith('.json'):
+            path = path[:-len('.json')]
+        base_url = '%s/neutron/v2.0/%s.json' % (self.url, path)
+
+        if path == 'extensions':
+            return {'extensions': [{'alias': alias, 'name': alias,
+                                    'description': '', 'links': [],
+                                    'updated': ''}
+                                   for alias in NEUTRON_EXTENSIONS]}
+
+        members = re.match(r'^lbaas/pools/([^/]+)/members(?:/([^/]+))?$',
+                           path)
+        if members:
+            pool_id, member_id = members.groups()
+            if member_id:
+                return {'member': self._show('members', member_id)}
+            items, links = _select(
+                [m for m in self.data['members'] if m['pool_id'] == pool_id],
+                query, 'members', base_url)
+            return {'members': items, 'members_links': links}
+
+        if path in NEUTRON_COLLECTIONS:
+            name = path.rsplit('/', 1)[-1]
+            items, links = _select(self.data[name], query, name, base_url)
+            return {name: items, '%s_links' % name: links}
+
+        collection, _sep, item_id = path.rpartition('/')
+        if collection in NEUTRON_COLLECTIONS:
+            name = collection.rsplit('/', 1)[-1]
+            return {NEUTRON_COLLECTIONS[collection]: self._show(name,
+                                                                item_id)}
+
+        # resources the stand-in does not model are empty
+        return {path.rsplit('/', 1)[-1]: []}
+
+    def _get_nova(self, path, query):
+        # strip v2/<project_id>/
+        path = path.split('/', 2)[-1]
+        if path in ('servers', 'servers/detail'):
+            items, links = _select(self.data['servers'], query, 'servers',
+                                   '%s/nova/%s' % (self.url, path))
+            return {'servers': items}
+        if path.startswith('servers/'):
+            return {'server': self._show('servers', path.split('/')[1])}
+        if path == 'flavors/detail' or path == 'flavors':
+            return {'flavors': [{'id': '1', 'name': 'm1.tiny', 'ram': 512,
+                                 'vcpus': 1, 'disk': 1, 'links': []}]}
+        if path == 'extensions':
+            return {'extensions': []}
+        if path == 'os-availability-zone':
+            return {'availabilityZoneInfo': [{'zoneName': 'nova',
+                                              'zoneState': {
+                                                  'available': True},
+                                              'hosts': None}]}
+        raise NotFound(path)
+
+    def _get_keystone(self, path, query):
+        if path == 'v2.0/tenants':
+            return {'tenants': self.data['projects'], 'tenants_links': []}
+        if path == 'v3/projects':
+            items, links = _select(self.data['projects'], query,
+                                   'projects', '')
+            return {'projects': items,
+                    'links': {'self': None, 'next': None,
+                              'previous': None}}
+        raise NotFound(path)
+
+    def _show(self, collection, item_id):
+        try:
+            return self.index[collection][item_id]
+        except KeyError:
+            raise NotFound(item_id)
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    standin = None
+
+    def _send(self, status, body):
+        body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = parse.urlsplit(self.path)
+        try:
+            body = self.standin.get(url.path, parse.parse_qs(url.query))
+        except NotFound as e:
+            self._send(404, {'NeutronError': {
+                'type': 'NotFound', 'detail': '',
+                'message': 'Resource %s could not be found.' % e}})
+        else:
+            self._send(200, body)
+
+    def _not_implemented(self):
+        self._send(501, {'NeutronError': {
+            'type': 'NotImplemented', 'detail': '',
+            'message': 'The benchmark stand-in is read only.'}})
+
+    do_POST = do_PUT = do_DELETE = _not_implemented
+
+    def log_message(self, format, *args):
+        pass
@@ -1 +1,3 @@
+from . import instances  # noqa
 from . import lbaasv2  # noqa
+from . import provisioning  # noqa
@@ -0,0 +1,112 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Instances a load balancer can be given as members.
+
+The instance picker of the load balancer workflow only needs the id, the
+name and the first fixed address of instances. Rather than listing every
+server of the project whenever the workflow is rendered, these projections
+are kept per project for a short time and searched and paginated in
+memory.
+"""
+
+from __future__ import absolute_import
+
+import threading
+
+from django.conf import settings
+
+from horizon.utils import functions as horizon_utils
+
+from openstack_dashboard.api import nova
+
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+from contrail_openstack_dashboard.openstack_dashboard.api import utils
+
+
+def _first_address(server):
+    for addresses in (getattr(server, 'addresses', None) or {}).values():
+        for address in addresses:
+            return address.get('addr')
+    return None
+
+
+def _list_instances(request):
+    with instrumentation.timed(request, 'nova', 'server_list'):
+        servers, has_more_data = nova.server_list(request)
+    instances = []
+    for server in servers:
+        address = _first_address(server)
+        # instances without a network can not be members
+        if address:
+            instances.append({'id': server.id, 'name': server.name,
+                              'address': address})
+    instances.sort(key=lambda i: ((i['name'] or '').lower(), i['id']))
+    return instances
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = utils.ProjectCache(
+                    _list_instances,
+                    ttl=getattr(settings, 'LBAAS_INSTANCE_CACHE_TTL', 30),
+                    max_projects=getattr(
+                        settings, 'LBAAS_INSTANCE_CACHE_MAX_PROJECTS', 100))
+    return _cache
+
+
+def search(request, query=None, marker=None, limit=None):
+    """Return a page of the instances of the project matching a query.
+
+    Instances are ordered by name.
+
+    :param query: text the name or the address has to contain, case is
+        ignored
+    :param marker: id of the instance the page starts after
+    :param limit: size of the page, the user's page size by default
+    :returns: a tuple of (instances, has_more_data)
+    """
+    instances = get_cache().get(request)
+    if query:
+        query = query.lower()
+        instances = [i for i in instances
+                     if query in (i['name'] or '').lower() or
+                     query in i['address']]
+    if marker:
+        ids = [i['id'] for i in instances]
+        if marker in ids:
+            instances = instances[ids.index(marker) + 1:]
+    limit = limit or horizon_utils.get_page_size(request)
+    return instances[:limit], len(instances) > limit
+
+
+def lookup(request, addresses):
+    """Return a dict mapping the given addresses to their instances.
+
+    The instances are listed again if an address is not known, as it may
+    belong to an instance created since they were cached.
+    """
+    addresses = set(addresses)
+    found = {}
+    for refresh in (False, True):
+        found = dict((i['address'], i)
+                     for i in get_cache().get(request, refresh=refresh)
+                     if i['address'] in addresses)
+        if len(found) == len(addresses):
+            break
+    return found
@@ -14,6 +14,10 @@
 
 from __future__ import absolute_import
 
+import functools
+import threading
+
+from django.conf import settings
 from django.utils.datastructures import SortedDict
 from django.utils.translation import ugettext_lazy as _
 
@@ -21,7 +25,11 @@ from horizon import messages
 
 from openstack_dashboard.api import neutron
 
-neutronclient = neutron.neutronclient
+from contrail_openstack_dashboard.openstack_dashboard.api import utils
+
+neutronclient = utils.neutronclient
+
+_lock = threading.Lock()
 
 
 class LBDetails(neutron.NeutronAPIDictWrapper):
@@ -31,8 +39,9 @@ class LBDetails(neutron.NeutronAPIDictWrapper):
                  monitors=None, profile_name=None, cert=None, key=None,
                  chain=None):
         vip['pool'] = pool
-        pool['members'] = members
-        pool['monitors'] = monitors
+        if pool is not None:
+            pool['members'] = members
+            pool['monitors'] = monitors
         # vip['cert_name'] = cert_name
         vip['listener'] = listener
         vip['cert'] = cert
@@ -221,6 +230,75 @@ class PoolMonitor(neutron.NeutronAPIDictWrapper):
         super(PoolMonitor, self).__init__(apiresource)
 
 
+class Resolver(object):
+    """Resolves the resources referenced by LBaaS v1 objects by id.
+
+    The ids referenced by a set of objects are fetched with one list call
+    per resource type, filtered by id, and kept for the rest of the
+    request, so that nested expansions and later calls of the same request
+    reuse them. Ids which do not exist are remembered as well.
+    """
+
+    # resource type: (client method, collection, wrapper)
+    RESOURCES = {
+        'subnet': ('list_subnets', 'subnets', neutron.Subnet),
+        'port': ('list_ports', 'ports', neutron.Port),
+        'vip': ('list_vips', 'vips', Vip),
+        'pool': ('list_pools', 'pools', Pool),
+        'health_monitor': ('list_health_monitors', 'health_monitors',
+                           PoolMonitor),
+    }
+
+    def __init__(self, request):
+        self.request = request
+        self._lock = threading.Lock()
+        self._cache = dict((resource, {}) for resource in self.RESOURCES)
+
+    def add(self, resource, items):
+        """Remember resources which were listed by the caller."""
+        with self._lock:
+            self._cache[resource].update(
+                (item['id'], dict(item)) for item in items)
+
+    def resolve(self, resource, ids):
+        """Return a dict of the existing resources of the given ids.
+
+        The ids not known yet are fetched with a single list call. The
+        values are copies of the resource dicts, which the caller may
+        expand and wrap.
+        """
+        cache = self._cache[resource]
+        with self._lock:
+            missing = set(i for i in ids if i and i not in cache)
+        if missing:
+            method, collection = self.RESOURCES[resource][:2]
+            items = _list_resources_by_id(self.request, method, collection,
+                                          missing)
+            with self._lock:
+                cache.update((item['id'], item) for item in items)
+                for resource_id in missing:
+                    cache.setdefault(resource_id, None)
+        with self._lock:
+            return dict((i, dict(cache[i])) for i in ids
+                        if i and cache.get(i) is not None)
+
+    def get(self, resource, resource_id):
+        """Return the wrapped resource of the given id.
+
+        :raises KeyError: the resource does not exist
+        """
+        item = self.resolve(resource, [resource_id])[resource_id]
+        return self.RESOURCES[resource][2](item)
+
+
+def resolver(request):
+    """Return the Resolver of the request."""
+    with _lock:
+        if getattr(request, '_lbaas_resolver', None) is None:
+            request._lbaas_resolver = Resolver(request)
+    return request._lbaas_resolver
+
+
 def vip_create(request, **kwargs):
     """Create a vip for a specified pool.
 
@@ -327,44 +405,197 @@ def create_loadbalancer_full(request, **kwargs):
         member = client.create_lbaas_member(member_body).get('member')
     except Exception:
         raise Exception(_("Could not create full loadbalancer."))
+    finally:
+        forget_vip_addresses(request)
     return [LBDetails(loadbalancer, listener, pool, member, health_monitor)]
 
 
-def list_loadbalancers(request, **kwargs):
-    vips = neutronclient(request).list_loadbalancers(**kwargs)
-    vips = [] if not vips else vips
-    vips = vips.get('loadbalancers')
+def _list_resources(request, method, collection, *args, **kwargs):
+    return getattr(neutronclient(request), method)(
+        *args, **kwargs).get(collection) or []
+
+
+def _list_resources_by_id(request, method, collection, ids, **kwargs):
+    ids = list(set(i for i in ids if i))
+    if not ids:
+        return []
+    return _list_resources(request, method, collection, id=ids, **kwargs)
+
+
+def _list_page(request, method, collection, marker=None,
+               reversed_order=False, **kwargs):
+    page_size, kwargs = utils.page_params(request, kwargs, marker,
+                                          reversed_order)
+    items = []
+    for page in getattr(neutronclient(request), method)(retrieve_all=False,
+                                                        **kwargs):
+        items = page.get(collection) or []
+        break
+    return utils.paginate(sorted(items, key=lambda item: item['id']),
+                          page_size, marker, reversed_order)
+
+
+def _scope(kwargs):
+    """Return the tenant scoping out of the filters of a listing."""
+    return dict((key, value) for key, value in kwargs.items()
+                if key in ('tenant_id', 'project_id'))
+
+
+def _join_loadbalancers(request, vips, listeners, pools, monitors,
+                        **kwargs):
+    listener_dict = dict((l['id'], l) for l in listeners)
+    pool_dict = dict((p['id'], p) for p in pools)
+    monitor_dict = dict((m['id'], m) for m in monitors)
+
+    details = []
     for vip in vips:
-        listeners = vip.get('listeners')
-        listeners = [] if not listeners else listeners
+        listener = None
+        for viplistener in vip.get('listeners') or []:
+            listener = listener_dict.get(viplistener.get('id'), listener)
+        pool = None
+        if listener is not None:
+            pool = pool_dict.get(listener.get('default_pool_id'))
+        details.append((vip, listener, pool))
+
+    pool_ids = [pool['id'] for vip, listener, pool in details if pool]
+
+    def _list_members(pool_id):
+        return _list_resources(request, 'list_lbaas_members', 'members',
+                               pool_id, **kwargs)
+
+    members = dict(zip(pool_ids, utils.map_parallel(_list_members,
+                                                    pool_ids)))
+
+    return [LBDetails(vip, listener, pool,
+                      members.get(pool['id']) if pool else None,
+                      monitor_dict.get(pool.get('healthmonitor_id'))
+                      if pool else None)
+            for vip, listener, pool in details]
+
+
+def list_loadbalancers(request, marker=None, paginate=False,
+                       reversed_order=False, **kwargs):
+    """List load balancers along with their listener, pool and members.
+
+    Listeners, pools and health monitors are each fetched with a single
+    list call and joined to the load balancers by id; the member lists of
+    the referenced pools are then fetched concurrently.
+
+    :param marker: id of the load balancer the requested page starts after,
+        or ends before when reversed_order is set
+    :param paginate: if True, only one page is fetched and the children
+        are fetched by id for that page only. The return value is then a
+        tuple of (loadbalancers, has_more_data, has_prev_data)
+    :param reversed_order: fetch the page preceding the marker
+    :param kwargs: filters of the load balancers; only tenant_id and
+        project_id also apply to the resources below them
+    """
+    has_more_data = has_prev_data = False
+    scope = _scope(kwargs)
+    try:
+        if paginate:
+            vips, has_more_data, has_prev_data = _list_page(
+                request, 'list_loadbalancers', 'loadbalancers', marker,
+                reversed_order, **kwargs)
+            listeners = _list_resources_by_id(
+                request, 'list_listeners', 'listeners',
+                [l.get('id') for v in vips for l in v.get('listeners') or []],
+                **scope)
+            pools = _list_resources_by_id(
+                request, 'list_lbaas_pools', 'pools',
+                [l.get('default_pool_id') for l in listeners], **scope)
+            monitors = _list_resources_by_id(
+                request, 'list_lbaas_healthmonitors', 'healthmonitors',
+                [p.get('healthmonitor_id') for p in pools], **scope)
+        else:
+            vips, listeners, pools, monitors = \
+                utils.call_functions_parallel(
+                    (_list_resources, (request, 'list_loadbalancers',
+                                       'loadbalancers'), kwargs),
+                    (_list_resources, (request, 'list_listeners',
+                                       'listeners'), scope),
+                    (_list_resources, (request, 'list_lbaas_pools',
+                                       'pools'), scope),
+                    (_list_resources, (request, 'list_lbaas_healthmonitors',
+                                       'healthmonitors'), scope))
+        loadbalancers = _join_loadbalancers(request, vips, listeners, pools,
+                                            monitors, **scope)
+    except Exception:
+        raise Exception(_("Could not get load balancer list."))
 
-        for listener in listeners:
-            listener = neutronclient(request).show_listener(listener.get('id'),
-                                                            **kwargs)
-            if not listener:
-                continue
-            listener = listener.get('listener')
+    if paginate:
+        return loadbalancers, has_more_data, has_prev_data
+    return loadbalancers
 
-            try:
-                pool = neutronclient(request).\
-                    show_lbaas_pool(listener.get('default_pool_id'), **kwargs)
-                if not pool:
-                    continue
-                pool = pool.get('pool')
-                if pool.get('healthmonitor_id'):
-                    health_monitor = neutronclient(request).\
-                        show_lbaas_healthmonitor(pool.get('healthmonitor_id'),
-                                                 **kwargs)
-                    health_monitor = health_monitor.get('healthmonitor')
-
-                members = neutronclient(request).\
-                    list_lbaas_members(listener.get('default_pool_id'),
-                                       **kwargs)
 
-            except Exception:
-                raise Exception(_("Could not get load balancer list."))
-    return [LBDetails(v, listener, pool, members, health_monitor)
-            for v in vips]
+# levels of resources below a load balancer: listeners, pools, and the
+# members and health monitors of the pools
+TREE_DEPTH = 3
+
+
+def loadbalancer_tree(request, loadbalancer_id, depth=TREE_DEPTH):
+    """Return a load balancer along with the resources below it.
+
+    The listener references of the load balancer are replaced with the
+    listeners, which are given their default pool as pool. The pools are
+    given their members as members and their health monitor as
+    healthmonitor. Only the resources referenced from the load balancer
+    are listed, filtered by id, and each level is fetched concurrently:
+    the listeners along with the pools referenced from the load balancer,
+    then the other default pools, then the members and health monitors.
+
+    :param depth: levels of resources to include below the load balancer,
+        1 for the listeners, 2 for their pools and 3 for the members and
+        health monitors of the pools
+    """
+    loadbalancer = neutronclient(request).show_loadbalancer(
+        loadbalancer_id).get('loadbalancer')
+    if depth < 1:
+        return loadbalancer
+
+    listener_ids = [l['id'] for l in loadbalancer.get('listeners') or []]
+    # older servers do not list the pools of a load balancer
+    pool_ids = [p['id'] for p in loadbalancer.get('pools') or []]
+    listeners, pools = utils.call_functions_parallel(
+        (_list_resources_by_id,
+         (request, 'list_listeners', 'listeners', listener_ids)),
+        (_list_resources_by_id,
+         (request, 'list_lbaas_pools', 'pools',
+          pool_ids if depth > 1 else [])))
+    listener_dict = dict((l['id'], l) for l in listeners)
+    loadbalancer['listeners'] = [listener_dict[i] for i in listener_ids
+                                 if i in listener_dict]
+    if depth < 2:
+        return loadbalancer
+
+    pool_dict = dict((p['id'], p) for p in pools)
+    pool_dict.update((p['id'], p) for p in _list_resources_by_id(
+        request, 'list_lbaas_pools', 'pools',
+        [l.get('default_pool_id') for l in loadbalancer['listeners']
+         if l.get('default_pool_id') not in pool_dict]))
+    lb_pools = []
+    for listener in loadbalancer['listeners']:
+        listener['pool'] = pool_dict.get(listener.get('default_pool_id'))
+        if listener['pool'] is not None and listener['pool'] not in lb_pools:
+            lb_pools.append(listener['pool'])
+    if depth < 3:
+        return loadbalancer
+
+    # pools without member references have no members to list
+    member_pools = [p for p in lb_pools if p.get('members')]
+    results = utils.call_functions_parallel(
+        (_list_resources_by_id,
+         (request, 'list_lbaas_healthmonitors', 'healthmonitors',
+          [p.get('healthmonitor_id') for p in lb_pools])),
+        *[(_list_resources,
+           (request, 'list_lbaas_members', 'members', p['id']))
+          for p in member_pools])
+    monitor_dict = dict((m['id'], m) for m in results[0])
+    members = dict(zip([p['id'] for p in member_pools], results[1:]))
+    for pool in lb_pools:
+        pool['members'] = members.get(pool['id'], [])
+        pool['healthmonitor'] = monitor_dict.get(pool.get('healthmonitor_id'))
+    return loadbalancer
 
 
 def show_loadbalancer(request, lbaas_loadbalancer, **kwargs):
@@ -399,16 +630,115 @@ def show_loadbalancer(request, lbaas_loadbalancer, **kwargs):
                      health_monitor)
 
 
+class VipAddresses(object):
+    """The VIP addresses in use by the load balancers of a project.
+
+    names maps the addresses to the name of the first load balancer they
+    belong to, in the order the load balancers are listed; endpoints holds
+    the address:port of every listener.
+    """
+
+    def __init__(self, loadbalancers, listeners):
+        ports = dict((listener['id'], listener.get('protocol_port'))
+                     for listener in listeners)
+        self.names = SortedDict()
+        self.endpoints = set()
+        for lb in loadbalancers:
+            address = lb.get('vip_address')
+            if not address:
+                continue
+            self.names.setdefault(address, lb.get('name'))
+            for listener in lb.get('listeners') or []:
+                if listener.get('id') in ports:
+                    self.endpoints.add('%s:%s' % (address,
+                                                  ports[listener['id']]))
+
+    def in_use(self, address, port):
+        return '%s:%s' % (address, port) in self.endpoints
+
+
+def _list_vip_addresses(request):
+    tenant_id = request.user.project_id
+    loadbalancers, listeners = utils.call_functions_parallel(
+        (_list_resources, (request, 'list_loadbalancers', 'loadbalancers'),
+         {'tenant_id': tenant_id,
+          'fields': ['id', 'name', 'vip_address', 'listeners']}),
+        (_list_resources, (request, 'list_listeners', 'listeners'),
+         {'tenant_id': tenant_id, 'fields': ['id', 'protocol_port']}))
+    return VipAddresses(loadbalancers, listeners)
+
+
+_vip_addresses = None
+
+
+def _vip_address_cache():
+    global _vip_addresses
+    if _vip_addresses is None:
+        with _lock:
+            if _vip_addresses is None:
+                _vip_addresses = utils.ProjectCache(
+                    _list_vip_addresses,
+                    ttl=getattr(settings, 'LBAAS_VIP_ADDRESS_CACHE_TTL', 10),
+                    max_projects=getattr(
+                        settings, 'LBAAS_VIP_ADDRESS_CACHE_MAX_PROJECTS',
+                        100))
+    return _vip_addresses
+
+
+def vip_addresses(request):
+    """Return the VipAddresses of the project of the request.
+
+    Only the ids, names and addresses of the load balancers and the ports
+    of the listeners are fetched, and they are kept for a few seconds.
+    """
+    return _vip_address_cache().get(request)
+
+
+def forget_vip_addresses(request):
+    """Drop the cached VipAddresses of the project of the request."""
+    _vip_address_cache().forget(request)
+
+
+def vip_floating_ips(request, port_ids):
+    """Return a dict mapping VIP ports to the list of their floating IPs.
+
+    The floating IPs of the ports are listed with a single call filtered
+    by port. They are kept for the rest of the request only, as they are
+    associated and disassociated through the network API of Horizon,
+    which does not go through this module.
+    """
+    cached = request.__dict__.setdefault('lbaas_floating_ips', {})
+    port_ids = set(i for i in port_ids if i)
+    missing = list(port_ids.difference(cached))
+    if missing:
+        cached.update((port_id, []) for port_id in missing)
+        floating_ips = neutron.list_resources_with_long_filters(
+            functools.partial(_list_resources, request,
+                              'list_floatingips', 'floatingips'),
+            'port_id', missing, tenant_id=request.user.project_id,
+            fields=['id', 'floating_ip_address', 'fixed_ip_address',
+                    'port_id'])
+        for fip in floating_ips:
+            cached[fip['port_id']].append(fip)
+    return dict((port_id, cached[port_id]) for port_id in port_ids)
+
+
 def vip_get(request, vip_id):
-    return _vip_get(request, vip_id, expand_resource=True)
+    return _vip_get(request, vip_id, depth=1)
 
 
-def _vip_get(request, vip_id, expand_resource=False):
+def _vip_get(request, vip_id, depth=0):
+    """Return a vip with its subnet, port and pool expanded.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     vip = neutronclient(request).show_vip(vip_id).get('vip')
-    if expand_resource:
-        vip['subnet'] = neutron.subnet_get(request, vip['subnet_id'])
-        vip['port'] = neutron.port_get(request, vip['port_id'])
-        vip['pool'] = _pool_get(request, vip['pool_id'])
+    resolver(request).add('vip', [vip])
+    if depth > 0:
+        vip['subnet'], vip['port'] = utils.call_functions_parallel(
+            (resolver(request).get, ('subnet', vip['subnet_id'])),
+            (resolver(request).get, ('port', vip['port_id'])))
+        vip['pool'] = _pool_get(request, vip['pool_id'], depth=depth - 1)
     return Vip(vip)
 
 
@@ -447,10 +777,7 @@ def pool_create(request, **kwargs):
 def _get_vip(request, pool, vip_dict, expand_name_only=False):
     if pool['vip_id'] is not None:
         try:
-            if vip_dict:
-                vip = vip_dict.get(pool['vip_id'])
-            else:
-                vip = _vip_get(request, pool['vip_id'])
+            vip = Vip(vip_dict[pool['vip_id']])
         except Exception:
             messages.warning(request, _("Unable to get VIP for pool "
                                         "%(pool)s.") % {"pool": pool["id"]})
@@ -462,38 +789,58 @@ def _get_vip(request, pool, vip_dict, expand_name_only=False):
         return None
 
 
+def _expand_pools(request, pools, depth):
+    """Set the subnet and VIP names of pools.
+
+    The subnets and VIPs of all the pools are resolved together.
+    """
+    if depth <= 0 or not pools:
+        return
+    subnet_dict, vip_dict = utils.call_functions_parallel(
+        (resolver(request).resolve, ('subnet', [p['subnet_id']
+                                                for p in pools])),
+        (resolver(request).resolve, ('vip', [p['vip_id'] for p in pools])))
+    for p in pools:
+        subnet = subnet_dict.get(p['subnet_id'])
+        p['subnet_name'] = subnet['cidr'] if subnet else None
+        p['vip_name'] = _get_vip(request, p, vip_dict,
+                                 expand_name_only=True)
+
+
 def pool_list(request, **kwargs):
-    return _pool_list(request, expand_subnet=True, expand_vip=True, **kwargs)
+    return _pool_list(request, depth=1, **kwargs)
 
 
-def _pool_list(request, expand_subnet=False, expand_vip=False, **kwargs):
+def _pool_list(request, depth=0, **kwargs):
+    """List pools, with their subnet and VIP names when depth is 1 or more.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     pools = neutronclient(request).list_pools(**kwargs).get('pools')
-    if expand_subnet:
-        subnets = neutron.subnet_list(request)
-        subnet_dict = SortedDict((s.id, s) for s in subnets)
-        for p in pools:
-            subnet = subnet_dict.get(p['subnet_id'])
-            p['subnet_name'] = subnet.cidr if subnet else None
-    if expand_vip:
-        vips = vip_list(request)
-        vip_dict = SortedDict((v.id, v) for v in vips)
-        for p in pools:
-            p['vip_name'] = _get_vip(request, p, vip_dict,
-                                     expand_name_only=True)
+    if not kwargs.get('fields'):
+        resolver(request).add('pool', pools)
+    _expand_pools(request, pools, depth)
     return [Pool(p) for p in pools]
 
 
 def pool_get(request, pool_id):
-    return _pool_get(request, pool_id, expand_resource=True)
+    return _pool_get(request, pool_id, depth=1)
 
 
-def _pool_get(request, pool_id, expand_resource=False):
+def _pool_get(request, pool_id, depth=0):
+    """Return a pool with its subnet, VIP, members and monitors expanded.
+
+    The pool is taken from the resources resolved earlier in the request
+    when it was listed or referenced before.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     try:
-        pool = neutronclient(request).show_pool(pool_id).get('pool')
+        pool = resolver(request).resolve('pool', [pool_id])[pool_id]
     except Exception:
         messages.warning(request, _("Unable to get pool detail."))
         return None
-    if expand_resource:
+    if depth > 0:
         # TODO(lyj): The expand resource(subnet, member etc.) attached
         # to a pool could be deleted without cleanup pool related database,
         # this will cause exceptions if we trying to get the deleted resources.
@@ -501,21 +848,36 @@ def _pool_get(request, pool_id, expand_resource=False):
         # we can safely remove the try/except once the neutron bug is fixed
         # https://bugs.launchpad.net/neutron/+bug/1406854
         try:
-            pool['subnet'] = neutron.subnet_get(request, pool['subnet_id'])
+            pool['subnet'] = resolver(request).get('subnet',
+                                                   pool['subnet_id'])
         except Exception:
             messages.warning(request, _("Unable to get subnet for pool "
                                         "%(pool)s.") % {"pool": pool_id})
-        pool['vip'] = _get_vip(request, pool, vip_dict=None,
-                               expand_name_only=False)
+        if pool['vip_id'] is not None and depth > 1:
+            try:
+                pool['vip'] = _vip_get(request, pool['vip_id'],
+                                       depth=depth - 1)
+            except Exception:
+                pool['vip'] = _get_vip(request, pool, {})
+        else:
+            try:
+                vip_dict = resolver(request).resolve('vip', [pool['vip_id']])
+            except Exception:
+                vip_dict = {}
+            pool['vip'] = _get_vip(request, pool, vip_dict)
         try:
-            pool['members'] = _member_list(request, expand_pool=False,
+            pool['members'] = _member_list(request, depth=depth - 1,
                                            pool_id=pool_id)
         except Exception:
             messages.warning(request, _("Unable to get members for pool "
                                         "%(pool)s.") % {"pool": pool_id})
         try:
-            pool['health_monitors'] = pool_health_monitor_list(
-                request, id=pool['health_monitors'])
+            monitors = resolver(request).resolve('health_monitor',
+                                                 pool['health_monitors'])
+            pool['health_monitors'] = [
+                PoolMonitor(monitors[monitor_id])
+                for monitor_id in pool['health_monitors']
+                if monitor_id in monitors]
         except Exception:
             messages.warning(request,
                              _("Unable to get health monitors "
@@ -575,16 +937,23 @@ def pool_health_monitor_list(request, **kwargs):
 
 
 def pool_health_monitor_get(request, monitor_id):
-    return _pool_health_monitor_get(request, monitor_id, expand_resource=True)
+    return _pool_health_monitor_get(request, monitor_id, depth=1)
 
 
-def _pool_health_monitor_get(request, monitor_id, expand_resource=False):
+def _pool_health_monitor_get(request, monitor_id, depth=0):
+    """Return a health monitor with its pools expanded.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     monitor = neutronclient(request
                             ).show_health_monitor(monitor_id
                                                   ).get('health_monitor')
-    if expand_resource:
+    if depth > 0:
         pool_ids = [p['pool_id'] for p in monitor['pools']]
-        monitor['pools'] = _pool_list(request, id=pool_ids)
+        pool_dict = resolver(request).resolve('pool', pool_ids)
+        pools = [pool_dict[i] for i in pool_ids if i in pool_dict]
+        _expand_pools(request, pools, depth - 1)
+        monitor['pools'] = [Pool(p) for p in pools]
     return PoolMonitor(monitor)
 
 
@@ -619,27 +988,37 @@ def member_create(request, **kwargs):
 
 
 def member_list(request, **kwargs):
-    return _member_list(request, expand_pool=True, **kwargs)
+    return _member_list(request, depth=1, **kwargs)
 
 
-def _member_list(request, expand_pool, **kwargs):
+def _member_list(request, depth=0, **kwargs):
+    """List members, with the names of their pools when depth is 1 or more.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     members = neutronclient(request).list_members(**kwargs).get('members')
-    if expand_pool:
-        pools = _pool_list(request)
-        pool_dict = SortedDict((p.id, p) for p in pools)
+    if depth > 0:
+        pool_dict = resolver(request).resolve(
+            'pool', [m['pool_id'] for m in members])
         for m in members:
-            m['pool_name'] = pool_dict.get(m['pool_id']).name_or_id
+            pool = pool_dict.get(m['pool_id'])
+            m['pool_name'] = Pool(pool).name_or_id if pool else m['pool_id']
     return [Member(m) for m in members]
 
 
 def member_get(request, member_id):
-    return _member_get(request, member_id, expand_pool=True)
+    return _member_get(request, member_id, depth=1)
 
 
-def _member_get(request, member_id, expand_pool):
+def _member_get(request, member_id, depth=0):
+    """Return a member with its pool expanded.
+
+    :param depth: levels of referenced resources to expand, 0 for none
+    """
     member = neutronclient(request).show_member(member_id).get('member')
-    if expand_pool:
-        member['pool'] = _pool_get(request, member['pool_id'])
+    if depth > 0:
+        member['pool'] = _pool_get(request, member['pool_id'],
+                                   depth=depth - 1)
     return Member(member)
 
 
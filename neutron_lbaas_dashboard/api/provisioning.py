@@ -0,0 +1,389 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Scheduler for work that has to wait on load balancer provisioning.
+
+LBaaS v2 only accepts one change at a time per load balancer, so creating
+a load balancer with its listener, pool, members and monitor is a chain of
+calls, each of which has to wait for the load balancer to become ACTIVE
+again. Rather than polling from a thread per step, every pending step is
+registered here as part of a job. A single timer thread checks the status
+of all pending load balancers with one list call per tick and hands the
+steps that are ready to a bounded pool of workers.
+
+The steps of a job run in the process which scheduled it. The progress of
+the jobs is published to the Django cache as well, so that any process
+can report it when CACHES is shared between the processes, e.g. with
+memcached. With a cache per process, like the default local memory cache,
+a job is only known to the process running it, and the others answer 404
+for it.
+
+A job keeps the user, whose token its steps talk to neutron with, and the
+submitted data until it finishes or times out, not the whole request.
+"""
+
+from __future__ import absolute_import
+
+import logging
+from multiprocessing.pool import ThreadPool
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from horizon import conf
+
+from contrail_openstack_dashboard.openstack_dashboard.api import utils
+
+LOG = logging.getLogger(__name__)
+
+neutronclient = utils.neutronclient
+
+QUEUED = 'QUEUED'
+RUNNING = 'RUNNING'
+COMPLETE = 'COMPLETE'
+ERROR = 'ERROR'
+
+
+class JobRequest(object):
+    """The part of a request the steps of a job need.
+
+    The session, headers and body of the request are not kept.
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.DATA = getattr(request, 'DATA', None)
+
+
+class ProvisioningJob(object):
+    """A chain of steps waiting on the provisioning of one load balancer."""
+
+    def __init__(self, request, loadbalancer_id):
+        self.id = uuid.uuid4().hex
+        self.request = JobRequest(request)
+        self.project_id = request.user.project_id
+        self.loadbalancer_id = loadbalancer_id
+        self.state = QUEUED
+        self.error = None
+        self.steps = []
+        self.results = {}
+        self.created_at = self.updated_at = time.time()
+        self.callback = None
+        self.callback_kwargs = None
+        self.from_state = None
+        self.to_state = None
+        self.deadline = None
+
+    @property
+    def step(self):
+        return getattr(self.callback, '__name__', None)
+
+    @property
+    def done(self):
+        return self.state in (COMPLETE, ERROR)
+
+    def wait_for(self, callback, from_state, to_state, callback_kwargs,
+                 timeout):
+        self.callback = callback
+        self.callback_kwargs = callback_kwargs
+        self.from_state = from_state
+        self.to_state = to_state
+        self.deadline = time.time() + timeout
+        self.state = QUEUED
+        self.updated_at = time.time()
+
+    def finish(self, state, error=None):
+        self.state = state
+        self.error = error
+        self.callback = None
+        self.callback_kwargs = None
+        self.updated_at = time.time()
+        # The request is only needed to talk to neutron on behalf of the
+        # user, do not keep it around once the job is over.
+        self.request = None
+
+    def to_dict(self):
+        return {'id': self.id,
+                'project_id': self.project_id,
+                'loadbalancer_id': self.loadbalancer_id,
+                'state': self.state,
+                'step': self.step,
+                'steps': list(self.steps),
+                'results': dict(self.results),
+                'error': self.error,
+                'created_at': self.created_at,
+                'updated_at': self.updated_at}
+
+
+class ProvisioningScheduler(object):
+    """Runs job steps once their load balancer reaches the expected state."""
+
+    def __init__(self, max_workers=None, interval=None, timeout=None,
+                 retention=None):
+        self.max_workers = max_workers or getattr(
+            settings, 'LBAAS_PROVISIONING_MAX_WORKERS', 4)
+        self.interval = interval or (
+            conf.HORIZON_CONFIG['ajax_poll_interval'] / 1000.0)
+        self.timeout = timeout or getattr(
+            settings, 'LBAAS_PROVISIONING_TIMEOUT', 1800)
+        self.retention = retention or getattr(
+            settings, 'LBAAS_PROVISIONING_JOB_RETENTION', 300)
+        self._jobs = {}
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._pool = None
+        self._timer = None
+
+    def schedule(self, request, loadbalancer_id, callback,
+                 from_state='PENDING_UPDATE', to_state='ACTIVE',
+                 callback_kwargs=None):
+        """Call a function once the load balancer changes state.
+
+        The callback is invoked as callback(request, loadbalancer_id=...,
+        **callback_kwargs) when the load balancer leaves from_state and
+        reaches to_state. Steps scheduled from within a running callback
+        for the same load balancer continue the same job.
+
+        :param request: django request object
+        :param loadbalancer_id: id of the load balancer to wait on
+        :param callback: function to call when the state is reached
+        :param from_state: initial expected state of the load balancer
+        :param to_state: state to wait for
+        :param callback_kwargs: kwargs to pass into the callback function
+        :returns: the ProvisioningJob the step belongs to
+        """
+        job = self.current_job()
+        continued = job is not None and job.loadbalancer_id == loadbalancer_id
+        if not continued:
+            job = ProvisioningJob(request, loadbalancer_id)
+        with self._cond:
+            job.wait_for(callback, from_state, to_state, callback_kwargs,
+                         self.timeout)
+            self._jobs[job.id] = job
+            # A step scheduled by a running step is queued once the
+            # running step returns, see _run().
+            if not continued:
+                self._queue(job)
+        if not continued:
+            self._index(job)
+        self._publish(job)
+        return job
+
+    def get_job(self, job_id):
+        """Return the progress of a job as a dict, or None if unknown."""
+        with self._cond:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        return self._cache_get(_job_key(job_id))
+
+    def list_jobs(self, project_id):
+        """Return the progress of the jobs of a project as dicts."""
+        job_ids = list(self._cache_get(_project_key(project_id)) or [])
+        with self._cond:
+            self._prune()
+            job_ids += [job.id for job in self._jobs.values()
+                        if job.project_id == project_id]
+        jobs = [job for job in (self.get_job(job_id)
+                                for job_id in set(job_ids))
+                if job is not None and job['project_id'] == project_id]
+        return sorted(jobs, key=lambda job: job['created_at'])
+
+    def current_job(self):
+        """Return the job whose step is running on this thread, if any."""
+        return getattr(self._local, 'job', None)
+
+    def _ensure_timer(self):
+        if self._timer is None or not self._timer.is_alive():
+            self._timer = threading.Thread(target=self._poll,
+                                           name='lbaas-provisioning')
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _poll(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.interval)
+            try:
+                self._check_pending()
+            except Exception:
+                LOG.exception('Unable to check load balancer provisioning '
+                              'status')
+
+    def _check_pending(self):
+        with self._cond:
+            jobs = list(self._pending.values())
+            self._prune()
+
+        # Status checks are made with the credentials of the jobs, so
+        # batch them per token.
+        by_token = {}
+        for job in jobs:
+            by_token.setdefault(job.request.user.token.id, []).append(job)
+
+        for token_jobs in by_token.values():
+            lb_ids = list(set(job.loadbalancer_id for job in token_jobs))
+            try:
+                loadbalancers = neutronclient(
+                    token_jobs[0].request).list_loadbalancers(
+                        id=lb_ids,
+                        fields=['id', 'provisioning_status']
+                ).get('loadbalancers')
+            except Exception as e:
+                # Treat the failure as transient, the jobs time out
+                # eventually if it persists.
+                LOG.warning('Unable to get provisioning status of load '
+                            'balancers %s: %s', lb_ids, e)
+                statuses = dict((job.loadbalancer_id, job.from_state)
+                                for job in token_jobs)
+            else:
+                statuses = dict((lb['id'], lb['provisioning_status'])
+                                for lb in loadbalancers)
+            for job in token_jobs:
+                self._update(job, statuses.get(job.loadbalancer_id))
+
+    def _update(self, job, status):
+        if status == job.from_state:
+            if time.time() > job.deadline:
+                self._release(job, ERROR,
+                              'Timed out waiting for load balancer %s to '
+                              'become %s.' % (job.loadbalancer_id,
+                                              job.to_state))
+            return
+        if status != job.to_state:
+            self._release(job, ERROR,
+                          'Load balancer %s is %s, expected %s.' %
+                          (job.loadbalancer_id, status, job.to_state))
+            return
+        with self._cond:
+            self._pending.pop(job.id, None)
+            job.state = RUNNING
+            job.updated_at = time.time()
+            if self._pool is None:
+                # Steps outlive the request which scheduled them, unlike the
+                # calls of utils.call_functions_parallel which the request
+                # waits for, so they get a pool of their own.
+                self._pool = ThreadPool(self.max_workers)
+        self._publish(job)
+        self._pool.apply_async(self._run, (job,))
+
+    def _run(self, job):
+        callback = job.callback
+        kwargs = {'loadbalancer_id': job.loadbalancer_id}
+        if job.callback_kwargs:
+            kwargs.update(job.callback_kwargs)
+        job.callback = None
+        self._local.job = job
+        try:
+            callback(job.request, **kwargs)
+        except Exception as e:
+            LOG.exception('Provisioning step %s failed for load balancer '
+                          '%s', callback.__name__, job.loadbalancer_id)
+            error = getattr(e, 'message', None) or str(e)
+        else:
+            error = None
+        finally:
+            self._local.job = None
+        with self._cond:
+            job.steps.append(callback.__name__)
+            if error:
+                job.finish(ERROR, error)
+            elif job.callback is None:
+                job.finish(COMPLETE)
+            else:
+                self._queue(job)
+        self._publish(job)
+
+    def _queue(self, job):
+        self._pending[job.id] = job
+        self._ensure_timer()
+        self._cond.notify()
+
+    def _release(self, job, state, error=None):
+        if error:
+            LOG.warning(error)
+        with self._cond:
+            self._pending.pop(job.id, None)
+            job.finish(state, error)
+        self._publish(job)
+
+    def _prune(self):
+        expired = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.done and job.updated_at < expired:
+                del self._jobs[job_id]
+
+    def _publish(self, job):
+        self._cache_set(_job_key(job.id), job.to_dict())
+
+    def _index(self, job):
+        # Not atomic between processes, a job listed at the same time by
+        # another process may be missing from the list, but not from
+        # get_job().
+        key = _project_key(job.project_id)
+        job_ids = [job_id for job_id in self._cache_get(key) or []
+                   if self._cache_get(_job_key(job_id)) is not None]
+        self._cache_set(key, job_ids + [job.id])
+
+    def _cache_get(self, key):
+        try:
+            return cache.get(key)
+        except Exception:
+            LOG.exception('Unable to get %s from the cache', key)
+            return None
+
+    def _cache_set(self, key, value):
+        # Published jobs outlive their last step by the retention time.
+        try:
+            cache.set(key, value, self.timeout + self.retention)
+        except Exception:
+            LOG.exception('Unable to put %s in the cache', key)
+
+
+def _job_key(job_id):
+    return 'lbaas-provisioning-job-%s' % job_id
+
+
+def _project_key(project_id):
+    return 'lbaas-provisioning-jobs-%s' % project_id
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ProvisioningScheduler()
+    return _scheduler
+
+
+def schedule(request, loadbalancer_id, callback, **kwargs):
+    return get_scheduler().schedule(request, loadbalancer_id, callback,
+                                    **kwargs)
+
+
+def get_job(job_id):
+    return get_scheduler().get_job(job_id)
+
+
+def list_jobs(project_id):
+    return get_scheduler().list_jobs(project_id)
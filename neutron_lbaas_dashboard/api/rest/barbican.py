@@ -27,6 +27,8 @@ from openstack_dashboard.api import keystone
 from openstack_dashboard.api.rest import urls
 from openstack_dashboard.api.rest import utils as rest_utils
 
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+
 
 @memoized
 def barbicanclient(request):
@@ -41,7 +43,9 @@ def barbicanclient(request):
                              request.user.token.id,
                              project_id=project_id,
                              project_domain_id=domain_id)
-    return barbican_client.Client(session=session.Session(auth=auth))
+    sess = instrumentation.instrument_session(
+        request, 'barbican', session.Session(auth=auth))
+    return barbican_client.Client(session=sess)
 
 
 @urls.register
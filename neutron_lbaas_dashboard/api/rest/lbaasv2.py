@@ -14,49 +14,21 @@
 """API over the neutron LBaaS v2 service.
 """
 
-from six.moves import _thread as thread
-from time import sleep
-
 from django.views import generic
 
-from horizon import conf
-
 from openstack_dashboard.api import network
-from openstack_dashboard.api import neutron
 from openstack_dashboard.api.rest import urls
 from openstack_dashboard.api.rest import utils as rest_utils
 
-neutronclient = neutron.neutronclient
-
+from neutron_lbaas_dashboard.api import lbaasv2
+from neutron_lbaas_dashboard.api import provisioning
+from contrail_openstack_dashboard.openstack_dashboard.api import utils
 
-def poll_loadbalancer_status(request, loadbalancer_id, callback,
-                             from_state='PENDING_UPDATE', to_state='ACTIVE',
-                             callback_kwargs=None):
-    """Poll for the status of the load balancer.
-
-    Polls for the status of the load balancer and calls a function when the
-    status changes to a specified state.
-
-    :param request: django request object
-    :param loadbalancer_id: id of the load balancer to poll
-    :param callback: function to call when polling is complete
-    :param from_state: initial expected state of the load balancer
-    :param to_state: state to check for
-    :param callback_kwargs: kwargs to pass into the callback function
-    """
-    interval = conf.HORIZON_CONFIG['ajax_poll_interval'] / 1000.0
-    status = from_state
-    while status == from_state:
-        sleep(interval)
-        lb = neutronclient(request).show_loadbalancer(
-            loadbalancer_id).get('loadbalancer')
-        status = lb['provisioning_status']
+neutronclient = utils.neutronclient
 
-    if status == to_state:
-        kwargs = {'loadbalancer_id': loadbalancer_id}
-        if callback_kwargs:
-            kwargs.update(callback_kwargs)
-        callback(request, **kwargs)
+# Number of provisioning cycles a member update is retried when its very
+# first change is rejected as conflicting.
+MEMBER_UPDATE_RETRIES = 3
 
 
 def create_loadbalancer(request):
@@ -72,15 +44,17 @@ def create_loadbalancer(request):
         spec['vip_address'] = data['loadbalancer']['ip']
     loadbalancer = neutronclient(request).create_loadbalancer(
         {'loadbalancer': spec}).get('loadbalancer')
+    lbaasv2.forget_vip_addresses(request)
     if data.get('listener'):
         # There is work underway to add a new API to LBaaS v2 that will
         # allow us to pass in all information at once. Until that is
-        # available we use a separate thread to poll for the load
+        # available we let the provisioning scheduler wait for the load
         # balancer status and create the other resources when it becomes
         # active.
-        args = (request, loadbalancer['id'], create_listener)
-        kwargs = {'from_state': 'PENDING_CREATE'}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
+        job = provisioning.schedule(request, loadbalancer['id'],
+                                    create_listener,
+                                    from_state='PENDING_CREATE')
+        loadbalancer['provisioning_job'] = job.id
     return loadbalancer
 
 
@@ -106,9 +80,10 @@ def create_listener(request, **kwargs):
         {'listener': listenerSpec}).get('listener')
 
     if data.get('pool'):
-        args = (request, kwargs['loadbalancer_id'], create_pool)
-        kwargs = {'callback_kwargs': {'listener_id': listener['id']}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
+        job = provisioning.schedule(
+            request, kwargs['loadbalancer_id'], create_pool,
+            callback_kwargs={'listener_id': listener['id']})
+        listener['provisioning_job'] = job.id
 
     return listener
 
@@ -130,15 +105,18 @@ def create_pool(request, **kwargs):
     pool = neutronclient(request).create_lbaas_pool(
         {'pool': poolSpec}).get('pool')
 
+    job = None
     if data.get('members'):
-        args = (request, kwargs['loadbalancer_id'], add_member)
-        kwargs = {'callback_kwargs': {'pool_id': pool['id'],
-                                      'index': 0}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
+        job = schedule_member_update(
+            request, kwargs['loadbalancer_id'], pool['id'],
+            [member['id'] for member in data['members']], [],
+            monitor_callback=create_health_monitor)
     elif data.get('monitor'):
-        args = (request, kwargs['loadbalancer_id'], create_health_monitor)
-        kwargs = {'callback_kwargs': {'pool_id': pool['id']}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
+        job = provisioning.schedule(
+            request, kwargs['loadbalancer_id'], create_health_monitor,
+            callback_kwargs={'pool_id': pool['id']})
+    if job is not None:
+        pool['provisioning_job'] = job.id
 
     return pool
 
@@ -165,81 +143,6 @@ def create_health_monitor(request, **kwargs):
         {'healthmonitor': monitorSpec}).get('healthmonitor')
 
 
-def add_member(request, **kwargs):
-    """Add a member to a pool.
-
-    """
-    data = request.DATA
-    members = data.get('members')
-    pool_id = kwargs.get('pool_id')
-
-    if kwargs.get('members_to_add'):
-        members_to_add = kwargs['members_to_add']
-        index = [members.index(member) for member in members
-                 if member['id'] == members_to_add[0]][0]
-        loadbalancer_id = data.get('loadbalancer_id')
-    else:
-        index = kwargs.get('index')
-        loadbalancer_id = kwargs.get('loadbalancer_id')
-
-    member = members[index]
-    memberSpec = {
-        'address': member['address'],
-        'protocol_port': member['port'],
-        'subnet_id': member['subnet']
-    }
-    if member.get('weight'):
-        memberSpec['weight'] = member['weight']
-
-    member = neutronclient(request).create_lbaas_member(
-        pool_id, {'member': memberSpec}).get('member')
-
-    index += 1
-    if kwargs.get('members_to_add'):
-        args = (request, loadbalancer_id, update_member_list)
-        members_to_add = kwargs['members_to_add']
-        members_to_add.pop(0)
-        kwargs = {'callback_kwargs': {
-            'existing_members': kwargs.get('existing_members'),
-            'members_to_add': members_to_add,
-            'members_to_delete': kwargs.get('members_to_delete'),
-            'pool_id': pool_id}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
-    elif len(members) > index:
-        args = (request, loadbalancer_id, add_member)
-        kwargs = {'callback_kwargs': {'pool_id': pool_id,
-                                      'index': index}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
-    elif data.get('monitor'):
-        args = (request, loadbalancer_id, create_health_monitor)
-        kwargs = {'callback_kwargs': {'pool_id': pool_id}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
-
-    return member
-
-
-def remove_member(request, **kwargs):
-    """Remove a member from the pool.
-
-    """
-    data = request.DATA
-    loadbalancer_id = data.get('loadbalancer_id')
-    pool_id = kwargs.get('pool_id')
-
-    if kwargs.get('members_to_delete'):
-        members_to_delete = kwargs['members_to_delete']
-        member_id = members_to_delete.pop(0)
-
-        neutronclient(request).delete_lbaas_member(member_id, pool_id)
-
-        args = (request, loadbalancer_id, update_member_list)
-        kwargs = {'callback_kwargs': {
-            'existing_members': kwargs.get('existing_members'),
-            'members_to_add': kwargs.get('members_to_add'),
-            'members_to_delete': members_to_delete}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
-
-
 def update_loadbalancer(request, **kwargs):
     """Update a load balancer.
 
@@ -274,8 +177,8 @@ def update_listener(request, **kwargs):
         listener_id, {'listener': listener_spec}).get('listener')
 
     if data.get('pool'):
-        args = (request, loadbalancer_id, update_pool)
-        thread.start_new_thread(poll_loadbalancer_status, args)
+        job = provisioning.schedule(request, loadbalancer_id, update_pool)
+        listener['provisioning_job'] = job.id
 
     return listener
 
@@ -294,8 +197,8 @@ def update_pool(request, **kwargs):
     if data['pool'].get('description'):
         pool_spec['description'] = data['pool']['description']
 
-    pools = neutronclient(request).update_lbaas_pool(
-        pool_id, {'pool': pool_spec}).get('pools')
+    pool = neutronclient(request).update_lbaas_pool(
+        pool_id, {'pool': pool_spec}).get('pool')
 
     # Assemble the lists of member id's to add and remove, if any exist
     tenant_id = request.user.project_id
@@ -305,18 +208,16 @@ def update_pool(request, **kwargs):
     (members_to_add, members_to_delete) = get_members_to_add_remove(
         request_member_data, existing_members)
 
+    job = None
     if members_to_add or members_to_delete:
-        args = (request, loadbalancer_id, update_member_list)
-        kwargs = {'callback_kwargs': {'existing_members': existing_members,
-                                      'members_to_add': members_to_add,
-                                      'members_to_delete': members_to_delete,
-                                      'pool_id': pool_id}}
-        thread.start_new_thread(poll_loadbalancer_status, args, kwargs)
+        job = schedule_member_update(request, loadbalancer_id, pool_id,
+                                     members_to_add, members_to_delete)
     elif data.get('monitor'):
-        args = (request, loadbalancer_id, update_monitor)
-        thread.start_new_thread(poll_loadbalancer_status, args)
+        job = provisioning.schedule(request, loadbalancer_id, update_monitor)
+    if job is not None:
+        pool['provisioning_job'] = job.id
 
-    return pools
+    return pool
 
 
 def update_monitor(request, **kwargs):
@@ -346,32 +247,107 @@ def update_monitor(request, **kwargs):
     return healthmonitor
 
 
+def _member_spec(member):
+    spec = {
+        'address': member['address'],
+        'protocol_port': member['port'],
+        'subnet_id': member['subnet']
+    }
+    if member.get('weight'):
+        spec['weight'] = member['weight']
+    return spec
+
+
+def schedule_member_update(request, loadbalancer_id, pool_id,
+                           members_to_add, members_to_delete,
+                           monitor_callback=None):
+    """Schedule the addition and removal of pool members.
+
+    The members to add are looked up by id in the "members" of the
+    request data. Every member starts out as QUEUED in the results of the
+    returned provisioning job.
+    """
+    job = provisioning.schedule(
+        request, loadbalancer_id, update_member_list,
+        callback_kwargs={'pool_id': pool_id,
+                         'members_to_add': list(members_to_add),
+                         'members_to_delete': list(members_to_delete),
+                         'monitor_callback': monitor_callback})
+    for action, member_ids in (('delete', members_to_delete),
+                               ('add', members_to_add)):
+        for member_id in member_ids:
+            job.results.setdefault(member_id, {'action': action,
+                                               'state': provisioning.QUEUED})
+    return job
+
+
 def update_member_list(request, **kwargs):
     """Update the list of members by adding or removing the necessary members.
 
+    The changes are sent back to back until the backend rejects one with
+    409 because the load balancer is busy, and the remaining ones are
+    retried once it is ACTIVE again. LBaaS v2 has no bulk member call and
+    puts the load balancer in PENDING_UPDATE as soon as it accepts a
+    change, so with the reference drivers the second change of a cycle
+    nearly always gets the 409: expect one change per provisioning cycle,
+    at the cost of one rejected call per cycle. Only drivers which accept
+    several changes at once get them in a single cycle. The outcome for
+    each member is recorded in the results of the provisioning job.
     """
     data = request.DATA
-    loadbalancer_id = data.get('loadbalancer_id')
+    loadbalancer_id = kwargs.get('loadbalancer_id')
     pool_id = kwargs.get('pool_id')
-    existing_members = kwargs.get('existing_members')
-    members_to_add = kwargs.get('members_to_add')
-    members_to_delete = kwargs.get('members_to_delete')
-
-    if members_to_delete:
-        kwargs = {'existing_members': existing_members,
-                  'members_to_add': members_to_add,
-                  'members_to_delete': members_to_delete,
-                  'pool_id': pool_id}
-        remove_member(request, **kwargs)
-    elif members_to_add:
-        kwargs = {'existing_members': existing_members,
-                  'members_to_add': members_to_add,
-                  'members_to_delete': members_to_delete,
-                  'pool_id': pool_id}
-        add_member(request, **kwargs)
+    monitor_callback = kwargs.get('monitor_callback') or update_monitor
+    retries = kwargs.get('retries', 0)
+    members = dict((member.get('id'), member)
+                   for member in data.get('members', []))
+    changes = ([('delete', member_id)
+                for member_id in kwargs.get('members_to_delete') or []] +
+               [('add', member_id)
+                for member_id in kwargs.get('members_to_add') or []])
+
+    job = provisioning.get_scheduler().current_job()
+    results = job.results if job is not None else {}
+    client = neutronclient(request)
+
+    deferred = []
+    for index, (action, member_id) in enumerate(changes):
+        try:
+            if action == 'delete':
+                client.delete_lbaas_member(member_id, pool_id)
+            else:
+                client.create_lbaas_member(
+                    pool_id, {'member': _member_spec(members[member_id])})
+        except Exception as e:
+            busy = getattr(e, 'status_code', None) == 409
+            # A conflict on the first change of a cycle means somebody
+            # else is changing the load balancer, only retry that a few
+            # times.
+            if busy and (index > 0 or retries < MEMBER_UPDATE_RETRIES):
+                deferred = changes[index:]
+                break
+            results[member_id] = {'action': action,
+                                  'state': provisioning.ERROR,
+                                  'error': getattr(e, 'message', None) or
+                                  str(e)}
+        else:
+            results[member_id] = {'action': action,
+                                  'state': provisioning.COMPLETE}
+
+    if deferred:
+        provisioning.schedule(
+            request, loadbalancer_id, update_member_list,
+            callback_kwargs={
+                'pool_id': pool_id,
+                'members_to_add': [member_id for action, member_id
+                                   in deferred if action == 'add'],
+                'members_to_delete': [member_id for action, member_id
+                                      in deferred if action == 'delete'],
+                'monitor_callback': monitor_callback,
+                'retries': retries + 1 if deferred == changes else 0})
     elif data.get('monitor'):
-        args = (request, loadbalancer_id, update_monitor)
-        thread.start_new_thread(poll_loadbalancer_status, args)
+        provisioning.schedule(request, loadbalancer_id, monitor_callback,
+                              callback_kwargs={'pool_id': pool_id})
 
 
 def get_members_to_add_remove(request_member_data, existing_members):
@@ -384,18 +360,47 @@ def get_members_to_add_remove(request_member_data, existing_members):
     return members_to_add, members_to_delete
 
 
+def get_pool_child_resources(request, pool):
+    """Get the members and the health monitor of a pool.
+
+    They are fetched concurrently. The result is a dict with the members
+    as 'members' and the health monitor as 'monitor', for those the pool
+    has.
+    """
+    def _members():
+        return neutronclient(request).list_lbaas_members(
+            pool['id'], tenant_id=request.user.project_id).get('members')
+
+    def _monitor():
+        return neutronclient(request).show_lbaas_healthmonitor(
+            pool['healthmonitor_id']).get('healthmonitor')
+
+    calls = []
+    if pool.get('members'):
+        calls.append(('members', _members))
+    if pool.get('healthmonitor_id'):
+        calls.append(('monitor', _monitor))
+    return dict(zip([name for name, func in calls],
+                    utils.call_functions_parallel(
+                        *[func for name, func in calls])))
+
+
 def add_floating_ip_info(request, loadbalancers):
     """Add floating IP address info to each load balancer.
 
+    Only the floating IPs of the VIP ports of the load balancers are
+    listed, and each load balancer gets the one of its VIP address on its
+    own VIP port.
     """
-    floating_ips = network.tenant_floating_ip_list(request)
+    floating_ips = lbaasv2.vip_floating_ips(
+        request, [lb.get('vip_port_id') for lb in loadbalancers])
     for lb in loadbalancers:
         floating_ip = {}
-        associated_ip = next((fip for fip in floating_ips
-                              if fip['fixed_ip'] == lb['vip_address']), None)
-        if associated_ip is not None:
-            floating_ip['id'] = associated_ip['id']
-            floating_ip['ip'] = associated_ip['ip']
+        for fip in floating_ips.get(lb.get('vip_port_id'), []):
+            if fip['fixed_ip_address'] == lb['vip_address']:
+                floating_ip['id'] = fip['id']
+                floating_ip['ip'] = fip['floating_ip_address']
+                break
         lb['floating_ip'] = floating_ip
 
 
@@ -463,6 +468,35 @@ class LoadBalancer(generic.View):
         http://localhost/api/lbaas/loadbalancers/cc758c90-3d98-4ea1-af44-aab405c9c915
         """
         neutronclient(request).delete_loadbalancer(loadbalancer_id)
+        lbaasv2.forget_vip_addresses(request)
+
+
+@urls.register
+class LoadBalancerTree(generic.View):
+    """API for retrieving a load balancer with the resources below it.
+
+    """
+    url_regex = r'lbaas/loadbalancers/(?P<loadbalancer_id>[^/]+)/tree/$'
+
+    @rest_utils.ajax()
+    def get(self, request, loadbalancer_id):
+        """Get a load balancer with its listeners, pools, members and monitors.
+
+        The param 'depth' limits the levels of resources returned below the
+        load balancer: 1 for the listeners, 2 for their pools and 3, the
+        default, for the members and health monitors of the pools.
+
+        http://localhost/api/lbaas/loadbalancers/cc758c90-3d98-4ea1-af44-aab405c9c915/tree/?depth=2
+        """
+        try:
+            depth = int(request.GET.get('depth', lbaasv2.TREE_DEPTH))
+        except ValueError:
+            raise rest_utils.AjaxError(400, 'depth must be an integer.')
+        loadbalancer = lbaasv2.loadbalancer_tree(request, loadbalancer_id,
+                                                 depth)
+        if request.GET.get('full') and network.floating_ip_supported(request):
+            add_floating_ip_info(request, [loadbalancer])
+        return loadbalancer
 
 
 @urls.register
@@ -536,18 +570,7 @@ class Listener(generic.View):
                 pool = neutronclient(request).show_lbaas_pool(
                     pool_id).get('pool')
                 resources['pool'] = pool
-
-                if pool.get('members'):
-                    tenant_id = request.user.project_id
-                    members = neutronclient(request).list_lbaas_members(
-                        pool_id, tenant_id=tenant_id).get('members')
-                    resources['members'] = members
-
-                if pool.get('healthmonitor_id'):
-                    monitor_id = pool['healthmonitor_id']
-                    monitor = neutronclient(request).show_lbaas_healthmonitor(
-                        monitor_id).get('healthmonitor')
-                    resources['monitor'] = monitor
+                resources.update(get_pool_child_resources(request, pool))
 
             return resources
         else:
@@ -559,7 +582,7 @@ class Listener(generic.View):
 
         """
         kwargs = {'listener_id': listener_id}
-        update_listener(request, **kwargs)
+        return update_listener(request, **kwargs)
 
     @rest_utils.ajax()
     def delete(self, request, listener_id):
@@ -611,18 +634,7 @@ class Pool(generic.View):
         if request.GET.get('includeChildResources'):
             resources = {}
             resources['pool'] = pool
-
-            if pool.get('members'):
-                tenant_id = request.user.project_id
-                members = neutronclient(request).list_lbaas_members(
-                    pool_id, tenant_id=tenant_id).get('members')
-                resources['members'] = members
-
-            if pool.get('healthmonitor_id'):
-                monitor_id = pool['healthmonitor_id']
-                monitor = neutronclient(request).show_lbaas_healthmonitor(
-                    monitor_id).get('healthmonitor')
-                resources['monitor'] = monitor
+            resources.update(get_pool_child_resources(request, pool))
 
             return resources
         else:
@@ -634,7 +646,7 @@ class Pool(generic.View):
 
         """
         kwargs = {'pool_id': pool_id}
-        update_pool(request, **kwargs)
+        return update_pool(request, **kwargs)
 
     @rest_utils.ajax()
     def delete(self, request, pool_id):
@@ -667,6 +679,9 @@ class Members(generic.View):
     def put(self, request, pool_id):
         """Update the list of members for the current project.
 
+        The changes are made in the background. If there are any, the
+        id of the provisioning job reporting on each member is returned
+        as "provisioning_job".
         """
         # Assemble the lists of member id's to add and remove, if any exist
         tenant_id = request.user.project_id
@@ -677,11 +692,10 @@ class Members(generic.View):
             request_member_data, existing_members)
 
         if members_to_add or members_to_delete:
-            kwargs = {'existing_members': existing_members,
-                      'members_to_add': members_to_add,
-                      'members_to_delete': members_to_delete,
-                      'pool_id': pool_id}
-            update_member_list(request, **kwargs)
+            job = schedule_member_update(
+                request, request.DATA.get('loadbalancer_id'), pool_id,
+                members_to_add, members_to_delete)
+            return {'provisioning_job': job.id}
 
 
 @urls.register
@@ -759,3 +773,38 @@ class HealthMonitor(generic.View):
 
         """
         update_monitor(request)
+
+
+@urls.register
+class ProvisioningJobs(generic.View):
+    """API for the provisioning jobs of the current project.
+
+    """
+    url_regex = r'lbaas/jobs/$'
+
+    @rest_utils.ajax()
+    def get(self, request):
+        """List the provisioning jobs for the current project.
+
+        The listing result is an object with property "items".
+        """
+        return {'items': provisioning.list_jobs(request.user.project_id)}
+
+
+@urls.register
+class ProvisioningJob(generic.View):
+    """API for retrieving the progress of a single provisioning job.
+
+    """
+    url_regex = r'lbaas/jobs/(?P<job_id>[^/]+)/$'
+
+    @rest_utils.ajax()
+    def get(self, request, job_id):
+        """Get a specific provisioning job.
+
+        http://localhost/api/lbaas/jobs/6f1c0e8a1e4b4b0c9a3bd2b8d2a1f0c7
+        """
+        job = provisioning.get_job(job_id)
+        if job is None or job['project_id'] != request.user.project_id:
+            raise rest_utils.AjaxError(404, 'Provisioning job not found.')
+        return job
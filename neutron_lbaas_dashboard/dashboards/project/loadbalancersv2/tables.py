@@ -140,19 +140,25 @@ def convert_status(value):
 
 
 def get_lb_method(value):
+    if not value.pool:
+        return ''
     return value.pool['lb_algorithm']
 
 
 def get_protocol(value):
+    if not value.listener:
+        return ''
     return value.listener['protocol']
 
 
 def get_monitor(value):
+    if not value['pool'] or not value['pool']['monitors']:
+        return ''
     return value['pool']['monitors']['type']
 
 
 def get_lb(instance):
-    if hasattr(instance, "vip_address"):
+    if hasattr(instance, "vip_address") and instance.listener:
         return "%s:%s" % (instance.vip_address,
                           instance.listener['protocol_port'])
     return _("Not available")
@@ -188,6 +194,8 @@ class LoadBalancersTable(tables.DataTable):
         name = "loadbalancersv2"
         verbose_name = _("Load Balancers")
         row_class = UpdateRow
+        pagination_param = "loadbalancer_marker"
+        prev_pagination_param = "prev_loadbalancer_marker"
         table_actions = (LaunchLink, TerminateLoadBalancer)
         row_actions = (EditLoadBalancer, TerminateLoadBalancer,
                        EnableLoadBalancer, DisableLoadBalancer)
@@ -17,6 +17,7 @@ from django.conf.urls import url
 
 from .views import DetailView  # noqa
 from .views import IndexView  # noqa
+from .views import InstancesView  # noqa
 from .views import LaunchLoadBalancerView  # noqa
 from .views import UpdateView  # noqa
 
@@ -29,6 +30,8 @@ urlpatterns = patterns(VIEW_MOD,
                        url(r'^$', IndexView.as_view(), name='index'),
                        url(r'^launch$',
                            LaunchLoadBalancerView.as_view(), name='launch'),
+                       url(r'^instances/$',
+                           InstancesView.as_view(), name='instances'),
                        url(r'^(?P<loadbalancer_id>[^/]+)/$',
                            DetailView.as_view(), name='detail'),
                        url(INSTANCES %
@@ -12,11 +12,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import logging
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
+from django import http
 from django.utils.translation import ugettext_lazy as _
+from django.views import generic
 
 from horizon import exceptions
 from horizon import tables
@@ -38,10 +42,28 @@ class IndexView(tables.DataTableView):
     table_class = LoadBalancersTable
     template_name = 'project/loadbalancersv2/index.html'
 
+    def has_prev_data(self, table):
+        return self._prev
+
+    def has_more_data(self, table):
+        return self._more
+
     def get_data(self):
         pools = []
+        self._prev = self._more = False
+        prev_marker = self.request.GET.get(
+            LoadBalancersTable._meta.prev_pagination_param, None)
+        if prev_marker is not None:
+            marker = prev_marker
+        else:
+            marker = self.request.GET.get(
+                LoadBalancersTable._meta.pagination_param, None)
+        reversed_order = prev_marker is not None
         try:
-            pools = api.lbaasv2.list_loadbalancers(self.request)
+            pools, self._more, self._prev = \
+                api.lbaasv2.list_loadbalancers(
+                    self.request, marker=marker, paginate=True,
+                    reversed_order=reversed_order)
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve pools list.'))
@@ -59,6 +81,36 @@ class LaunchLoadBalancerView(workflows.WorkflowView):
         return initial
 
 
+class InstancesView(generic.View):
+    """A page of the instances which can be members, as JSON.
+
+    The query string may give the text to search the names and addresses
+    for as q, the id of the last instance of the previous page as marker
+    and the size of the page as limit.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = int(request.GET.get('limit') or 0)
+        except ValueError:
+            limit = 0
+        limit = min(limit, getattr(settings, 'API_RESULT_LIMIT', 1000))
+        try:
+            instances, has_more_data = api.instances.search(
+                request, query=request.GET.get('q'),
+                marker=request.GET.get('marker'), limit=limit or None)
+        except Exception:
+            LOG.exception('Unable to retrieve instances')
+            return http.HttpResponse(
+                json.dumps({'error': str(_('Unable to retrieve instances '
+                                           'list.'))}),
+                status=500, content_type='application/json')
+        return http.HttpResponse(
+            json.dumps({'items': instances,
+                        'has_more_data': has_more_data}),
+            content_type='application/json')
+
+
 class UpdateView(workflows.WorkflowView):
     workflow_class = UpdateLoadBalancer
     template_name = 'project/loadbalancersv2/update.html'
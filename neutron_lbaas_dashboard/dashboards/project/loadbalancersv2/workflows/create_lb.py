@@ -19,8 +19,6 @@ from horizon import exceptions
 from horizon import forms
 from horizon import workflows
 
-from openstack_dashboard.api import nova
-
 from neutron_lbaas_dashboard import api
 
 LOG = logging.getLogger(__name__)
@@ -42,7 +40,6 @@ class SetLBDetailsAction(workflows.Action):
                                   help_text=_("Provide Load Balancer "
                                               "Description."))
 
-    all_vips = None
     is_update = False
 
     LOAD_BALANCING_CHOICES = (
@@ -79,13 +76,6 @@ class SetLBDetailsAction(workflows.Action):
 
     def __init__(self, request, *args, **kwargs):
         super(SetLBDetailsAction, self).__init__(request, *args, **kwargs)
-        self.all_vips = []
-        try:
-            # todo - this should be obtained in view via an initial method
-            self.all_vips = api.lbaasv2.list_loadbalancers(request)
-        except Exception:
-            pass
-
         if len(self.fields['address'].choices) == 0:
             del self.fields['address']
 
@@ -104,21 +94,20 @@ class SetLBDetailsAction(workflows.Action):
                                               "the load balancing method."))
 
         if not self.is_update:
-            all_vips = self.all_vips
-            ipPortCombo = []
-            for vip in all_vips:
-                vip = vip.readable()
-                ipPortCombo.append('%s:%s' % (vip.address, vip.port))
+            try:
+                vip_addresses = api.lbaasv2.vip_addresses(self.request)
+            except Exception:
+                vip_addresses = None
 
             data = self.data
-            if 'address' in data \
+            if vip_addresses is not None \
+                    and 'address' in data \
                     and data['address'] != 'new' \
                     and data['address'] != '':
-                address = data['address']
+                address = data['address'].split(':')[0]
                 selected_lb_port = data['port']
-                selected_ip_port_combo = '%s:%s' % (address.split(':')[0],
-                                                    selected_lb_port)
-                if selected_ip_port_combo in ipPortCombo:
+                selected_ip_port_combo = '%s:%s' % (address, selected_lb_port)
+                if vip_addresses.in_use(address, selected_lb_port):
                     raise forms.ValidationError(_('Requested IP and port '
                                                   'combination already '
                                                   'exists %s ') %
@@ -135,24 +124,9 @@ class SetLBDetailsAction(workflows.Action):
         if self.is_update:
             return []
         try:
-            vips = api.lbaasv2.list_loadbalancers(request)
-            if len(vips) == 0:
-                return []
-
-            distict_ips = set()
-            for vip in vips:
-                vip = vip.readable()
-                distict_ips.add(vip.address)
-
-            existing = []
-            for vip in vips:
-                vip = vip.readable()
-                if vip.address in distict_ips:
-                    item = ("%s:%s:%s" %
-                            (vip.address, vip.name, 443),
-                            "%s" % vip.address)
-                    existing.append(item)
-                    distict_ips.remove(vip.address)
+            vip_addresses = api.lbaasv2.vip_addresses(request)
+            existing = [("%s:%s:%s" % (address, name, 443), "%s" % address)
+                        for address, name in vip_addresses.names.items()]
 
             vip_list = []
             if len(existing) > 0:
@@ -251,7 +225,6 @@ class UploadSSLStep(workflows.Step):
 
 
 class SelectInstancesAction(workflows.MembershipAction):
-    instance_details = {}
 
     def __init__(self, request, *args, **kwargs):
         super(SelectInstancesAction, self).__init__(request, *args, **kwargs)
@@ -267,42 +240,33 @@ class SelectInstancesAction(workflows.MembershipAction):
         self.fields[role_member_field_name] = forms.MultipleChoiceField(
             required=False, label='')
 
-        # Get list of available instances
-        all_instances = []
+        # Only the first page of instances is offered, the others are
+        # searched for through the instances view. The selected ones are
+        # offered as well so that they validate.
+        instances = []
         try:
-            all_instances, has_more_data = nova.server_list(request)
+            instances, has_more_data = api.instances.search(request)
+            selected = self.get_selected_addresses(args[0] if args else {})
+            if selected:
+                instances.extend(
+                    i for i in api.instances.lookup(request,
+                                                    selected).values()
+                    if i not in instances)
         except Exception:
             exceptions.handle(request, err_msg)
 
-        available_instances = []
-        for instance in all_instances:
-            # skip shutoff instances
-            # if instance.status == 'SHUTOFF':
-            #     continue
-            instance_ip = self.get_ip(instance)
-            # skip instances which has no network
-            if not instance_ip:
-                continue
-            key = instance_ip
-            value = instance.name + ' (' + self.get_ip(instance) + ')'
-            available_instances.append((key, value))
-            self.instance_details[instance_ip] = (instance.name, instance.id)
-
-        self.fields[self.get_member_field_name('member')].\
-            choices = available_instances
-
-    def get_ip(self, instance):
-        ipaddress = None
-        for networks in instance.addresses.itervalues():
-            for ip in networks:
-                # only one IP present
-                ipaddress = ip
-                break
-        if ipaddress is not None:
-            addr = ipaddress["addr"]
-        else:
-            addr = None  # '10.10.10.10'
-        return addr
+        # (name, id) of the offered instances by address
+        self.instance_details = dict(
+            (i['address'], (i['name'], i['id'])) for i in instances)
+        self.fields[role_member_field_name].choices = [
+            (i['address'], '%s (%s)' % (i['name'], i['address']))
+            for i in instances]
+
+    def get_selected_addresses(self, context):
+        """Return the addresses of the instances selected so far."""
+        if self.is_bound:
+            return self.data.getlist(self.get_member_field_name('member'))
+        return []
 
     def clean(self):
         cleaned_data = super(SelectInstancesAction, self).clean()
@@ -330,7 +294,7 @@ class SelectInstancesStep(workflows.UpdateMembersStep):
     show_roles = False
     contributes = (
         "wanted_members", "instances_details", "monitor", "instance_port")
-    template_name = "horizon/common/_workflow_step_update_members.html"
+    template_name = "project/loadbalancersv2/_select_instances.html"
 
     def contribute(self, data, context):
         request = self.workflow.request
@@ -125,6 +125,12 @@ class UpdateInstancesAction(SelectInstancesAction):
             exceptions.handle(request, err_msg)
         self.fields[self.get_member_field_name('member')].initial = pre_selectd
 
+    def get_selected_addresses(self, context):
+        if self.is_bound:
+            return super(UpdateInstancesAction,
+                         self).get_selected_addresses(context)
+        return context.get('selected_members') or []
+
     class Meta(object):
         name = _("Instances")
         slug = "select_instances"
@@ -38,6 +38,7 @@
     var service = {
       getLoadBalancers: getLoadBalancers,
       getLoadBalancer: getLoadBalancer,
+      getLoadBalancerTree: getLoadBalancerTree,
       deleteLoadBalancer: deleteLoadBalancer,
       createLoadBalancer: createLoadBalancer,
       editLoadBalancer: editLoadBalancer,
@@ -57,7 +58,9 @@
       deleteHealthMonitor: deleteHealthMonitor,
       createHealthMonitor: createHealthMonitor,
       editHealthMonitor: editHealthMonitor,
-      updateMemberList: updateMemberList
+      updateMemberList: updateMemberList,
+      getProvisioningJobs: getProvisioningJobs,
+      getProvisioningJob: getProvisioningJob
     };
 
     return service;
@@ -100,6 +103,27 @@
         });
     }
 
+    /**
+     * @name horizon.app.core.openstack-service-api.lbaasv2.getLoadBalancerTree
+     * @description
+     * Get a single load balancer by ID along with its listeners, their pools and the
+     * members and health monitors of the pools, in a single request.
+     * @param {string} id
+     * Specifies the id of the load balancer to request.
+     * @param {boolean} full
+     * If truthy, the floating IP address of the load balancer is included.
+     * @param {number} depth
+     * Optional number of levels of resources to include below the load balancer.
+     */
+
+    function getLoadBalancerTree(id, full, depth) {
+      var params = { full: full, depth: depth };
+      return apiService.get('/api/lbaas/loadbalancers/' + id + '/tree/', { params: params })
+        .error(function () {
+          toastService.add('error', gettext('Unable to retrieve load balancer.'));
+        });
+    }
+
     /**
      * @name horizon.app.core.openstack-service-api.lbaasv2.deleteLoadBalancer
      * @description
@@ -445,5 +469,38 @@
         });
     }
 
+    // Provisioning Jobs
+
+    /**
+     * @name horizon.app.core.openstack-service-api.lbaasv2.getProvisioningJobs
+     * @description
+     * Get the list of provisioning jobs for the current project.
+     *
+     * The listing result is an object with property "items". Each item is
+     * a provisioning job.
+     */
+
+    function getProvisioningJobs() {
+      return apiService.get('/api/lbaas/jobs/')
+        .error(function () {
+          toastService.add('error', gettext('Unable to retrieve provisioning jobs.'));
+        });
+    }
+
+    /**
+     * @name horizon.app.core.openstack-service-api.lbaasv2.getProvisioningJob
+     * @description
+     * Get the progress of a single provisioning job by ID.
+     * @param {string} id
+     * Specifies the id of the provisioning job to request.
+     */
+
+    function getProvisioningJob(id) {
+      return apiService.get('/api/lbaas/jobs/' + id + '/')
+        .error(function () {
+          toastService.add('error', gettext('Unable to retrieve provisioning job.'));
+        });
+    }
+
   }
 }());
@@ -52,6 +52,14 @@
         testInput: [ '1234', true ],
         data: { params: { full: true } }
       },
+      {
+        func: 'getLoadBalancerTree',
+        method: 'get',
+        path: '/api/lbaas/loadbalancers/1234/tree/',
+        error: 'Unable to retrieve load balancer.',
+        testInput: [ '1234', true, 2 ],
+        data: { params: { full: true, depth: 2 } }
+      },
       {
         func: 'deleteLoadBalancer',
         method: 'delete',
@@ -227,6 +235,19 @@
         error: 'Unable to update member list.',
         data: { name: 'member-1' },
         testInput: [ '1234', { name: 'member-1' } ]
+      },
+      {
+        func: 'getProvisioningJobs',
+        method: 'get',
+        path: '/api/lbaas/jobs/',
+        error: 'Unable to retrieve provisioning jobs.'
+      },
+      {
+        func: 'getProvisioningJob',
+        method: 'get',
+        path: '/api/lbaas/jobs/1234/',
+        error: 'Unable to retrieve provisioning job.',
+        testInput: [ '1234' ]
       }
     ];
 
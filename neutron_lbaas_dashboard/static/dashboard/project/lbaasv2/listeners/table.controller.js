@@ -24,7 +24,8 @@
     'horizon.app.core.openstack-service-api.lbaasv2',
     '$routeParams',
     'horizon.dashboard.project.lbaasv2.listeners.actions.rowActions',
-    'horizon.dashboard.project.lbaasv2.listeners.actions.batchActions'
+    'horizon.dashboard.project.lbaasv2.listeners.actions.batchActions',
+    'horizon.dashboard.project.lbaasv2.loadbalancers.service'
   ];
 
   /**
@@ -38,10 +39,12 @@
    * @param $routeParams The angular $routeParams service.
    * @param rowActions The listener row actions service.
    * @param batchActions The listener batch actions service.
+   * @param loadBalancersService The LBaaS v2 load balancers service.
    * @returns undefined
    */
 
-  function ListenersTableController(api, $routeParams, rowActions, batchActions) {
+  function ListenersTableController(api, $routeParams, rowActions, batchActions,
+                                    loadBalancersService) {
 
     var ctrl = this;
     ctrl.items = [];
@@ -56,7 +59,15 @@
     ////////////////////////////////
 
     function init() {
-      api.getListeners(ctrl.loadbalancerId).success(success);
+      // On the load balancer detail page the listeners are loaded along with the load balancer.
+      var listeners = loadBalancersService.takeListeners(ctrl.loadbalancerId);
+      if (listeners) {
+        listeners.then(function(items) {
+          ctrl.src = items;
+        });
+      } else {
+        api.getListeners(ctrl.loadbalancerId).success(success);
+      }
     }
 
     function success(response) {
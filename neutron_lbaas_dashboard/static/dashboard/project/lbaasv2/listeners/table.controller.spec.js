@@ -17,7 +17,7 @@
   'use strict';
 
   describe('LBaaS v2 Listeners Table Controller', function() {
-    var controller, lbaasv2API, rowActions, batchActions;
+    var controller, lbaasv2API, rowActions, batchActions, loadBalancersService, $scope, $q;
     var items = [];
 
     function fakeAPI() {
@@ -47,9 +47,13 @@
     beforeEach(inject(function($injector) {
       lbaasv2API = $injector.get('horizon.app.core.openstack-service-api.lbaasv2');
       controller = $injector.get('$controller');
+      $scope = $injector.get('$rootScope').$new();
+      $q = $injector.get('$q');
       rowActions = $injector.get('horizon.dashboard.project.lbaasv2.listeners.actions.rowActions');
       batchActions = $injector.get(
           'horizon.dashboard.project.lbaasv2.listeners.actions.batchActions');
+      loadBalancersService = $injector.get(
+          'horizon.dashboard.project.lbaasv2.loadbalancers.service');
       spyOn(rowActions, 'init').and.callFake(initMock);
       spyOn(lbaasv2API, 'getListeners').and.callFake(fakeAPI);
     }));
@@ -83,5 +87,22 @@
       expect(lbaasv2API.getListeners).toHaveBeenCalled();
     });
 
+    it('should take the listeners of the load balancer detail page', function() {
+      var listeners = [{ id: '5678' }];
+      loadBalancersService.setListeners('1234', $q.when(listeners));
+      var ctrl = createController();
+      $scope.$apply();
+      expect(lbaasv2API.getListeners).not.toHaveBeenCalled();
+      expect(ctrl.src).toBe(listeners);
+    });
+
+    it('should only take the listeners of its load balancer', function() {
+      loadBalancersService.setListeners('5678', $q.when([{ id: '5678' }]));
+      var ctrl = createController();
+      $scope.$apply();
+      expect(lbaasv2API.getListeners).toHaveBeenCalledWith('1234');
+      expect(ctrl.src).toEqual(items);
+    });
+
   });
 })();
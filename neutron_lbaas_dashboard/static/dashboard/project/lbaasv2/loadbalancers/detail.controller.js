@@ -60,7 +60,14 @@
     ////////////////////////////////
 
     function init() {
-      api.getLoadBalancer($routeParams.loadbalancerId, true).success(success);
+      // The listeners, pools, members and monitors come along with the load balancer, the
+      // listeners are handed over to the listeners table of the page.
+      var listeners = api.getLoadBalancerTree($routeParams.loadbalancerId, true)
+        .success(success)
+        .then(function(response) {
+          return response.data.listeners;
+        });
+      loadBalancersService.setListeners($routeParams.loadbalancerId, listeners);
     }
 
     function success(response) {
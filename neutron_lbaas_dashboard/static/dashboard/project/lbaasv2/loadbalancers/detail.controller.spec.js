@@ -17,12 +17,18 @@
   'use strict';
 
   describe('LBaaS v2 Load Balancer Detail Controller', function() {
-    var lbaasv2API, ctrl, $scope, $window;
+    var lbaasv2API, loadBalancersService, ctrl, $scope, $window, $q;
+
+    var listeners = [{ id: '5678' }];
 
     function fakeAPI() {
       return {
         success: function(callback) {
-          callback({ id: '1234' });
+          callback({ id: '1234', listeners: listeners });
+          return this;
+        },
+        then: function(callback) {
+          return $q.when({ data: { id: '1234', listeners: listeners } }).then(callback);
         }
       };
     }
@@ -40,8 +46,11 @@
     }));
 
     beforeEach(inject(function($injector) {
+      $q = $injector.get('$q');
       lbaasv2API = $injector.get('horizon.app.core.openstack-service-api.lbaasv2');
-      spyOn(lbaasv2API, 'getLoadBalancer').and.callFake(fakeAPI);
+      loadBalancersService = $injector.get(
+          'horizon.dashboard.project.lbaasv2.loadbalancers.service');
+      spyOn(lbaasv2API, 'getLoadBalancerTree').and.callFake(fakeAPI);
       $scope = $injector.get('$rootScope').$new();
       $window = {};
       var controller = $injector.get('$controller');
@@ -53,7 +62,17 @@
     }));
 
     it('should invoke lbaasv2 apis', function() {
-      expect(lbaasv2API.getLoadBalancer).toHaveBeenCalledWith('1234', true);
+      expect(lbaasv2API.getLoadBalancerTree).toHaveBeenCalledWith('1234', true);
+      expect(ctrl.loadbalancer.id).toBe('1234');
+    });
+
+    it('should hand the listeners over to the listeners table', function() {
+      var result;
+      loadBalancersService.takeListeners('1234').then(function(items) {
+        result = items;
+      });
+      $scope.$apply();
+      expect(result).toBe(listeners);
     });
 
     it('should save changes to listeners tab active state', function() {
@@ -52,10 +52,15 @@
       'ERROR': gettext('Error')
     };
 
+    // Listeners loaded by the load balancer detail page, by load balancer id.
+    var listeners = {};
+
     var service = {
       operatingStatus: operatingStatus,
       provisioningStatus: provisioningStatus,
-      isActionable: isActionable
+      isActionable: isActionable,
+      setListeners: setListeners,
+      takeListeners: takeListeners
     };
 
     return service;
@@ -78,5 +83,33 @@
         }
       });
     }
+
+    /**
+     * @ngdoc method
+     * @name horizon.dashboard.project.lbaasv2.loadbalancers.service.setListeners
+     * @description Hands the listeners of a load balancer over to the listeners table, when
+     * they are loaded along with the load balancer.
+     * @param id The load balancer id.
+     * @param promise A promise resolved with the list of listeners.
+     */
+
+    function setListeners(id, promise) {
+      listeners[id] = promise;
+    }
+
+    /**
+     * @ngdoc method
+     * @name horizon.dashboard.project.lbaasv2.loadbalancers.service.takeListeners
+     * @description Returns the listeners handed over for a load balancer, if any. They are
+     * only handed out once, so that a table created later loads them again.
+     * @param id The load balancer id.
+     * @returns {Promise} A promise resolved with the list of listeners, or undefined.
+     */
+
+    function takeListeners(id) {
+      var promise = listeners[id];
+      delete listeners[id];
+      return promise;
+    }
   }
 }());
@@ -65,6 +65,15 @@
       $scope.$apply();
       expect(active).toBe(false);
     });
+
+    it('should hand listeners over once', function() {
+      var listeners = $q.when([]);
+      expect(service.takeListeners('1234')).toBeUndefined();
+      service.setListeners('1234', listeners);
+      expect(service.takeListeners('5678')).toBeUndefined();
+      expect(service.takeListeners('1234')).toBe(listeners);
+      expect(service.takeListeners('1234')).toBeUndefined();
+    });
   });
 
 })();
@@ -49,7 +49,7 @@
 
     var updateList = workflowModal.init({
       controller: 'UpdateMemberListWizardController',
-      message: gettext('The pool members have been updated.'),
+      message: gettext('The pool member changes have been submitted.'),
       handle: onUpdate,
       allowed: allowed
     });
@@ -17,7 +17,7 @@
   'use strict';
 
   describe('LBaaS v2 Update Member List Action Service', function() {
-    var scope, $q, $route, policy, init, updateMemberListService, defer;
+    var scope, $q, $route, policy, init, updateMemberListService, defer, provisioning, response;
 
     function allowed() {
       spyOn(policy, 'ifAllowed').and.returnValue(true);
@@ -40,7 +40,7 @@
     beforeEach(module('horizon.dashboard.project.lbaasv2'));
 
     beforeEach(module(function($provide) {
-      var response = {
+      response = {
         data: {
           id: '9012'
         }
@@ -66,6 +66,7 @@
       $route = $injector.get('$route');
       updateMemberListService = $injector.get(
         'horizon.dashboard.project.lbaasv2.members.actions.update-member-list');
+      provisioning = $injector.get('horizon.dashboard.project.lbaasv2.workflow.provisioning');
       init = updateMemberListService.init;
       defer = $q.defer();
     }));
@@ -98,5 +99,18 @@
       expect($route.reload).toHaveBeenCalled();
     });
 
+    it('should redirect again once the member changes are provisioned', function() {
+      var job = $q.defer();
+      response.data = {provisioning_job: 'job-1'};
+      spyOn(provisioning, 'watch').and.returnValue(job.promise);
+      spyOn($route, 'reload');
+      updateMemberListService.update.perform();
+      expect(provisioning.watch).toHaveBeenCalledWith('job-1');
+      expect($route.reload.calls.count()).toBe(1);
+      job.resolve({state: 'COMPLETE'});
+      scope.$apply();
+      expect($route.reload.calls.count()).toBe(2);
+    });
+
   });
 })();
@@ -22,7 +22,9 @@
 
   modalService.$inject = [
     '$modal',
-    'horizon.framework.widgets.toast.service'
+    'horizon.framework.widgets.toast.service',
+    'horizon.dashboard.project.lbaasv2.workflow.provisioning',
+    'horizon.framework.util.i18n.gettext'
   ];
 
   /**
@@ -34,10 +36,12 @@
    *
    * @param $modal The angular bootstrap $modal service.
    * @param toastService The horizon toast service.
+   * @param provisioning The LBaaS workflow provisioning service.
+   * @param gettext The horizon gettext function for translation.
    * @returns The modal service for the LBaaS workflow.
    */
 
-  function modalService($modal, toastService) {
+  function modalService($modal, toastService, provisioning, gettext) {
 
     var service = {
       init: init
@@ -59,6 +63,8 @@
      *   message*: String to display using the toast service when wizard completes.
      *   allowed*: Function used to determine if the workflow action is allowed.
      *   handle: Function to call after the modal closes, receives the result of wizard submit.
+     *     If the submitted changes are finished by a provisioning job, it is called again
+     *     once the job is over.
      * @returns An object with a single function 'open', used to open the modal.
      */
 
@@ -98,6 +104,28 @@
 
       function onModalClose(response) {
         toastService.add('success', args.message);
+        handle(response);
+        var jobId = response && response.data && response.data.provisioning_job;
+        if (jobId) {
+          provisioning.watch(jobId).then(onProvisioned, onProvisioningFailed)
+            .finally(function() {
+              handle(response);
+            });
+        }
+      }
+
+      function onProvisioned() {
+        toastService.add('success', gettext('The load balancer changes have been provisioned.'));
+      }
+
+      function onProvisioningFailed(job) {
+        if (job) {
+          toastService.add('error', interpolate(
+            gettext('Unable to provision the load balancer changes: %s'), [job.error]));
+        }
+      }
+
+      function handle(response) {
         if (args.handle) {
           args.handle(response);
         }
@@ -17,7 +17,7 @@
   'use strict';
 
   describe('LBaaS v2 Workflow Modal Service', function() {
-    var modalService, modal, response;
+    var modalService, modal, response, provisioning;
 
     beforeEach(module('horizon.framework.util'));
     beforeEach(module('horizon.framework.conf'));
@@ -42,7 +42,12 @@
         }
       };
 
+      provisioning = {
+        watch: angular.noop
+      };
+
       $provide.value('$modal', modal);
+      $provide.value('horizon.dashboard.project.lbaasv2.workflow.provisioning', provisioning);
     }));
 
     beforeEach(inject(function ($injector) {
@@ -102,6 +107,65 @@
         expect(args.handle).toHaveBeenCalledWith(response);
       });
 
+      describe('provisioning jobs', function() {
+        var $q, $scope, deferred, args;
+
+        beforeEach(inject(function ($injector) {
+          $q = $injector.get('$q');
+          $scope = $injector.get('$rootScope').$new();
+          deferred = $q.defer();
+          spyOn(provisioning, 'watch').and.returnValue(deferred.promise);
+          spyOn(toastService, 'add').and.callThrough();
+          args = { message: 'foo', handle: angular.noop };
+          spyOn(args, 'handle');
+        }));
+
+        it('does not watch without a provisioning job', function() {
+          modalService.init(args).perform();
+
+          expect(provisioning.watch).not.toHaveBeenCalled();
+          expect(args.handle.calls.count()).toBe(1);
+        });
+
+        it('handles response again once the job is complete', function() {
+          response.data.provisioning_job = 'job-1';
+          modalService.init(args).perform();
+
+          expect(provisioning.watch).toHaveBeenCalledWith('job-1');
+          expect(args.handle.calls.count()).toBe(1);
+
+          deferred.resolve({ state: 'COMPLETE' });
+          $scope.$apply();
+
+          expect(toastService.add).toHaveBeenCalledWith('success',
+            'The load balancer changes have been provisioned.');
+          expect(args.handle.calls.count()).toBe(2);
+        });
+
+        it('shows the error of a failed job', function() {
+          response.data.provisioning_job = 'job-1';
+          modalService.init(args).perform();
+
+          deferred.reject({ state: 'ERROR', error: 'bar' });
+          $scope.$apply();
+
+          expect(toastService.add).toHaveBeenCalledWith('error',
+            'Unable to provision the load balancer changes: bar');
+          expect(args.handle.calls.count()).toBe(2);
+        });
+
+        it('handles response again if the job can not be retrieved', function() {
+          response.data.provisioning_job = 'job-1';
+          modalService.init(args).perform();
+
+          deferred.reject();
+          $scope.$apply();
+
+          expect(toastService.add.calls.count()).toBe(1);
+          expect(args.handle.calls.count()).toBe(2);
+        });
+      });
+
     });
 
   });
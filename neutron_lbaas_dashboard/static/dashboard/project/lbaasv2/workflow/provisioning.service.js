@@ -0,0 +1,94 @@
+/*
+ * Copyright 2016 IBM Corp.
+ *
+ * Licensed under the Apache License, Version 2.0 (the 'License');
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an 'AS IS' BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+(function() {
+  'use strict';
+
+  angular
+    .module('horizon.dashboard.project.lbaasv2')
+    .factory('horizon.dashboard.project.lbaasv2.workflow.provisioning', provisioningService);
+
+  provisioningService.$inject = [
+    '$q',
+    '$timeout',
+    'horizon.app.core.openstack-service-api.lbaasv2'
+  ];
+
+  /**
+   * @ngdoc service
+   * @ngname horizon.dashboard.project.lbaasv2.workflow.provisioning
+   *
+   * @description
+   * Provides the service for following the provisioning jobs which finish the changes
+   * submitted by the LBaaS workflows once the load balancer is ready for them.
+   *
+   * @param $q The angular service for promises.
+   * @param $timeout The angular timeout service.
+   * @param api The LBaaS v2 API service.
+   * @returns The provisioning service for the LBaaS workflow.
+   */
+
+  function provisioningService($q, $timeout, api) {
+
+    var service = {
+      interval: 2000,
+      watch: watch
+    };
+
+    return service;
+
+    //////////////
+
+    /**
+     * @ngdoc method
+     * @name watch
+     *
+     * @description
+     * Poll a provisioning job until it is over.
+     *
+     * @param jobId The id of the provisioning job.
+     * @returns A promise resolved with the job once it is complete, or rejected with the job
+     *   if it failed. The promise is rejected without a job if the job can not be retrieved,
+     *   e.g. when it runs in another server process and the cache is not shared.
+     */
+
+    function watch(jobId) {
+      var deferred = $q.defer();
+      poll();
+      return deferred.promise;
+
+      function poll() {
+        $timeout(function() {
+          api.getProvisioningJob(jobId).then(onGetJob, function() {
+            deferred.reject();
+          });
+        }, service.interval);
+      }
+
+      function onGetJob(response) {
+        var job = response.data;
+        if (job.state === 'COMPLETE') {
+          deferred.resolve(job);
+        } else if (job.state === 'ERROR') {
+          deferred.reject(job);
+        } else {
+          deferred.notify(job);
+          poll();
+        }
+      }
+    }
+
+  }
+})();
@@ -0,0 +1,94 @@
+/*
+ * Copyright 2016 IBM Corp.
+ *
+ * Licensed under the Apache License, Version 2.0 (the 'License');
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *    http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an 'AS IS' BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+(function() {
+  'use strict';
+
+  describe('LBaaS v2 Workflow Provisioning Service', function() {
+    var service, api, $q, $scope, $timeout, jobs;
+
+    beforeEach(module('horizon.framework.util'));
+    beforeEach(module('horizon.framework.conf'));
+    beforeEach(module('horizon.framework.widgets.toast'));
+    beforeEach(module('horizon.dashboard.project.lbaasv2'));
+
+    beforeEach(module(function($provide) {
+      api = {
+        getProvisioningJob: function() {
+          var job = jobs.shift();
+          return job ? $q.when({ data: job }) : $q.reject();
+        }
+      };
+      $provide.value('horizon.app.core.openstack-service-api.lbaasv2', api);
+    }));
+
+    beforeEach(inject(function ($injector) {
+      $q = $injector.get('$q');
+      $scope = $injector.get('$rootScope').$new();
+      $timeout = $injector.get('$timeout');
+      service = $injector.get('horizon.dashboard.project.lbaasv2.workflow.provisioning');
+      spyOn(api, 'getProvisioningJob').and.callThrough();
+    }));
+
+    function watch() {
+      var result = { progress: [] };
+      service.watch('job-1').then(function(job) {
+        result.complete = job;
+      }, function(job) {
+        result.failed = job || 'unknown';
+      }, function(job) {
+        result.progress.push(job.state);
+      });
+      return result;
+    }
+
+    it('polls the job until it is complete', function() {
+      jobs = [{ state: 'QUEUED' }, { state: 'RUNNING' }, { state: 'COMPLETE' }];
+      var result = watch();
+
+      expect(api.getProvisioningJob).not.toHaveBeenCalled();
+      $timeout.flush();
+      $timeout.flush();
+      expect(result.progress).toEqual(['QUEUED', 'RUNNING']);
+      expect(result.complete).toBeUndefined();
+
+      $timeout.flush();
+      expect(api.getProvisioningJob.calls.count()).toBe(3);
+      expect(api.getProvisioningJob).toHaveBeenCalledWith('job-1');
+      expect(result.complete).toEqual({ state: 'COMPLETE' });
+      $timeout.verifyNoPendingTasks();
+    });
+
+    it('rejects with the failed job', function() {
+      jobs = [{ state: 'ERROR', error: 'foo' }];
+      var result = watch();
+
+      $timeout.flush();
+      expect(result.failed).toEqual({ state: 'ERROR', error: 'foo' });
+      $timeout.verifyNoPendingTasks();
+    });
+
+    it('rejects without a job if it can not be retrieved', function() {
+      jobs = [];
+      var result = watch();
+
+      $timeout.flush();
+      $scope.$apply();
+      expect(result.failed).toBe('unknown');
+      $timeout.verifyNoPendingTasks();
+    });
+  });
+
+})();
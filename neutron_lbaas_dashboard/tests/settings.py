@@ -95,6 +95,16 @@ INSTALLED_APPS = list(INSTALLED_APPS)  # Make sure it's mutable
 settings.update_dashboards(dashboard_modules, HORIZON_CONFIG, INSTALLED_APPS)
 
 
+MIDDLEWARE_CLASSES += (
+    'contrail_openstack_dashboard.openstack_dashboard.middleware.'
+    'APIMetricsMiddleware',
+)
+
+# Fail the tests of views that make more API calls than their budget, see
+# APIMetricsMiddleware.
+API_CALL_BUDGETS = {}
+API_CALL_BUDGET_STRICT = True
+
 # Set to True to allow users to upload images to glance via Horizon server.
 # When enabled, a file form field will appear on the create image form.
 # See documentation for deployment considerations.
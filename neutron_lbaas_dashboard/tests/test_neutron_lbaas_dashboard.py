@@ -19,10 +19,955 @@ test_neutron_lbaas_dashboard
 Tests for `neutron_lbaas_dashboard` module.
 """
 
+import json
+
+import mock
+
+from neutron_lbaas_dashboard.api import instances
+from neutron_lbaas_dashboard.api import lbaasv2
+from neutron_lbaas_dashboard.api import provisioning
+from neutron_lbaas_dashboard.api.rest import lbaasv2 as rest_lbaasv2
+from neutron_lbaas_dashboard.dashboards.project.loadbalancersv2 import views
 from neutron_lbaas_dashboard.tests import base
 
 
+class FakeRequest(object):
+
+    def __init__(self, project_id='project-1', data=None, query=None):
+        self.user = mock.Mock(project_id=project_id)
+        self.DATA = data or {}
+        self.GET = query or {}
+
+
+def floating_ip(fip_id, port_id, fixed_ip_address):
+    return {'id': fip_id,
+            'floating_ip_address': '172.24.4.%s' % fip_id[-1],
+            'fixed_ip_address': fixed_ip_address,
+            'port_id': port_id}
+
+
 class TestNeutron_lbaas_dashboard(base.TestCase):
 
     def test_something(self):
         pass
+
+
+class FloatingIpTests(base.TestCase):
+
+    @mock.patch.object(lbaasv2.neutron, 'list_resources_with_long_filters')
+    def test_vip_floating_ips_per_request(self, list_floating_ips):
+        fip = floating_ip('fip-1', 'port-1', '10.0.0.5')
+        list_floating_ips.return_value = [fip]
+        request = FakeRequest()
+
+        self.assertEqual({'port-1': [fip], 'port-2': []},
+                         lbaasv2.vip_floating_ips(request,
+                                                  ['port-1', 'port-2', None]))
+        args, kwargs = list_floating_ips.call_args
+        self.assertEqual('port_id', args[1])
+        self.assertEqual(set(['port-1', 'port-2']), set(args[2]))
+        self.assertEqual('project-1', kwargs['tenant_id'])
+
+        # the same request does not list them again
+        self.assertEqual({'port-1': [fip]},
+                         lbaasv2.vip_floating_ips(request, ['port-1']))
+        self.assertEqual(1, list_floating_ips.call_count)
+
+        # the next request sees the floating IPs associated in between
+        list_floating_ips.return_value = []
+        self.assertEqual({'port-1': []},
+                         lbaasv2.vip_floating_ips(FakeRequest(), ['port-1']))
+        self.assertEqual(2, list_floating_ips.call_count)
+
+    @mock.patch.object(lbaasv2, 'vip_floating_ips')
+    def test_add_floating_ip_info_by_vip_port(self, vip_floating_ips):
+        # the load balancers have the same VIP address on two networks
+        vip_floating_ips.return_value = {
+            'port-1': [floating_ip('fip-1', 'port-1', '10.0.0.5')],
+            'port-2': []}
+        loadbalancers = [{'id': 'lb-1', 'vip_port_id': 'port-1',
+                          'vip_address': '10.0.0.5'},
+                         {'id': 'lb-2', 'vip_port_id': 'port-2',
+                          'vip_address': '10.0.0.5'}]
+        request = FakeRequest()
+
+        rest_lbaasv2.add_floating_ip_info(request, loadbalancers)
+
+        vip_floating_ips.assert_called_once_with(request,
+                                                 ['port-1', 'port-2'])
+        self.assertEqual({'id': 'fip-1', 'ip': '172.24.4.1'},
+                         loadbalancers[0]['floating_ip'])
+        self.assertEqual({}, loadbalancers[1]['floating_ip'])
+
+
+def list_by_id(collection, resources):
+    def _list(id=(), **kwargs):
+        return {collection: [r for r in resources if r['id'] in id]}
+    return _list
+
+
+class ClientTestCase(base.TestCase):
+    """Tests of the API helpers, against a mock neutron client."""
+
+    def setUp(self):
+        super(ClientTestCase, self).setUp()
+        self.client = mock.Mock()
+        patcher = mock.patch.object(lbaasv2, 'neutronclient',
+                                    return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class ListLoadBalancersTests(ClientTestCase):
+
+    def setUp(self):
+        super(ListLoadBalancersTests, self).setUp()
+        self.loadbalancers = [
+            {'id': 'lb-1', 'listeners': [{'id': 'listener-1'}]},
+            {'id': 'lb-2', 'listeners': [{'id': 'listener-2'}]},
+            {'id': 'lb-3', 'listeners': []}]
+        self.listeners = [
+            {'id': 'listener-1', 'default_pool_id': 'pool-1'},
+            {'id': 'listener-2', 'default_pool_id': 'pool-2'}]
+        self.pools = [
+            {'id': 'pool-1', 'healthmonitor_id': 'monitor-1'},
+            {'id': 'pool-2', 'healthmonitor_id': None}]
+        self.monitors = [{'id': 'monitor-1'}]
+        self.client.list_lbaas_members.side_effect = lambda pool_id: {
+            'members': [{'id': 'member-of-%s' % pool_id}]}
+
+    def list_members(self, pool_id, tenant_id):
+        return {'members': [{'id': 'member-of-%s' % pool_id}]}
+
+    def assertJoined(self):
+        lb_1, lb_2, lb_3 = self.loadbalancers
+        self.assertEqual(self.listeners[0], lb_1['listener'])
+        self.assertEqual(self.pools[0], lb_1['pool'])
+        self.assertEqual([{'id': 'member-of-pool-1'}],
+                         lb_1['pool']['members'])
+        self.assertEqual({'id': 'monitor-1'}, lb_1['pool']['monitors'])
+        self.assertEqual([{'id': 'member-of-pool-2'}],
+                         lb_2['pool']['members'])
+        self.assertIsNone(lb_2['pool']['monitors'])
+        self.assertIsNone(lb_3['listener'])
+        self.assertIsNone(lb_3['pool'])
+        # the members are listed once per referenced pool
+        self.assertEqual(
+            [mock.call('pool-1'), mock.call('pool-2')],
+            sorted(self.client.list_lbaas_members.call_args_list))
+
+    def test_list_loadbalancers(self):
+        self.client.list_loadbalancers.return_value = {
+            'loadbalancers': self.loadbalancers}
+        self.client.list_listeners.return_value = {
+            'listeners': self.listeners}
+        self.client.list_lbaas_pools.return_value = {'pools': self.pools}
+        self.client.list_lbaas_healthmonitors.return_value = {
+            'healthmonitors': self.monitors}
+
+        self.assertEqual(3, len(lbaasv2.list_loadbalancers(FakeRequest())))
+
+        self.assertJoined()
+        # each kind of child is listed with a single call
+        self.client.list_listeners.assert_called_once_with()
+        self.client.list_lbaas_pools.assert_called_once_with()
+        self.client.list_lbaas_healthmonitors.assert_called_once_with()
+
+    def test_list_loadbalancers_filtered(self):
+        self.client.list_loadbalancers.return_value = {
+            'loadbalancers': self.loadbalancers}
+        self.client.list_listeners.return_value = {
+            'listeners': self.listeners}
+        self.client.list_lbaas_pools.return_value = {'pools': self.pools}
+        self.client.list_lbaas_healthmonitors.return_value = {
+            'healthmonitors': self.monitors}
+        self.client.list_lbaas_members.side_effect = self.list_members
+
+        lbaasv2.list_loadbalancers(FakeRequest(), tenant_id='project-1',
+                                   name='web')
+
+        self.client.list_loadbalancers.assert_called_once_with(
+            tenant_id='project-1', name='web')
+        # the filters of the load balancers do not apply to their children
+        self.client.list_listeners.assert_called_once_with(
+            tenant_id='project-1')
+        self.client.list_lbaas_pools.assert_called_once_with(
+            tenant_id='project-1')
+        self.client.list_lbaas_healthmonitors.assert_called_once_with(
+            tenant_id='project-1')
+        self.client.list_lbaas_members.assert_any_call(
+            'pool-1', tenant_id='project-1')
+
+    @mock.patch.object(lbaasv2.utils.horizon_utils, 'get_page_size',
+                       return_value=3)
+    def test_list_loadbalancers_paged(self, get_page_size):
+        self.client.list_loadbalancers.return_value = iter(
+            [{'loadbalancers': self.loadbalancers}])
+        self.client.list_listeners.side_effect = list_by_id(
+            'listeners', self.listeners)
+        self.client.list_lbaas_pools.side_effect = list_by_id(
+            'pools', self.pools)
+        self.client.list_lbaas_healthmonitors.side_effect = list_by_id(
+            'healthmonitors', self.monitors)
+
+        loadbalancers, has_more_data, has_prev_data = \
+            lbaasv2.list_loadbalancers(FakeRequest(), paginate=True)
+
+        self.assertEqual(3, len(loadbalancers))
+        self.assertFalse(has_more_data)
+        self.assertFalse(has_prev_data)
+        self.assertJoined()
+        self.client.list_loadbalancers.assert_called_once_with(
+            retrieve_all=False, limit=4)
+        # the children are listed by the ids the page references
+        self.assertEqual(['listener-1', 'listener-2'], sorted(
+            self.client.list_listeners.call_args[1]['id']))
+        self.assertEqual(['pool-1', 'pool-2'], sorted(
+            self.client.list_lbaas_pools.call_args[1]['id']))
+        self.client.list_lbaas_healthmonitors.assert_called_once_with(
+            id=['monitor-1'])
+
+    @mock.patch.object(lbaasv2.utils.horizon_utils, 'get_page_size',
+                       return_value=2)
+    def test_list_loadbalancers_paged_unsorted(self, get_page_size):
+        # the page is cut here when the plugin ignores limit and marker
+        self.client.list_loadbalancers.return_value = iter(
+            [{'loadbalancers': self.loadbalancers[::-1]}])
+        self.client.list_listeners.side_effect = list_by_id(
+            'listeners', self.listeners)
+        self.client.list_lbaas_pools.side_effect = list_by_id(
+            'pools', self.pools)
+        self.client.list_lbaas_healthmonitors.side_effect = list_by_id(
+            'healthmonitors', self.monitors)
+        self.client.list_lbaas_members.side_effect = self.list_members
+
+        loadbalancers, has_more_data, has_prev_data = \
+            lbaasv2.list_loadbalancers(FakeRequest(), paginate=True,
+                                       tenant_id='project-1', name='web')
+
+        self.assertEqual(['lb-1', 'lb-2'],
+                         [lb['id'] for lb in loadbalancers])
+        self.assertTrue(has_more_data)
+        self.assertFalse(has_prev_data)
+        self.client.list_loadbalancers.assert_called_once_with(
+            retrieve_all=False, limit=3, tenant_id='project-1', name='web')
+        self.assertEqual({'tenant_id': 'project-1'}, dict(
+            (key, value) for key, value
+            in self.client.list_listeners.call_args[1].items()
+            if key != 'id'))
+
+    @mock.patch.object(lbaasv2.utils.horizon_utils, 'get_page_size',
+                       return_value=3)
+    def test_list_loadbalancers_paged_without_children(self, get_page_size):
+        self.client.list_loadbalancers.return_value = iter(
+            [{'loadbalancers': [self.loadbalancers[2]]}])
+
+        loadbalancers, has_more_data, has_prev_data = \
+            lbaasv2.list_loadbalancers(FakeRequest(), paginate=True)
+
+        self.assertEqual(1, len(loadbalancers))
+        self.assertFalse(self.client.list_listeners.called)
+        self.assertFalse(self.client.list_lbaas_pools.called)
+        self.assertFalse(self.client.list_lbaas_healthmonitors.called)
+        self.assertFalse(self.client.list_lbaas_members.called)
+
+
+class LoadBalancerTreeTests(ClientTestCase):
+
+    def setUp(self):
+        super(LoadBalancerTreeTests, self).setUp()
+        self.client.show_loadbalancer.side_effect = lambda lb_id: {
+            'loadbalancer': {'id': lb_id,
+                             'listeners': [{'id': 'listener-1'},
+                                           {'id': 'listener-2'}],
+                             'pools': [{'id': 'pool-1'}]}}
+        self.client.list_listeners.side_effect = list_by_id('listeners', [
+            {'id': 'listener-1', 'default_pool_id': 'pool-1'},
+            {'id': 'listener-2', 'default_pool_id': 'pool-2'}])
+        self.client.list_lbaas_pools.side_effect = list_by_id('pools', [
+            {'id': 'pool-1', 'members': [{'id': 'member-1'}],
+             'healthmonitor_id': 'monitor-1'},
+            {'id': 'pool-2', 'members': [], 'healthmonitor_id': None}])
+        self.client.list_lbaas_healthmonitors.side_effect = list_by_id(
+            'healthmonitors', [{'id': 'monitor-1'}])
+        self.client.list_lbaas_members.return_value = {
+            'members': [{'id': 'member-1'}]}
+
+    def test_loadbalancer_tree(self):
+        tree = lbaasv2.loadbalancer_tree(FakeRequest(), 'lb-1')
+
+        listener_1, listener_2 = tree['listeners']
+        self.assertEqual('listener-1', listener_1['id'])
+        self.assertEqual('listener-2', listener_2['id'])
+        self.assertEqual([{'id': 'member-1'}],
+                         listener_1['pool']['members'])
+        self.assertEqual({'id': 'monitor-1'},
+                         listener_1['pool']['healthmonitor'])
+        self.assertEqual([], listener_2['pool']['members'])
+        self.assertIsNone(listener_2['pool']['healthmonitor'])
+
+        # the children are listed by the ids referenced from the load
+        # balancer, not by project
+        self.assertEqual(['listener-1', 'listener-2'], sorted(
+            self.client.list_listeners.call_args[1].pop('id')))
+        self.assertEqual({}, self.client.list_listeners.call_args[1])
+        self.assertEqual([mock.call(id=['pool-1']), mock.call(id=['pool-2'])],
+                         self.client.list_lbaas_pools.call_args_list)
+        self.client.list_lbaas_healthmonitors.assert_called_once_with(
+            id=['monitor-1'])
+        # pools without member references have no members to list
+        self.client.list_lbaas_members.assert_called_once_with('pool-1')
+
+    def test_loadbalancer_tree_depth(self):
+        tree = lbaasv2.loadbalancer_tree(FakeRequest(), 'lb-1', depth=1)
+
+        self.assertEqual(['listener-1', 'listener-2'],
+                         [l['id'] for l in tree['listeners']])
+        self.assertNotIn('pool', tree['listeners'][0])
+        self.assertFalse(self.client.list_lbaas_pools.called)
+        self.assertFalse(self.client.list_lbaas_members.called)
+
+        tree = lbaasv2.loadbalancer_tree(FakeRequest(), 'lb-1', depth=0)
+
+        self.assertEqual([{'id': 'listener-1'}, {'id': 'listener-2'}],
+                         tree['listeners'])
+        self.assertEqual(1, self.client.list_listeners.call_count)
+
+
+class PoolChildResourcesTests(base.TestCase):
+
+    @mock.patch.object(rest_lbaasv2, 'neutronclient')
+    def test_get_pool_child_resources(self, neutronclient):
+        client = neutronclient.return_value
+        client.list_lbaas_members.return_value = {
+            'members': [{'id': 'member-1'}]}
+        client.show_lbaas_healthmonitor.return_value = {
+            'healthmonitor': {'id': 'monitor-1'}}
+
+        pool = {'id': 'pool-1', 'members': [{'id': 'member-1'}],
+                'healthmonitor_id': 'monitor-1'}
+
+        self.assertEqual(
+            {'members': [{'id': 'member-1'}], 'monitor': {'id': 'monitor-1'}},
+            rest_lbaasv2.get_pool_child_resources(FakeRequest(), pool))
+        client.list_lbaas_members.assert_called_once_with(
+            'pool-1', tenant_id='project-1')
+        client.show_lbaas_healthmonitor.assert_called_once_with('monitor-1')
+
+        self.assertEqual({}, rest_lbaasv2.get_pool_child_resources(
+            FakeRequest(), {'id': 'pool-2', 'members': []}))
+
+
+class Busy(Exception):
+    """The error of a change rejected while the load balancer is busy."""
+
+    status_code = 409
+
+
+def member(member_id):
+    return {'id': member_id, 'address': '10.0.0.%s' % member_id[-1],
+            'port': 80, 'subnet': 'subnet-1'}
+
+
+class UpdateMemberListTests(base.TestCase):
+
+    def setUp(self):
+        super(UpdateMemberListTests, self).setUp()
+        self.client = mock.Mock()
+        self.job = mock.Mock(results={})
+        self.monitor_callback = mock.Mock()
+        for target, attribute, kwargs in (
+                (rest_lbaasv2, 'neutronclient',
+                 {'return_value': self.client}),
+                (provisioning, 'get_scheduler', {}),
+                (provisioning, 'schedule', {})):
+            patcher = mock.patch.object(target, attribute, **kwargs)
+            setattr(self, attribute, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.get_scheduler.return_value.current_job.return_value = self.job
+        self.request = FakeRequest(data={
+            'members': [member('member-1'), member('member-2')]})
+
+    def update_member_list(self, **kwargs):
+        rest_lbaasv2.update_member_list(
+            self.request, loadbalancer_id='lb-1', pool_id='pool-1',
+            members_to_add=['member-1', 'member-2'],
+            members_to_delete=['member-3'],
+            monitor_callback=self.monitor_callback, **kwargs)
+
+    def test_update_member_list(self):
+        self.request.DATA['monitor'] = {'type': 'HTTP'}
+
+        self.update_member_list()
+
+        # the changes are sent back to back, removals first
+        self.assertEqual(['delete_lbaas_member', 'create_lbaas_member',
+                          'create_lbaas_member'],
+                         [name for name, args, kwargs
+                          in self.client.method_calls])
+        self.client.delete_lbaas_member.assert_called_once_with(
+            'member-3', 'pool-1')
+        self.client.create_lbaas_member.assert_any_call(
+            'pool-1', {'member': {'address': '10.0.0.1',
+                                  'protocol_port': 80,
+                                  'subnet_id': 'subnet-1'}})
+        self.assertEqual(
+            {'member-1': {'action': 'add', 'state': provisioning.COMPLETE},
+             'member-2': {'action': 'add', 'state': provisioning.COMPLETE},
+             'member-3': {'action': 'delete',
+                          'state': provisioning.COMPLETE}},
+            self.job.results)
+        # the monitor is updated once all the members are
+        self.schedule.assert_called_once_with(
+            self.request, 'lb-1', self.monitor_callback,
+            callback_kwargs={'pool_id': 'pool-1'})
+
+    def test_update_member_list_busy(self):
+        self.client.create_lbaas_member.side_effect = [None, Busy()]
+
+        self.update_member_list()
+
+        self.assertEqual(
+            {'member-1': {'action': 'add', 'state': provisioning.COMPLETE},
+             'member-3': {'action': 'delete',
+                          'state': provisioning.COMPLETE}},
+            self.job.results)
+        # the rest is retried in the next provisioning cycle, which starts
+        # counting the conflicts anew
+        self.schedule.assert_called_once_with(
+            self.request, 'lb-1', rest_lbaasv2.update_member_list,
+            callback_kwargs={'pool_id': 'pool-1',
+                             'members_to_add': ['member-2'],
+                             'members_to_delete': [],
+                             'monitor_callback': self.monitor_callback,
+                             'retries': 0})
+
+    def test_update_member_list_busy_first(self):
+        self.client.delete_lbaas_member.side_effect = Busy()
+
+        self.update_member_list(retries=1)
+
+        self.assertFalse(self.client.create_lbaas_member.called)
+        self.assertEqual({}, self.job.results)
+        self.schedule.assert_called_once_with(
+            self.request, 'lb-1', rest_lbaasv2.update_member_list,
+            callback_kwargs={'pool_id': 'pool-1',
+                             'members_to_add': ['member-1', 'member-2'],
+                             'members_to_delete': ['member-3'],
+                             'monitor_callback': self.monitor_callback,
+                             'retries': 2})
+
+    def test_update_member_list_busy_first_too_often(self):
+        self.client.delete_lbaas_member.side_effect = Busy('busy')
+
+        self.update_member_list(retries=rest_lbaasv2.MEMBER_UPDATE_RETRIES)
+
+        # the change fails and the others go ahead
+        self.assertEqual(provisioning.ERROR,
+                         self.job.results['member-3']['state'])
+        self.assertEqual('busy', self.job.results['member-3']['error'])
+        self.assertEqual(provisioning.COMPLETE,
+                         self.job.results['member-2']['state'])
+        self.assertEqual(2, self.client.create_lbaas_member.call_count)
+        self.assertFalse(self.schedule.called)
+
+
+class ResolverTests(ClientTestCase):
+
+    def setUp(self):
+        super(ResolverTests, self).setUp()
+        self.client.list_pools.side_effect = list_by_id('pools', [
+            {'id': 'pool-1', 'name': 'web', 'subnet_id': 'subnet-1',
+             'vip_id': 'vip-1'},
+            {'id': 'pool-2', 'name': 'db', 'subnet_id': 'subnet-1',
+             'vip_id': None}])
+        self.client.list_subnets.side_effect = list_by_id('subnets', [
+            {'id': 'subnet-1', 'cidr': '10.0.0.0/24'}])
+        self.client.list_vips.side_effect = list_by_id('vips', [
+            {'id': 'vip-1', 'name': 'www'}])
+
+    def test_resolve(self):
+        request = FakeRequest()
+        resolver = lbaasv2.resolver(request)
+        self.assertIs(resolver, lbaasv2.resolver(request))
+
+        pools = resolver.resolve('pool', ['pool-1', 'pool-3', None])
+
+        self.assertEqual(['pool-1'], list(pools))
+        self.assertEqual(['pool-1', 'pool-3'], sorted(
+            self.client.list_pools.call_args[1]['id']))
+
+        # known and missing ids are not listed again, and the values are
+        # copies the caller may change
+        pools['pool-1']['name'] = 'changed'
+        self.assertEqual('web', resolver.resolve(
+            'pool', ['pool-1', 'pool-3'])['pool-1']['name'])
+        self.assertEqual(1, self.client.list_pools.call_count)
+
+        resolver.resolve('pool', ['pool-1', 'pool-2'])
+        self.client.list_pools.assert_called_with(id=['pool-2'])
+
+        # every request resolves the ids anew
+        lbaasv2.resolver(FakeRequest()).resolve('pool', ['pool-1'])
+        self.assertEqual(3, self.client.list_pools.call_count)
+
+    def test_resolve_listed(self):
+        resolver = lbaasv2.resolver(FakeRequest())
+        resolver.add('vip', [{'id': 'vip-2', 'name': 'api'}])
+
+        self.assertEqual('api', resolver.get('vip', 'vip-2')['name'])
+        self.assertFalse(self.client.list_vips.called)
+        self.assertRaises(KeyError, resolver.get, 'vip', 'vip-3')
+
+    def test_pool_list(self):
+        self.client.list_pools.side_effect = None
+        self.client.list_pools.return_value = {'pools': [
+            {'id': 'pool-1', 'subnet_id': 'subnet-1', 'vip_id': 'vip-1'},
+            {'id': 'pool-2', 'subnet_id': 'subnet-1', 'vip_id': None}]}
+        request = FakeRequest()
+
+        pool_1, pool_2 = lbaasv2.pool_list(request)
+
+        self.assertEqual('10.0.0.0/24', pool_1['subnet_name'])
+        self.assertEqual('www', pool_1['vip_name'])
+        self.assertEqual('10.0.0.0/24', pool_2['subnet_name'])
+        self.assertIsNone(pool_2['vip_name'])
+        # the references of all the pools are resolved together
+        self.client.list_subnets.assert_called_once_with(id=['subnet-1'])
+        self.client.list_vips.assert_called_once_with(id=['vip-1'])
+
+        # the listed pools are not fetched again in the same request
+        lbaasv2.resolver(request).get('pool', 'pool-2')
+        self.client.list_pools.assert_called_once_with()
+
+    def test_pool_list_depth(self):
+        self.client.list_pools.side_effect = None
+        self.client.list_pools.return_value = {'pools': [
+            {'id': 'pool-1', 'subnet_id': 'subnet-1', 'vip_id': 'vip-1'}]}
+
+        pool, = lbaasv2._pool_list(FakeRequest(), depth=0)
+
+        self.assertNotIn('subnet_name', pool._apidict)
+        self.assertFalse(self.client.list_subnets.called)
+        self.assertFalse(self.client.list_vips.called)
+
+    def test_member_list(self):
+        self.client.list_members.return_value = {'members': [
+            {'id': 'member-1', 'pool_id': 'pool-1'},
+            {'id': 'member-2', 'pool_id': 'pool-1'},
+            {'id': 'member-3', 'pool_id': 'pool-3'}]}
+
+        members = lbaasv2.member_list(FakeRequest())
+
+        self.assertEqual(['web', 'web', 'pool-3'],
+                         [m['pool_name'] for m in members])
+        self.assertEqual(['pool-1', 'pool-3'], sorted(
+            self.client.list_pools.call_args[1]['id']))
+        self.assertEqual(1, self.client.list_pools.call_count)
+
+        lbaasv2._member_list(FakeRequest(), depth=0)
+
+        self.assertEqual(1, self.client.list_pools.call_count)
+
+
+def server(server_id, name, address=None):
+    server = mock.Mock(id=server_id, addresses={})
+    server.name = name
+    if address:
+        server.addresses['private'] = [{'addr': address}]
+    return server
+
+
+class InstancesTests(base.TestCase):
+
+    def setUp(self):
+        super(InstancesTests, self).setUp()
+        patcher = mock.patch.object(instances, '_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(instances.nova, 'server_list')
+        self.server_list = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.server_list.return_value = ([
+            server('server-1', 'web-2', '10.0.0.2'),
+            server('server-2', 'Web-1', '10.0.0.1'),
+            server('server-3', 'db', '10.0.1.1'),
+            server('server-4', 'web-3')], False)
+
+    def test_search(self):
+        request = FakeRequest()
+
+        found, has_more_data = instances.search(request, limit=2)
+
+        # instances without an address can not be members
+        self.assertEqual(
+            [{'id': 'server-3', 'name': 'db', 'address': '10.0.1.1'},
+             {'id': 'server-2', 'name': 'Web-1', 'address': '10.0.0.1'}],
+            found)
+        self.assertTrue(has_more_data)
+
+        found, has_more_data = instances.search(request, marker='server-2',
+                                                limit=2)
+
+        self.assertEqual(['server-1'], [i['id'] for i in found])
+        self.assertFalse(has_more_data)
+
+        # the instances of the project are listed once
+        self.assertEqual(1, self.server_list.call_count)
+        instances.search(FakeRequest(project_id='project-2'), limit=2)
+        self.assertEqual(2, self.server_list.call_count)
+
+    def test_search_query(self):
+        request = FakeRequest()
+
+        self.assertEqual(['server-2', 'server-1'], [
+            i['id'] for i in instances.search(request, query='WEB',
+                                              limit=10)[0]])
+        self.assertEqual(['server-3'], [
+            i['id'] for i in instances.search(request, query='10.0.1.',
+                                              limit=10)[0]])
+
+    def test_lookup(self):
+        request = FakeRequest()
+
+        self.assertEqual(['10.0.0.1'], list(
+            instances.lookup(request, ['10.0.0.1'])))
+        self.assertEqual(1, self.server_list.call_count)
+
+        # an unknown address lists the instances again, in case it belongs
+        # to an instance created since
+        self.server_list.return_value[0].append(
+            server('server-5', 'new', '10.0.0.5'))
+
+        found = instances.lookup(request, ['10.0.0.1', '10.0.0.5'])
+
+        self.assertEqual('server-5', found['10.0.0.5']['id'])
+        self.assertEqual(2, self.server_list.call_count)
+
+        found = instances.lookup(request, ['10.0.0.1', '10.0.0.9'])
+
+        self.assertEqual(['10.0.0.1'], list(found))
+        self.assertEqual(3, self.server_list.call_count)
+
+
+class InstancesViewTests(base.TestCase):
+
+    def setUp(self):
+        super(InstancesViewTests, self).setUp()
+        patcher = mock.patch.object(views.settings, 'API_RESULT_LIMIT', 20,
+                                    create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(views.api.instances, 'search')
+    def test_instances(self, search):
+        found = [{'id': 'server-1', 'name': 'web', 'address': '10.0.0.1'}]
+        search.return_value = found, True
+        request = FakeRequest(query={'q': 'web', 'marker': 'server-0',
+                                     'limit': '50'})
+
+        response = views.InstancesView().get(request)
+
+        self.assertEqual({'items': found, 'has_more_data': True},
+                         json.loads(response.content))
+        # the page size is capped by the API result limit
+        search.assert_called_once_with(request, query='web',
+                                       marker='server-0', limit=20)
+
+    @mock.patch.object(views.api.instances, 'search')
+    def test_instances_default_limit(self, search):
+        search.return_value = [], False
+        request = FakeRequest(query={'limit': 'all'})
+
+        views.InstancesView().get(request)
+
+        search.assert_called_once_with(request, query=None, marker=None,
+                                       limit=None)
+
+    @mock.patch.object(views.api.instances, 'search')
+    def test_instances_error(self, search):
+        search.side_effect = Exception('nova is down')
+
+        response = views.InstancesView().get(FakeRequest())
+
+        self.assertEqual(500, response.status_code)
+        self.assertIn('error', json.loads(response.content))
+
+
+class VipAddressesTests(ClientTestCase):
+
+    def setUp(self):
+        super(VipAddressesTests, self).setUp()
+        patcher = mock.patch.object(lbaasv2, '_vip_addresses', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.list_loadbalancers.return_value = {'loadbalancers': [
+            {'id': 'lb-1', 'name': 'web', 'vip_address': '10.0.0.5',
+             'listeners': [{'id': 'listener-1'}, {'id': 'listener-2'}]},
+            {'id': 'lb-2', 'name': 'web-2', 'vip_address': '10.0.0.5',
+             'listeners': []},
+            {'id': 'lb-3', 'name': 'pending', 'vip_address': None,
+             'listeners': []}]}
+        self.client.list_listeners.return_value = {'listeners': [
+            {'id': 'listener-1', 'protocol_port': 80},
+            {'id': 'listener-2', 'protocol_port': 443}]}
+
+    def test_vip_addresses(self):
+        addresses = lbaasv2.vip_addresses(FakeRequest())
+
+        self.assertEqual({'10.0.0.5': 'web'}, dict(addresses.names))
+        self.assertTrue(addresses.in_use('10.0.0.5', 443))
+        self.assertFalse(addresses.in_use('10.0.0.5', 8080))
+        self.assertFalse(addresses.in_use('10.0.0.6', 80))
+        # only the fields needed are listed
+        self.client.list_loadbalancers.assert_called_once_with(
+            tenant_id='project-1',
+            fields=['id', 'name', 'vip_address', 'listeners'])
+        self.client.list_listeners.assert_called_once_with(
+            tenant_id='project-1', fields=['id', 'protocol_port'])
+
+    @mock.patch.object(lbaasv2.utils.time, 'time', return_value=1000)
+    def test_vip_addresses_cache(self, time):
+        request = FakeRequest()
+        addresses = lbaasv2.vip_addresses(request)
+
+        self.assertIs(addresses, lbaasv2.vip_addresses(FakeRequest()))
+        self.assertEqual(1, self.client.list_loadbalancers.call_count)
+
+        # every project has its own addresses
+        lbaasv2.vip_addresses(FakeRequest(project_id='project-2'))
+        self.assertEqual(2, self.client.list_loadbalancers.call_count)
+
+        # they are listed again once they expire, or are forgotten
+        time.return_value = 1011
+        self.assertIsNot(addresses, lbaasv2.vip_addresses(request))
+        self.assertEqual(3, self.client.list_loadbalancers.call_count)
+
+        lbaasv2.forget_vip_addresses(request)
+        lbaasv2.vip_addresses(request)
+        self.assertEqual(4, self.client.list_loadbalancers.call_count)
+
+    def test_create_loadbalancer_forgets_vip_addresses(self):
+        lbaasv2.vip_addresses(FakeRequest())
+        self.client.create_loadbalancer.return_value = {
+            'loadbalancer': {'id': 'lb-4'}}
+
+        with mock.patch.object(rest_lbaasv2, 'neutronclient',
+                               return_value=self.client):
+            rest_lbaasv2.create_loadbalancer(FakeRequest(data={
+                'loadbalancer': {'subnet': 'subnet-1',
+                                 'ip': '10.0.0.6'}}))
+
+        lbaasv2.vip_addresses(FakeRequest())
+        self.assertEqual(2, self.client.list_loadbalancers.call_count)
+
+
+class FakeCache(object):
+    """A cache shared by the scheduler instances of a test."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        expires, value = self.values.get(key, (None, None))
+        if expires is not None and expires > provisioning.time.time():
+            return value
+        return None
+
+    def set(self, key, value, timeout):
+        self.values[key] = (provisioning.time.time() + timeout, value)
+
+
+class SyncPool(object):
+
+    def apply_async(self, func, args):
+        func(*args)
+
+
+class ProvisioningSchedulerTests(base.TestCase):
+
+    def setUp(self):
+        super(ProvisioningSchedulerTests, self).setUp()
+        self.client = mock.Mock()
+        self.now = 1000.0
+        self.statuses = {}
+        self.client.list_loadbalancers.side_effect = lambda **kwargs: {
+            'loadbalancers': [{'id': lb_id, 'provisioning_status': status}
+                              for lb_id, status in self.statuses.items()
+                              if lb_id in kwargs['id']]}
+        for target, attribute, kwargs in (
+                (provisioning, 'neutronclient',
+                 {'return_value': self.client}),
+                (provisioning, 'cache', {'new': FakeCache()}),
+                (provisioning.time, 'time',
+                 {'side_effect': lambda: self.now}),
+                (provisioning.ProvisioningScheduler, '_ensure_timer', {})):
+            patcher = mock.patch.object(target, attribute, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.scheduler = self.make_scheduler()
+        self.request = FakeRequest(data={'pool': {'name': 'web'}})
+        self.request.user.token.id = 'token-1'
+
+    def make_scheduler(self):
+        scheduler = provisioning.ProvisioningScheduler(
+            max_workers=1, interval=1, timeout=60, retention=300)
+        scheduler._pool = SyncPool()
+        return scheduler
+
+    def test_tick(self):
+        step = mock.Mock(__name__='step')
+        job_1 = self.scheduler.schedule(self.request, 'lb-1', step)
+        job_2 = self.scheduler.schedule(self.request, 'lb-2', step,
+                                        callback_kwargs={'pool_id': 'p-1'})
+        self.statuses = {'lb-1': 'PENDING_UPDATE', 'lb-2': 'ACTIVE'}
+
+        self.scheduler._check_pending()
+
+        # the load balancers of a token are checked with one call
+        self.assertEqual(1, self.client.list_loadbalancers.call_count)
+        kwargs = self.client.list_loadbalancers.call_args[1]
+        self.assertEqual(['lb-1', 'lb-2'], sorted(kwargs['id']))
+        self.assertEqual(['id', 'provisioning_status'], kwargs['fields'])
+        step.assert_called_once_with(mock.ANY, loadbalancer_id='lb-2',
+                                     pool_id='p-1')
+        # the step gets the user and the data, not the request
+        job_request = step.call_args[0][0]
+        self.assertIsNot(self.request, job_request)
+        self.assertIs(self.request.user, job_request.user)
+        self.assertEqual({'pool': {'name': 'web'}}, job_request.DATA)
+        self.assertEqual(provisioning.QUEUED, job_1.state)
+        self.assertEqual(provisioning.COMPLETE, job_2.state)
+        self.assertEqual(['step'], job_2.steps)
+        self.assertIsNone(job_2.request)
+
+    def test_tick_per_token(self):
+        other_request = FakeRequest(project_id='project-2')
+        other_request.user.token.id = 'token-2'
+        step = mock.Mock(__name__='step')
+        self.scheduler.schedule(self.request, 'lb-1', step)
+        self.scheduler.schedule(other_request, 'lb-2', step)
+        self.statuses = {'lb-1': 'ACTIVE', 'lb-2': 'ACTIVE'}
+
+        self.scheduler._check_pending()
+
+        self.assertEqual(2, self.client.list_loadbalancers.call_count)
+        self.assertEqual(2, step.call_count)
+
+    def test_continuation(self):
+        scheduler = self.scheduler
+
+        def create_pool(request, loadbalancer_id):
+            job = scheduler.schedule(request, loadbalancer_id,
+                                     create_monitor,
+                                     callback_kwargs={'pool_id': 'p-1'})
+            self.assertIs(scheduler.current_job(), job)
+            job.results['p-1'] = 'created'
+
+        create_monitor = mock.Mock(__name__='create_monitor')
+        job = scheduler.schedule(self.request, 'lb-1', create_pool,
+                                 from_state='PENDING_CREATE')
+        self.statuses = {'lb-1': 'ACTIVE'}
+
+        scheduler._check_pending()
+
+        # the next step continues the job once the first one returns
+        self.assertEqual(provisioning.QUEUED, job.state)
+        self.assertEqual(['create_pool'], job.steps)
+        self.assertEqual([job.id], [j['id'] for j in
+                                    scheduler.list_jobs('project-1')])
+        self.assertFalse(create_monitor.called)
+
+        scheduler._check_pending()
+
+        create_monitor.assert_called_once_with(
+            mock.ANY, loadbalancer_id='lb-1', pool_id='p-1')
+        self.assertEqual(provisioning.COMPLETE, job.state)
+        self.assertEqual(['create_pool', 'create_monitor'], job.steps)
+        self.assertEqual({'p-1': 'created'},
+                         scheduler.get_job(job.id)['results'])
+
+    def test_step_error(self):
+        step = mock.Mock(__name__='step', side_effect=Exception('boom'))
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        self.statuses = {'lb-1': 'ACTIVE'}
+
+        self.scheduler._check_pending()
+
+        self.assertEqual(provisioning.ERROR, job.state)
+        self.assertEqual('boom', job.error)
+
+    def test_timeout(self):
+        step = mock.Mock(__name__='step')
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        self.statuses = {'lb-1': 'PENDING_UPDATE'}
+
+        self.now += 60
+        self.scheduler._check_pending()
+        self.assertEqual(provisioning.QUEUED, job.state)
+
+        self.now += 1
+        self.scheduler._check_pending()
+
+        self.assertEqual(provisioning.ERROR, job.state)
+        self.assertIn('Timed out', job.error)
+        self.assertFalse(step.called)
+        self.assertEqual({}, self.scheduler._pending)
+
+    def test_unexpected_status(self):
+        step = mock.Mock(__name__='step')
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        self.statuses = {'lb-1': 'ERROR'}
+
+        self.scheduler._check_pending()
+
+        self.assertEqual(provisioning.ERROR, job.state)
+        self.assertEqual('Load balancer lb-1 is ERROR, expected ACTIVE.',
+                         job.error)
+        self.assertFalse(step.called)
+
+    def test_status_check_failure(self):
+        step = mock.Mock(__name__='step')
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        self.client.list_loadbalancers.side_effect = Exception('busy')
+
+        self.scheduler._check_pending()
+
+        # the failure is taken as transient
+        self.assertEqual(provisioning.QUEUED, job.state)
+        self.assertIn(job.id, self.scheduler._pending)
+
+    def test_prune(self):
+        step = mock.Mock(__name__='step')
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        self.statuses = {'lb-1': 'ACTIVE'}
+        self.scheduler._check_pending()
+
+        self.now += 300
+        self.assertEqual(provisioning.COMPLETE,
+                         self.scheduler.get_job(job.id)['state'])
+
+        self.now += 1
+        self.scheduler.get_job(job.id)
+        self.assertNotIn(job.id, self.scheduler._jobs)
+
+        # the published progress lasts as long as a job may run
+        self.now += 60
+        self.assertIsNone(self.scheduler.get_job(job.id))
+        self.assertEqual([], self.scheduler.list_jobs('project-1'))
+
+    def test_jobs_of_other_process(self):
+        step = mock.Mock(__name__='step')
+        job = self.scheduler.schedule(self.request, 'lb-1', step)
+        other = self.make_scheduler()
+
+        self.assertEqual(provisioning.QUEUED,
+                         other.get_job(job.id)['state'])
+
+        self.statuses = {'lb-1': 'ACTIVE'}
+        self.scheduler._check_pending()
+
+        self.assertEqual(job.to_dict(), other.get_job(job.id))
+        self.assertEqual([job.to_dict()], other.list_jobs('project-1'))
+        self.assertEqual([], other.list_jobs('project-2'))
+        self.assertIsNone(other.get_job('job-2'))
@@ -16,21 +16,423 @@
 
 from __future__ import absolute_import
 
+import collections
+import copy
+import functools
+import hashlib
+import json
 import logging
 import pdb
+import sys
+import threading
+import time
 
 from netaddr import *
+from neutronclient.common import exceptions as neutron_exc
 from neutronclient.v2_0 import client as neutron_client
+from keystoneclient import exceptions as keystone_exc
+import six
+from django.conf import settings
 from django.utils.datastructures import SortedDict
 
 from openstack_dashboard.api.base import APIDictWrapper, url_for
 
+from openstack_dashboard.api import keystone as keystone_api
 from openstack_dashboard.api.neutron import *
 
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
+from contrail_openstack_dashboard.openstack_dashboard.api.utils import neutronclient
+
 LOG = logging.getLogger(__name__)
 
+class SummaryCache(object):
+    """LRU cache of policy and IPAM listings with a time to live.
+    Entries are keyed by kind, project, admin flag and query params.
+    Any write of a kind drops every cached listing of that kind, as an
+    admin listing may span tenants. The cache is per process, so it is
+    disabled unless CONTRAIL_SUMMARY_CACHE_TTL (seconds) is set; the size
+    is bounded by CONTRAIL_SUMMARY_CACHE_SIZE.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'CONTRAIL_SUMMARY_CACHE_TTL', 0)
+
+    @property
+    def size(self):
+        return getattr(settings, 'CONTRAIL_SUMMARY_CACHE_SIZE', 256)
+
+    def key(self, kind, request, params):
+        return (kind, request.user.project_id,
+                getattr(request.user, 'is_superuser', False),
+                repr(sorted(params.items())))
+
+    def get(self, key):
+        if not self.ttl:
+            return None
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+            # re-insert to mark it as most recently used
+            self._entries[key] = entry
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, value):
+        if not self.ttl:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, value)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, kind):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == kind]:
+                del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'invalidations': self.invalidations,
+                    'entries': len(self._entries)}
+
+
+summary_cache = SummaryCache()
+
+
+def summary_cache_stats():
+    """Return the hit/miss counters of the policy and IPAM summary cache.
+    """
+    return summary_cache.stats()
+
+
+class _Credentials(object):
+    """What Keystone calls use of a request: its user, with the token and
+    the service catalog, and its session, for the domain context.
+    Lets a call made after the response outlive the request it was
+    started from without keeping the request alive.
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.session = dict(getattr(request, 'session', {}).items())
+
+
+class _ProjectList(object):
+    __slots__ = ('projects', 'listed', 'refreshing')
+
+    def __init__(self):
+        # id -> (name, enabled), in the order listed
+        self.projects = collections.OrderedDict()
+        self.listed = None
+        self.refreshing = False
+
+
+class ProjectNameCache(object):
+    """Process-wide cache of Keystone project names by id.
+    Names are kept per domain, as the projects an admin can list depend on
+    the domain of the token, and only the domains of the
+    CONTRAIL_PROJECT_NAME_CACHE_MAX_DOMAINS most recent lookups are kept.
+    The first lookup of a domain lists its projects. Later lookups are
+    answered from memory, and the ids that are missing, like those of
+    projects created since, are fetched one by one when there are at most
+    CONTRAIL_PROJECT_NAME_CACHE_MAX_GETS of them, or by listing the
+    projects again otherwise. Names older than
+    CONTRAIL_PROJECT_NAME_CACHE_TTL (seconds, 300 by default) are still
+    returned, while the list is refreshed in the background with the
+    credentials of the request; a TTL of 0 lists the projects on every
+    lookup.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # domain -> _ProjectList, the most recently used last
+        self._domains = collections.OrderedDict()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'CONTRAIL_PROJECT_NAME_CACHE_TTL', 300)
+
+    @property
+    def max_gets(self):
+        return getattr(settings, 'CONTRAIL_PROJECT_NAME_CACHE_MAX_GETS', 10)
+
+    @property
+    def max_domains(self):
+        return getattr(settings, 'CONTRAIL_PROJECT_NAME_CACHE_MAX_DOMAINS',
+                       100)
+
+    def clear(self):
+        with self._lock:
+            self._domains.clear()
+
+    def _domain(self, request):
+        """Return the key of the domain the projects are listed in: the
+        domain of a domain scoped token, the domain context an admin
+        chose and the domain of the user.
+        """
+        session = getattr(request, 'session', None) or {}
+        return (getattr(request.user, 'domain_id', None),
+                session.get('domain_context'),
+                getattr(request.user, 'user_domain_id', None))
+
+    def _project_list(self, domain):
+        # called with the lock held
+        project_list = self._domains.pop(domain, None) or _ProjectList()
+        self._domains[domain] = project_list
+        while len(self._domains) > self.max_domains:
+            self._domains.popitem(last=False)
+        return project_list
+
+    def _list(self, request, project_list):
+        with instrumentation.timed(request, 'keystone', 'tenant_list'):
+            tenants, has_more = keystone_api.tenant_list(request)
+        projects = collections.OrderedDict(
+            (t.id, (t.name, getattr(t, 'enabled', True))) for t in tenants)
+        with self._lock:
+            project_list.projects = projects
+            project_list.listed = time.time()
+
+    def _get(self, request, project_id):
+        try:
+            with instrumentation.timed(request, 'keystone', 'tenant_get'):
+                tenant = keystone_api.tenant_get(request, project_id,
+                                                 admin=True)
+        except (keystone_exc.NotFound, keystone_exc.Forbidden):
+            # a deleted project, or one of another domain, is remembered
+            # as such until the next list
+            return project_id, (None, False)
+        return project_id, (tenant.name, getattr(tenant, 'enabled', True))
+
+    def _refresh(self, credentials, project_list):
+        try:
+            self._list(credentials, project_list)
+        except Exception:
+            LOG.exception('Unable to refresh the project names')
+        finally:
+            with self._lock:
+                project_list.refreshing = False
+
+    def _refresh_if_stale(self, request, project_list):
+        with self._lock:
+            if project_list.refreshing or project_list.listed is None or \
+                    project_list.listed + self.ttl > time.time():
+                return
+            project_list.refreshing = True
+        thread = threading.Thread(target=self._refresh,
+                                  args=(_Credentials(request), project_list),
+                                  name='project-name-refresh')
+        thread.daemon = True
+        thread.start()
+
+    def names(self, request, project_ids):
+        """Return a dict mapping the given project ids to their names."""
+        with self._lock:
+            project_list = self._project_list(self._domain(request))
+            listed = self.ttl and project_list.listed is not None
+        if not listed:
+            self._list(request, project_list)
+        with self._lock:
+            missing = [project_id for project_id in set(project_ids)
+                       if project_id not in project_list.projects]
+        if len(missing) > self.max_gets:
+            self._list(request, project_list)
+            with self._lock:
+                # remember the ids of deleted projects until the next
+                # refresh, rather than listing again for them
+                for project_id in missing:
+                    project_list.projects.setdefault(project_id,
+                                                     (None, False))
+        elif missing:
+            fetched = api_utils.map_parallel(
+                functools.partial(self._get, request), missing)
+            with self._lock:
+                project_list.projects.update(fetched)
+        self._refresh_if_stale(request, project_list)
+        with self._lock:
+            return dict((project_id, project_list.projects[project_id][0])
+                        for project_id in project_ids
+                        if project_id in project_list.projects)
+
+    def enabled_projects(self, request):
+        """Return (id, name) of every enabled project, in list order."""
+        with self._lock:
+            project_list = self._project_list(self._domain(request))
+            listed = self.ttl and project_list.listed is not None
+        if listed:
+            self._refresh_if_stale(request, project_list)
+        else:
+            self._list(request, project_list)
+        with self._lock:
+            return [(project_id, name)
+                    for project_id, (name, enabled)
+                    in project_list.projects.items()
+                    if enabled and name is not None]
+
+
+project_names = ProjectNameCache()
+
+
+def _call_for_result(call):
+    try:
+        return call(), None
+    except Exception:
+        return None, sys.exc_info()
+
+
+class Prefetch(object):
+    """Independent API calls made at once.
+    Calls are given by name as functions taking no arguments, and run
+    through api_utils.map_parallel(). get()
+    returns the result of a call, or raises what the call raised, so that
+    callers handle errors as if they had made the call.
+    """
+
+    def __init__(self, **calls):
+        names = list(calls)
+        self._results = dict(zip(names, api_utils.map_parallel(
+            _call_for_result, [calls[name] for name in names])))
+
+    def get(self, name):
+        result, error = self._results[name]
+        if error:
+            six.reraise(*error)
+        return result
+
+
+def _list_networks_page(request, **params):
+    # the first page of networks, or all of them if the plugin does not
+    # page
+    for page in neutronclient(request).list_networks(retrieve_all=False,
+                                                     **params):
+        return page.get('networks') or []
+    return []
+
+
+def _networks_with_subnets(request, networks):
+    """Return Networks with the subnets of the given networks, which are
+    fetched with a single call.
+    """
+    subnet_ids = [subnet_id for n in networks
+                  for subnet_id in n.get('subnets', [])]
+    subnets = subnet_list(request, id=subnet_ids) if subnet_ids else []
+    subnet_dict = dict([(s['id'], s) for s in subnets])
+    for n in networks:
+        n['subnets'] = [subnet_dict[s] for s in n.get('subnets', [])
+                        if s in subnet_dict]
+    return [Network(n) for n in networks]
+
+
+def network_list_paged(request, marker=None, reversed_order=False,
+                       **params):
+    """Return one page of networks as a tuple of
+    (networks, has_more_data, has_prev_data).
+    Only the subnets of the networks on the page are fetched.
+    """
+    LOG.debug("network_list_paged(): marker=%s, params=%s"
+              % (marker, params))
+    page_size, params = api_utils.page_params(request, params, marker,
+                                              reversed_order)
+    networks = sorted(_list_networks_page(request, **params),
+                      key=lambda n: n['id'])
+    networks, has_more_data, has_prev_data = api_utils.paginate(
+        networks, page_size, marker, reversed_order)
+    return (_networks_with_subnets(request, networks), has_more_data,
+            has_prev_data)
+
+
+def network_list_for_tenant_paged(request, tenant_id, marker=None,
+                                  reversed_order=False, **params):
+    """Return one page of the networks available to a tenant as a tuple
+    of (networks, has_more_data, has_prev_data).
+    The networks owned by the tenant and the shared networks are paged
+    together: a page of each is listed, at once and starting at the same
+    marker, and the page is cut out of both merged by id, so that a page
+    costs the same whatever the number of networks.
+    """
+    LOG.debug("network_list_for_tenant_paged(): tenant_id=%s, marker=%s, "
+              "params=%s" % (tenant_id, marker, params))
+    page_size, params = api_utils.page_params(request, params, marker,
+                                              reversed_order)
+    owned, shared = api_utils.call_functions_parallel(
+        (_list_networks_page, [request],
+         dict(params, tenant_id=tenant_id, shared=False)),
+        (_list_networks_page, [request], dict(params, shared=True)))
+    # a network is listed once, even if the plugin ignores the filters
+    networks = dict((n['id'], n) for n in owned + shared)
+    networks, has_more_data, has_prev_data = api_utils.paginate(
+        sorted(networks.values(), key=lambda n: n['id']), page_size, marker,
+        reversed_order)
+    return (_networks_with_subnets(request, networks), has_more_data,
+            has_prev_data)
+
+
+class IpamMgmt(object):
+    """Decoded view of the mgmt settings of an IPAM.
+    The dhcp_option_list is walked once; option values are split on
+    whitespace and indexed by option code in options, with the DNS
+    servers (6), NTP servers (4) and domain names (15) pulled out.
+    """
+    __slots__ = ('ipam_method', 'dns_method', 'tenant_dns_servers',
+                 'virtual_dns_server', 'dns_servers', 'ntp_servers',
+                 'domain_names', 'options')
+
+    DNS_SERVERS = '6'
+    NTP_SERVERS = '4'
+    DOMAIN_NAME = '15'
+
+    # options may also be given by name instead of code
+    OPTION_CODES = {'domain-name-servers': DNS_SERVERS,
+                    'ntp-servers': NTP_SERVERS,
+                    'domain-name': DOMAIN_NAME}
+
+    def __init__(self, mgmt):
+        mgmt = mgmt or {}
+        self.ipam_method = mgmt.get('ipam_method')
+        self.dns_method = mgmt.get('ipam_dns_method')
+        dns_server = mgmt.get('ipam_dns_server') or {}
+        self.tenant_dns_servers = tuple(
+            (dns_server.get('tenant_dns_server_address') or {})
+            .get('ip_address') or ())
+        self.virtual_dns_server = dns_server.get('virtual_dns_server_name')
+
+        options = {}
+        dhcp_options = mgmt.get('dhcp_option_list') or {}
+        for option in dhcp_options.get('dhcp_option') or []:
+            code = str(option.get('dhcp_option_name'))
+            code = self.OPTION_CODES.get(code, code)
+            value = option.get('dhcp_option_value') or ''
+            options.setdefault(code, []).extend(value.split())
+        self.options = dict((code, tuple(values))
+                            for code, values in options.items())
+        self.dns_servers = self.options.get(self.DNS_SERVERS, ())
+        self.ntp_servers = self.options.get(self.NTP_SERVERS, ())
+        self.domain_names = self.options.get(self.DOMAIN_NAME, ())
+
+    def to_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+
 class ExtensionsContrailIpam(NeutronAPIDictWrapper):
-    """Wrapper for contrail neutron ipam"""
+    """Wrapper for contrail neutron ipam
+    The mgmt settings are decoded once into mgmt_info, an IpamMgmt, for
+    tables, forms and REST views to read from.
+    """
     _attrs = ['name', 'id', 'mgmt', 'tenant_id']
 
     def __init__(self, apiresource):
@@ -43,14 +445,34 @@ class ExtensionsContrailIpam(NeutronAPIDictWrapper):
         else:
             apiresource['addr_type'] = "Unknown"
         if not 'dhcp_option_list' in apiresource['mgmt'].keys():
-            apiresource['mgmt'] = {'dhcp_option_list':{'dhcp_option':[]}}
+            apiresource['mgmt']['dhcp_option_list'] = {'dhcp_option': []}
 
         super(ExtensionsContrailIpam, self).__init__(apiresource)
+        self.mgmt_info = IpamMgmt(apiresource['mgmt'])
 
 
-def ipam_summary(request, **params):
+def ipam_summary(request, marker=None, paginate=False, reversed_order=False,
+                 **params):
+    """Return a list of ipams.
+    With paginate=True only the page after marker (before it with
+    reversed_order=True) is returned, as a tuple of
+    (ipams, has_more_data, has_prev_data).
+    """
     LOG.debug("ipam_summary(): params=%s" % (params))
-    ipams = neutronclient(request).list_ipams(**params).get('ipams')
+    if paginate:
+        page_size, params = api_utils.page_params(request, params, marker,
+                                                  reversed_order)
+    key = summary_cache.key('ipam', request, params)
+    ipams = summary_cache.get(key)
+    if ipams is None:
+        ipams = neutronclient(request).list_ipams(**params).get('ipams')
+        summary_cache.set(key, ipams)
+    if paginate:
+        ipams, has_more_data, has_prev_data = api_utils.paginate(
+            sorted(ipams, key=lambda n: n['id']), page_size, marker,
+            reversed_order)
+        return ([ExtensionsContrailIpam(n) for n in ipams],
+                has_more_data, has_prev_data)
     return [ExtensionsContrailIpam(n) for n in ipams]
 
 
@@ -101,6 +523,7 @@ def ipam_create(request, name, **kwargs):
                 {'name': name}}
     body['ipam'].update(kwargs)
     ipam = neutronclient(request).create_ipam(body=body).get('ipam')
+    summary_cache.invalidate('ipam')
     return ExtensionsContrailIpam(ipam)
 
 
@@ -109,12 +532,14 @@ def ipam_modify(request, ipam_id, **kwargs):
     body = {'ipam': kwargs}
     ipam = neutronclient(request).update_ipam(ipam_id,
                                               body=body).get('ipam')
+    summary_cache.invalidate('ipam')
     return ExtensionsContrailIpam(ipam)
 
 
 def ipam_delete(request, ipam_id):
     LOG.debug("ipam_delete(): ipam-id=%s" % ipam_id)
     neutronclient(request).delete_ipam(ipam_id)
+    summary_cache.invalidate('ipam')
 
 class ExtensionsContrailPolicy(NeutronAPIDictWrapper):
     """Wrapper for contrail neutron network policies"""
@@ -137,9 +562,312 @@ class ExtensionsContrailPolicy(NeutronAPIDictWrapper):
             rule['rule_sequence'] = i
             i = i + 1
 
-def policy_summary(request, **params):
+    @property
+    def entries_hash(self):
+        """Hash of the rules, see policy_entries_hash()."""
+        return policy_entries_hash(self._apidict['entries']['policy_rule'])
+
+    @property
+    def rule_index(self):
+        """Dict mapping the key of each rule to its position."""
+        return policy_rule_index(self._apidict['entries']['policy_rule'])
+
+    @property
+    def rule_displays(self):
+        """Display records of the rules, see compile_policy_rules()."""
+        return compile_policy_rules(self)
+
+
+def _policy_rule_content(rule):
+    # rule_sequence is only the display position added by the wrapper
+    return dict((k, v) for k, v in rule.items() if k != 'rule_sequence')
+
+
+def _sha1(content):
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def policy_rule_key(rule):
+    """Return the key identifying a policy rule.
+    This is the rule_uuid when the backend assigned one, otherwise a hash
+    of the rule content.
+    """
+    return rule.get('rule_uuid') or _sha1(_policy_rule_content(rule))
+
+
+def policy_rule_index(rules):
+    """Return a dict mapping the key of each rule to its position.
+    Identical rules without a rule_uuid share a key, the first one wins.
+    """
+    index = {}
+    for position, rule in enumerate(rules):
+        index.setdefault(policy_rule_key(rule), position)
+    return index
+
+
+def policy_entries_hash(rules):
+    """Return a hash of the rules of a policy, order included.
+    It is used as a version of the policy by the rule operations below.
+    """
+    return _sha1([_policy_rule_content(rule) for rule in rules])
+
+
+def _policy_fqn_display(fq_name):
+    fqn = fq_name.split(':')
+    if len(fqn) == 3:
+        return "{0} ({1})".format(fqn[2], fqn[1])
+    return fqn[0].upper()
+
+
+def _policy_addresses_display(addresses):
+    displays = []
+    for address in addresses or []:
+        if address.get('security_group') is not None:
+            displays.append('security-group %s' % address['security_group'])
+        if address.get('subnet') is not None:
+            displays.append('%s/%s' % (address['subnet']['ip_prefix'],
+                                       address['subnet']['ip_prefix_len']))
+        if address.get('virtual_network') is not None:
+            displays.append('network ' +
+                            _policy_fqn_display(address['virtual_network']))
+        if address.get('network_policy') is not None:
+            displays.append('policy ' +
+                            _policy_fqn_display(address['network_policy']))
+    return ' '.join(displays)
+
+
+def _policy_ports_display(ports):
+    ports = ports or []
+    if len(ports) == 1 and ports[0]['start_port'] == -1:
+        return "ANY"
+    displays = []
+    for port in ports:
+        display = str(port['start_port'])
+        if port['start_port'] != port['end_port']:
+            display += "-" + str(port['end_port'])
+        displays.append(display)
+    return ','.join(' ' + display for display in displays)
+
+
+def _policy_rule_action(rule):
+    if rule.get('simple_action') is not None:
+        return rule['simple_action']
+    if rule.get('action_list'):
+        return rule['action_list'].get('simple_action') or 'pass'
+    return ''
+
+
+def _policy_rule_actions(actions):
+    displays = []
+    if actions.get('gateway_name'):
+        displays.append('gateway ' + actions['gateway_name'])
+    if actions.get('assign_routing_instance'):
+        displays.append('route ' + actions['assign_routing_instance'])
+    if actions.get('apply_service'):
+        displays.append('services')
+        displays.extend(_policy_fqn_display(service)
+                        for service in actions['apply_service'])
+    if actions.get('mirror_to'):
+        displays.append('mirrors')
+        displays.append(
+            _policy_fqn_display(actions['mirror_to']['analyzer_name']))
+    return ' '.join(displays)
+
+
+class PolicyRuleDisplay(object):
+    """Display record of a policy rule, formatted once.
+    source, destination and actions are tuples of words, text is the
+    whole rule on one line and words the same split into words.
+    """
+    __slots__ = ('key', 'sequence', 'action', 'direction', 'protocol',
+                 'source', 'source_ports', 'destination',
+                 'destination_ports', 'actions', 'text', 'words')
+
+    def __init__(self, rule, sequence):
+        action = _policy_rule_action(rule)
+        source = _policy_addresses_display(rule.get('src_addresses'))
+        destination = _policy_addresses_display(rule.get('dst_addresses'))
+        actions = _policy_rule_actions(rule.get('action_list') or {})
+        self.key = policy_rule_key(rule)
+        self.sequence = sequence
+        self.action = action.upper()
+        self.direction = rule['direction']
+        self.protocol = rule['protocol'].upper()
+        self.source = tuple(source.split())
+        self.source_ports = _policy_ports_display(rule.get('src_ports'))
+        self.destination = tuple(destination.split())
+        self.destination_ports = _policy_ports_display(rule.get('dst_ports'))
+        self.actions = tuple(actions.split())
+
+        text = action
+        if not rule.get('application'):
+            text += " protocol %s %s ports %s %s %s ports %s" % (
+                rule['protocol'], source.lower(),
+                self.source_ports.lower(), self.direction,
+                destination.lower(), self.destination_ports.lower())
+        if actions:
+            text += " action " + actions
+        self.text = text
+        self.words = tuple(text.split())
+
+
+_policy_rule_displays = collections.OrderedDict()
+_policy_rule_displays_lock = threading.Lock()
+
+
+def compile_policy_rules(policy):
+    """Return the PolicyRuleDisplay records of the rules of a policy.
+    Records are cached per policy id and entries_hash, so a policy is
+    only formatted again once its rules change. The number of cached
+    policies is bounded by CONTRAIL_POLICY_RULE_CACHE_SIZE.
+    """
+    rules = policy.entries['policy_rule']
+    key = (policy.id, policy_entries_hash(rules))
+    with _policy_rule_displays_lock:
+        displays = _policy_rule_displays.pop(key, None)
+        if displays is not None:
+            _policy_rule_displays[key] = displays
+            return displays
+    displays = tuple(PolicyRuleDisplay(rule, sequence)
+                     for sequence, rule in enumerate(rules, 1))
+    size = getattr(settings, 'CONTRAIL_POLICY_RULE_CACHE_SIZE', 512)
+    with _policy_rule_displays_lock:
+        _policy_rule_displays[key] = displays
+        while len(_policy_rule_displays) > size:
+            _policy_rule_displays.popitem(last=False)
+    return displays
+
+
+def _policy_rules_update(request, policy_id, expected_hash, update):
+    """Apply update() to the rules of a policy and save them.
+    The backend only accepts the entries as a whole, so the rules are read
+    right before the write and compared against expected_hash, the
+    entries_hash of the policy the caller computed its change from. A
+    mismatch means somebody else changed the rules in the meantime.
+    The check only narrows the race, it does not close it: the backend
+    has no conditional update, so a change made between the read and the
+    write is still overwritten.
+    """
+    policy = policy_show(request, policy_id)
+    rules = [_policy_rule_content(rule)
+             for rule in policy.entries['policy_rule']]
+    if expected_hash is not None and \
+            policy_entries_hash(rules) != expected_hash:
+        raise neutron_exc.Conflict(
+            message="Rules of network policy %s have been changed "
+                    "by another user." % policy_id)
+    rules = update(rules, policy_rule_index(rules))
+    for rule in rules:
+        # let the backend number the rules again
+        rule['rule_sequence'] = {'major': -1, 'minor': -1}
+    return policy_modify(request, policy_id,
+                         entries={'policy_rule': rules})
+
+
+def _policy_rule_position(policy_id, index, rule_key):
+    if rule_key not in index:
+        raise neutron_exc.NotFound(
+            message="Rule %s not found in network policy %s."
+                    % (rule_key, policy_id))
+    return index[rule_key]
+
+
+def policy_rule_insert(request, policy_id, rule, position=None,
+                       expected_hash=None):
+    """Insert a rule into a network policy.
+    :param request: request context
+    :param policy_id: id of the network policy
+    :param rule: the policy rule to insert
+    :param position: (optional) index to insert the rule at, the rule is
+                     appended by default
+    :param expected_hash: (optional) entries_hash of the policy the change
+                          is based on
+    :returns: ExtensionsContrailPolicy object
+    :raises neutronclient.common.exceptions.Conflict: if the rules do not
+        match expected_hash
+    """
+    LOG.debug("policy_rule_insert(): policy-id=%s, position=%s"
+              % (policy_id, position))
+
+    def update(rules, index):
+        if position is None:
+            rules.append(rule)
+        else:
+            rules.insert(position, rule)
+        return rules
+    return _policy_rules_update(request, policy_id, expected_hash, update)
+
+
+def policy_rule_delete(request, policy_id, rule_keys, expected_hash=None):
+    """Delete rules from a network policy.
+    :param request: request context
+    :param policy_id: id of the network policy
+    :param rule_keys: keys of the rules to delete, see policy_rule_key()
+    :param expected_hash: (optional) entries_hash of the policy the change
+                          is based on
+    :returns: ExtensionsContrailPolicy object
+    :raises neutronclient.common.exceptions.Conflict: if the rules do not
+        match expected_hash
+    :raises neutronclient.common.exceptions.NotFound: if a rule is missing
+    """
+    LOG.debug("policy_rule_delete(): policy-id=%s, rules=%s"
+              % (policy_id, rule_keys))
+
+    def update(rules, index):
+        positions = set(_policy_rule_position(policy_id, index, key)
+                        for key in rule_keys)
+        return [rule for position, rule in enumerate(rules)
+                if position not in positions]
+    return _policy_rules_update(request, policy_id, expected_hash, update)
+
+
+def policy_rule_move(request, policy_id, rule_key, position,
+                     expected_hash=None):
+    """Move a rule of a network policy to another position.
+    :param request: request context
+    :param policy_id: id of the network policy
+    :param rule_key: key of the rule to move, see policy_rule_key()
+    :param position: new index of the rule
+    :param expected_hash: (optional) entries_hash of the policy the change
+                          is based on
+    :returns: ExtensionsContrailPolicy object
+    :raises neutronclient.common.exceptions.Conflict: if the rules do not
+        match expected_hash
+    :raises neutronclient.common.exceptions.NotFound: if the rule is missing
+    """
+    LOG.debug("policy_rule_move(): policy-id=%s, rule=%s, position=%s"
+              % (policy_id, rule_key, position))
+
+    def update(rules, index):
+        rule = rules.pop(_policy_rule_position(policy_id, index, rule_key))
+        rules.insert(position, rule)
+        return rules
+    return _policy_rules_update(request, policy_id, expected_hash, update)
+
+def policy_summary(request, marker=None, paginate=False,
+                   reversed_order=False, **params):
+    """Return a list of network policies.
+    With paginate=True only the page after marker (before it with
+    reversed_order=True) is returned, as a tuple of
+    (policies, has_more_data, has_prev_data).
+    """
     LOG.debug("policy_summary(): params=%s" % (params))
-    policies = neutronclient(request).list_policys(**params).get('policys')
+    if paginate:
+        page_size, params = api_utils.page_params(request, params, marker,
+                                                  reversed_order)
+    key = summary_cache.key('policy', request, params)
+    policies = summary_cache.get(key)
+    if policies is None:
+        policies = neutronclient(request).list_policys(
+            **params).get('policys')
+        summary_cache.set(key, policies)
+    if paginate:
+        policies, has_more_data, has_prev_data = api_utils.paginate(
+            sorted(policies, key=lambda p: p['id']), page_size, marker,
+            reversed_order)
+        return ([ExtensionsContrailPolicy(p) for p in policies],
+                has_more_data, has_prev_data)
     return [ExtensionsContrailPolicy(p) for p in policies]
 
 
@@ -166,12 +894,14 @@ def policy_create(request, name, **kwargs):
     body = {'policy': {'name': name,
               'entries': {}}}
     policy = neutronclient(request).create_policy(body=body).get('policy')
+    summary_cache.invalidate('policy')
     return ExtensionsContrailPolicy(policy)
 
 
 def policy_delete(request, policy_id):
     LOG.debug("policy_delete(): policy-id=%s" % policy_id)
     neutronclient(request).delete_policy(policy_id)
+    summary_cache.invalidate('policy')
 
 def policy_show(request, policy_id, **params):
     LOG.debug("policy_summary_get(): pol-id=%s, params=%s" %
@@ -185,4 +915,5 @@ def policy_modify(request, policy_id, **kwargs):
     body   = {'policy': kwargs}
     policy = neutronclient(request).update_policy(policy_id,
                                               body=body).get('policy')
+    summary_cache.invalidate('policy')
     return ExtensionsContrailPolicy(policy)
@@ -0,0 +1,157 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+"""Accounting of the API calls made while serving a request.
+
+Every call is appended to request.api_calls as an APICall. Clients are
+instrumented at the HTTP level, which also gives the size of the
+response body. Calls through helpers whose client is out of reach, like
+the Nova and Keystone helpers of openstack_dashboard, are timed at the
+call site with timed().
+
+contrail_quantum, the topology and router views and the LBaaS v2
+plugin report their calls through this module and utils.neutronclient().
+The APIMetricsMiddleware reports the calls and checks the call budgets.
+"""
+
+from __future__ import absolute_import
+
+import collections
+import contextlib
+import functools
+import logging
+import time
+import weakref
+
+from six.moves.urllib import parse
+
+LOG = logging.getLogger(__name__)
+
+APICall = collections.namedtuple('APICall',
+                                 ['service', 'name', 'elapsed', 'size'])
+
+
+class CallBudgetExceeded(AssertionError):
+    """A view made more API calls than its budget allows."""
+
+
+def record(request, service, name, elapsed, size=None):
+    """Record an API call made on behalf of the request.
+
+    :param request: django request object
+    :param service: name of the service called, e.g. 'neutron'
+    :param name: name of the call
+    :param elapsed: duration of the call in seconds
+    :param size: (optional) size of the response body in bytes
+    """
+    call = APICall(service, name, elapsed, size)
+    # setdefault and append are atomic, calls may come from worker threads
+    request.__dict__.setdefault('api_calls', []).append(call)
+    return call
+
+
+@contextlib.contextmanager
+def timed(request, service, name):
+    """Record the calls made in the block as one call.
+
+    Example:
+        with instrumentation.timed(request, 'nova', 'server_list'):
+            servers, has_more = nova.server_list(request)
+    """
+    start = time.time()
+    try:
+        yield
+    finally:
+        record(request, service, name, time.time() - start)
+
+
+def _call_name(method, url):
+    return '%s %s' % (method, parse.urlsplit(url).path)
+
+
+def _instrument(request, service, obj, attr, get_size):
+    if getattr(obj, '_api_instrumented', False):
+        return
+    func = getattr(obj, attr)
+    # The client may be cached beyond the request, do not keep it alive.
+    request_ref = weakref.ref(request)
+
+    @functools.wraps(func)
+    def wrapper(url, method, *args, **kwargs):
+        start = time.time()
+        result = size = None
+        try:
+            result = func(url, method, *args, **kwargs)
+            return result
+        finally:
+            elapsed = time.time() - start
+            request = request_ref()
+            if request is not None:
+                if result is not None:
+                    size = get_size(result)
+                record(request, service, _call_name(method, url), elapsed,
+                       size)
+
+    setattr(obj, attr, wrapper)
+    obj._api_instrumented = True
+
+
+def _reply_size(result):
+    body = result[1]
+    return len(body) if body else 0
+
+
+def instrument_neutronclient(request, client):
+    """Record the calls made with a neutronclient Client."""
+    # Look the client up in __dict__, so that mocked clients are left as is
+    httpclient = vars(client).get('httpclient')
+    if httpclient is not None:
+        _instrument(request, 'neutron', httpclient, 'do_request',
+                    _reply_size)
+    return client
+
+
+def instrument_session(request, service, session):
+    """Record the calls made with a keystoneclient Session."""
+    _instrument(request, service, session, 'request',
+                lambda response: len(response.content or b''))
+    return session
+
+
+def summarize(calls):
+    """Return a dict of {service: {'count', 'elapsed', 'size'}}."""
+    summary = collections.OrderedDict()
+    for call in calls:
+        service = summary.setdefault(call.service,
+                                     {'count': 0, 'elapsed': 0.0, 'size': 0})
+        service['count'] += 1
+        service['elapsed'] += call.elapsed
+        service['size'] += call.size or 0
+    return summary
+
+
+def check_budget(view_name, summary, budget):
+    """Raise CallBudgetExceeded if the calls do not fit the budget.
+
+    :param view_name: name of the view the budget belongs to
+    :param summary: dict as returned by summarize()
+    :param budget: dict of {service: maximum number of calls}, the key
+        'total' bounds the calls to all services together
+    """
+    counts = dict((service, values['count'])
+                  for service, values in summary.items())
+    counts['total'] = sum(counts.values())
+    exceeded = ['%s %d/%d' % (service, counts.get(service, 0), limit)
+                for service, limit in sorted(budget.items())
+                if counts.get(service, 0) > limit]
+    if exceeded:
+        raise CallBudgetExceeded('View %s exceeded its API call budget: %s'
+                                 % (view_name, ', '.join(exceeded)))
@@ -0,0 +1,335 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import django.test
+import mock
+
+from django import http
+
+from openstack_dashboard.test import helpers as test
+
+from contrail_openstack_dashboard.openstack_dashboard.api import \
+    contrail_quantum
+from contrail_openstack_dashboard.openstack_dashboard.api import \
+    instrumentation
+
+
+class FakeHTTPClient(object):
+    def do_request(self, url, method, **kwargs):
+        return mock.Mock(), '{"ports": []}'
+
+
+class FakeClient(object):
+    def __init__(self):
+        self.httpclient = FakeHTTPClient()
+
+
+class InstrumentationTests(test.TestCase):
+    def setUp(self):
+        super(InstrumentationTests, self).setUp()
+        self.request = http.HttpRequest()
+        patcher = mock.patch.object(instrumentation, 'time')
+        self.time = patcher.start().time
+        self.addCleanup(patcher.stop)
+
+    def test_record(self):
+        call = instrumentation.record(self.request, 'neutron',
+                                      'GET /v2.0/networks', 0.5, 120)
+        instrumentation.record(self.request, 'nova', 'server_list', 0.25)
+
+        self.assertEqual(instrumentation.APICall(
+            'neutron', 'GET /v2.0/networks', 0.5, 120), call)
+        self.assertEqual([call, instrumentation.APICall(
+            'nova', 'server_list', 0.25, None)], self.request.api_calls)
+
+    def test_timed(self):
+        self.time.side_effect = [10.0, 10.5]
+
+        with instrumentation.timed(self.request, 'nova', 'server_list'):
+            pass
+
+        self.assertEqual([instrumentation.APICall(
+            'nova', 'server_list', 0.5, None)], self.request.api_calls)
+
+    def test_timed_records_failed_calls(self):
+        self.time.side_effect = [10.0, 12.0]
+
+        def fail():
+            with instrumentation.timed(self.request, 'nova', 'server_list'):
+                raise ValueError()
+
+        self.assertRaises(ValueError, fail)
+        self.assertEqual([instrumentation.APICall(
+            'nova', 'server_list', 2.0, None)], self.request.api_calls)
+
+    def test_instrument_neutronclient(self):
+        self.time.side_effect = [10.0, 10.25]
+        client = FakeClient()
+
+        instrumentation.instrument_neutronclient(self.request, client)
+        instrumentation.instrument_neutronclient(self.request, client)
+        result = client.httpclient.do_request(
+            'http://neutron:9696/v2.0/ports.json?fields=id', 'GET')
+
+        self.assertEqual('{"ports": []}', result[1])
+        self.assertEqual([instrumentation.APICall(
+            'neutron', 'GET /v2.0/ports.json', 0.25, 13)],
+            self.request.api_calls)
+
+    def test_instrument_neutronclient_leaves_mocks(self):
+        client = mock.Mock()
+
+        instrumentation.instrument_neutronclient(self.request, client)
+        client.httpclient.do_request('/v2.0/ports', 'GET')
+
+        self.assertFalse(hasattr(self.request, 'api_calls'))
+
+    def test_summarize(self):
+        calls = [instrumentation.APICall('nova', 'server_list', 0.5, None),
+                 instrumentation.APICall('neutron', 'GET /ports', 0.25, 10),
+                 instrumentation.APICall('nova', 'GET /flavors', 0.5, 20)]
+
+        summary = instrumentation.summarize(calls)
+
+        self.assertEqual(['nova', 'neutron'], list(summary))
+        self.assertEqual({'count': 2, 'elapsed': 1.0, 'size': 20},
+                         summary['nova'])
+        self.assertEqual({'count': 1, 'elapsed': 0.25, 'size': 10},
+                         summary['neutron'])
+
+    def test_check_budget(self):
+        summary = {'nova': {'count': 1}, 'neutron': {'count': 4}}
+
+        instrumentation.check_budget('view', summary,
+                                     {'neutron': 4, 'total': 5})
+        instrumentation.check_budget('view', summary, {'keystone': 0})
+
+    def test_check_budget_exceeded(self):
+        summary = {'nova': {'count': 1}, 'neutron': {'count': 4}}
+
+        with self.assertRaises(instrumentation.CallBudgetExceeded) as cm:
+            instrumentation.check_budget('view', summary,
+                                         {'neutron': 3, 'nova': 1,
+                                          'total': 4})
+        self.assertEqual('View view exceeded its API call budget: '
+                         'neutron 4/3, total 5/4', str(cm.exception))
+        self.assertIsInstance(cm.exception, AssertionError)
+
+
+class SummaryPaginationTests(test.TestCase):
+    """Paging of listings by a plugin which ignores limit and marker."""
+
+    def setUp(self):
+        super(SummaryPaginationTests, self).setUp()
+        self.client = mock.Mock()
+        self.request = mock.Mock()
+        for target, attribute, kwargs in (
+                (contrail_quantum, 'neutronclient',
+                 {'return_value': self.client}),
+                (contrail_quantum.api_utils.horizon_utils, 'get_page_size',
+                 {'return_value': 2})):
+            patcher = mock.patch.object(target, attribute, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # neither sorted nor cut to the requested page
+        self.items = [{'id': resource_id, 'name': resource_id,
+                       'entries': {'policy_rule': []}}
+                      for resource_id in ('id-4', 'id-1', 'id-5', 'id-3',
+                                          'id-2')]
+
+    def _ids(self, resources):
+        return [resource['id'] for resource in resources]
+
+    def test_ipam_summary(self):
+        self.client.list_ipams.return_value = {'ipams': self.items}
+
+        ipams, has_more_data, has_prev_data = contrail_quantum.ipam_summary(
+            self.request, paginate=True)
+
+        self.assertEqual(['id-1', 'id-2'], self._ids(ipams))
+        self.assertTrue(has_more_data)
+        self.assertFalse(has_prev_data)
+        self.client.list_ipams.assert_called_once_with(limit=3)
+
+    def test_ipam_summary_marker(self):
+        self.client.list_ipams.return_value = {'ipams': self.items}
+
+        ipams, has_more_data, has_prev_data = contrail_quantum.ipam_summary(
+            self.request, marker='id-2', paginate=True)
+
+        self.assertEqual(['id-3', 'id-4'], self._ids(ipams))
+        self.assertTrue(has_more_data)
+        self.assertTrue(has_prev_data)
+
+    def test_policy_summary(self):
+        self.client.list_policys.return_value = {'policys': self.items}
+
+        policies, has_more_data, has_prev_data = \
+            contrail_quantum.policy_summary(self.request, paginate=True)
+
+        self.assertEqual(['id-1', 'id-2'], self._ids(policies))
+        self.assertTrue(has_more_data)
+        self.assertFalse(has_prev_data)
+
+    def test_policy_summary_reversed(self):
+        self.client.list_policys.return_value = {'policys': self.items}
+
+        policies, has_more_data, has_prev_data = \
+            contrail_quantum.policy_summary(self.request, marker='id-4',
+                                            paginate=True,
+                                            reversed_order=True)
+
+        self.assertEqual(['id-2', 'id-3'], self._ids(policies))
+        self.assertTrue(has_more_data)
+        self.assertTrue(has_prev_data)
+
+
+@django.test.utils.override_settings(CONTRAIL_SUMMARY_CACHE_TTL=60,
+                                     CONTRAIL_SUMMARY_CACHE_SIZE=2)
+class SummaryCacheTests(test.TestCase):
+    def setUp(self):
+        super(SummaryCacheTests, self).setUp()
+        self.cache = contrail_quantum.SummaryCache()
+        self.now = 1000.0
+        patcher = mock.patch.object(contrail_quantum.time, 'time',
+                                    side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get(self):
+        self.cache.set('key', [{'id': 'id-1'}])
+
+        value = self.cache.get('key')
+        value.append({'id': 'id-2'})
+
+        # callers get a copy of the entry
+        self.assertEqual([{'id': 'id-1'}], self.cache.get('key'))
+        self.assertIsNone(self.cache.get('other'))
+        self.assertEqual({'hits': 2, 'misses': 1, 'invalidations': 0,
+                          'entries': 1}, self.cache.stats())
+
+    def test_ttl(self):
+        self.cache.set('key', [])
+        self.now += 60
+        self.assertEqual([], self.cache.get('key'))
+
+        self.now += 1
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(0, self.cache.stats()['entries'])
+
+    @django.test.utils.override_settings(CONTRAIL_SUMMARY_CACHE_TTL=0)
+    def test_disabled(self):
+        self.cache.set('key', [])
+
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual({'hits': 0, 'misses': 0, 'invalidations': 0,
+                          'entries': 0}, self.cache.stats())
+
+    def test_lru(self):
+        self.cache.set('key-1', [1])
+        self.cache.set('key-2', [2])
+        # key-1 becomes the most recently used
+        self.cache.get('key-1')
+        self.cache.set('key-3', [3])
+
+        self.assertIsNone(self.cache.get('key-2'))
+        self.assertEqual([1], self.cache.get('key-1'))
+        self.assertEqual([3], self.cache.get('key-3'))
+
+    def test_invalidate(self):
+        self.cache.set(('ipam', 'project-1'), [1])
+        self.cache.set(('policy', 'project-1'), [2])
+
+        self.cache.invalidate('ipam')
+
+        self.assertIsNone(self.cache.get(('ipam', 'project-1')))
+        self.assertEqual([2], self.cache.get(('policy', 'project-1')))
+        self.assertEqual(1, self.cache.stats()['invalidations'])
+
+
+@django.test.utils.override_settings(CONTRAIL_SUMMARY_CACHE_TTL=60)
+class SummaryCacheInvalidationTests(test.TestCase):
+    """The listings are fetched again after a write of their kind."""
+
+    def setUp(self):
+        super(SummaryCacheInvalidationTests, self).setUp()
+        self.client = mock.Mock()
+        self.client.list_ipams.return_value = {'ipams': [{'id': 'ipam-1'}]}
+        self.client.list_policys.return_value = {
+            'policys': [{'id': 'policy-1', 'entries': None}]}
+        self.client.create_ipam.return_value = {'ipam': {'id': 'ipam-2'}}
+        self.client.update_ipam.return_value = {'ipam': {'id': 'ipam-1'}}
+        self.client.create_policy.return_value = {
+            'policy': {'id': 'policy-2', 'entries': None}}
+        self.client.update_policy.return_value = {
+            'policy': {'id': 'policy-1', 'entries': None}}
+        self.request = mock.Mock()
+        self.request.user.project_id = 'project-1'
+        for target, attribute, kwargs in (
+                (contrail_quantum, 'neutronclient',
+                 {'return_value': self.client}),
+                (contrail_quantum, 'summary_cache',
+                 {'new': contrail_quantum.SummaryCache()})):
+            patcher = mock.patch.object(target, attribute, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _assertRefetched(self, summary, list_method, write):
+        summary(self.request)
+        summary(self.request)
+        self.assertEqual(1, list_method.call_count)
+
+        write()
+        summary(self.request)
+
+        self.assertEqual(2, list_method.call_count)
+
+    def test_ipam_create(self):
+        self._assertRefetched(
+            contrail_quantum.ipam_summary, self.client.list_ipams,
+            lambda: contrail_quantum.ipam_create(self.request, 'ipam-2'))
+
+    def test_ipam_modify(self):
+        self._assertRefetched(
+            contrail_quantum.ipam_summary, self.client.list_ipams,
+            lambda: contrail_quantum.ipam_modify(self.request, 'ipam-1',
+                                                 name='renamed'))
+
+    def test_ipam_delete(self):
+        self._assertRefetched(
+            contrail_quantum.ipam_summary, self.client.list_ipams,
+            lambda: contrail_quantum.ipam_delete(self.request, 'ipam-1'))
+
+    def test_policy_create(self):
+        self._assertRefetched(
+            contrail_quantum.policy_summary, self.client.list_policys,
+            lambda: contrail_quantum.policy_create(self.request, 'pol-2'))
+
+    def test_policy_modify(self):
+        self._assertRefetched(
+            contrail_quantum.policy_summary, self.client.list_policys,
+            lambda: contrail_quantum.policy_modify(self.request, 'policy-1',
+                                                   name='renamed'))
+
+    def test_policy_delete(self):
+        self._assertRefetched(
+            contrail_quantum.policy_summary, self.client.list_policys,
+            lambda: contrail_quantum.policy_delete(self.request,
+                                                   'policy-1'))
+
+    def test_other_kind_kept(self):
+        contrail_quantum.ipam_summary(self.request)
+
+        contrail_quantum.policy_delete(self.request, 'policy-1')
+        contrail_quantum.ipam_summary(self.request)
+
+        self.assertEqual(1, self.client.list_ipams.call_count)
@@ -0,0 +1,304 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from __future__ import absolute_import
+
+import collections
+from multiprocessing.pool import ThreadPool
+import sys
+import threading
+import time
+
+from django.conf import settings
+import six
+from six.moves import queue
+
+from horizon.utils import functions as horizon_utils
+
+from openstack_dashboard.api import neutron
+
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+
+_client_lock = threading.Lock()
+
+
+def neutronclient(request):
+    """Return the neutron client of the request.
+
+    Horizon memoizes the client per request, so every call made while
+    serving the request shares it and its connection pool, including calls
+    made from worker threads. The client is instrumented on first use, the
+    calls made with it are recorded in request.api_calls and how often it
+    was asked for is counted in request.neutronclient_usage.
+    """
+    with _client_lock:
+        client = neutron.neutronclient(request)
+        usage = request.__dict__.setdefault('neutronclient_usage',
+                                            {'created': 0, 'reused': 0})
+        usage['reused' if usage['created'] else 'created'] += 1
+        instrumentation.instrument_neutronclient(request, client)
+    return client
+
+
+class ProjectCache(object):
+    """Values loaded per project and kept for a short time.
+
+    Only the most recently used projects are kept.
+
+    :param load: function taking a request and returning the value for the
+        project of the request
+    :param ttl: seconds a value is kept
+    :param max_projects: number of projects values are kept for
+    """
+
+    def __init__(self, load, ttl, max_projects):
+        self.load = load
+        self.ttl = ttl
+        self.max_projects = max_projects
+        self._projects = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, request, refresh=False):
+        """Return the value for the project of the request.
+
+        :param refresh: load the value even if it is cached
+        """
+        project_id = request.user.project_id
+        with self._lock:
+            entry = self._projects.pop(project_id, None)
+            if entry is not None and not refresh and entry[0] > time.time():
+                # the most recently used project goes last
+                self._projects[project_id] = entry
+                return entry[1]
+        value = self.load(request)
+        with self._lock:
+            self._projects.pop(project_id, None)
+            self._projects[project_id] = (time.time() + self.ttl, value)
+            while len(self._projects) > self.max_projects:
+                self._projects.popitem(last=False)
+        return value
+
+    def forget(self, request):
+        """Drop the value for the project of the request."""
+        with self._lock:
+            self._projects.pop(request.user.project_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._projects.clear()
+
+
+def _get_max_workers():
+    return getattr(settings, 'CONTRAIL_API_MAX_WORKERS', 8)
+
+
+def _worker_calls(worker_defs):
+    calls = []
+    for worker_def in worker_defs:
+        if callable(worker_def):
+            calls.append((worker_def, (), {}))
+        else:
+            func = worker_def[0]
+            args = worker_def[1] if len(worker_def) > 1 else ()
+            func_kwargs = worker_def[2] if len(worker_def) > 2 else {}
+            calls.append((func, args, func_kwargs))
+    return calls
+
+
+def call_functions_parallel(*worker_defs, **kwargs):
+    """Call specified functions in parallel.
+
+    :param *worker_defs: Each positional argument can be either of
+        a function to be called or a tuple which consists of a function,
+        a list of positional arguments and keyword arguments (optional).
+        If you need to pass arguments, you need to pass a tuple.
+        Example usages are like:
+           call_functions_parallel(func1, func2, func3)
+           call_functions_parallel(func1, (func2, [1, 2]))
+           call_functions_parallel((func1, [], {'a': 1}),
+                                   (func2, [], {'a': 2, 'b': 10}))
+    :param max_workers: (optional) upper bound of concurrent calls,
+        defaults to the CONTRAIL_API_MAX_WORKERS setting
+    :returns: a tuple of values returned from individual functions.
+        If an exception is raised from a function, the first such
+        exception is re-raised once all calls are complete.
+    """
+    if not worker_defs:
+        return ()
+
+    calls = _worker_calls(worker_defs)
+
+    # A single call does not justify spawning threads.
+    if len(calls) == 1:
+        func, args, func_kwargs = calls[0]
+        return (func(*args, **func_kwargs),)
+
+    max_workers = kwargs.get('max_workers') or _get_max_workers()
+    pool = ThreadPool(min(max_workers, len(calls)))
+    try:
+        results = [pool.apply_async(func, args, func_kwargs)
+                   for func, args, func_kwargs in calls]
+        return tuple(r.get() for r in results)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def call_functions_as_completed(*worker_defs, **kwargs):
+    """Call specified functions in parallel and yield as they complete.
+
+    Takes the same arguments as call_functions_parallel().
+
+    :returns: an iterator of (index, value) tuples, where index is the
+        position of the function among worker_defs, in the order the
+        functions return. If an exception is raised from a function, it
+        is re-raised when its turn comes.
+    """
+    calls = _worker_calls(worker_defs)
+    if not calls:
+        return
+    done = queue.Queue()
+
+    def call(index, func, args, func_kwargs):
+        try:
+            done.put((index, func(*args, **func_kwargs), None))
+        except Exception:
+            done.put((index, None, sys.exc_info()))
+
+    max_workers = kwargs.get('max_workers') or _get_max_workers()
+    pool = ThreadPool(min(max_workers, len(calls)))
+    try:
+        for index, (func, args, func_kwargs) in enumerate(calls):
+            pool.apply_async(call, (index, func, args, func_kwargs))
+        for i in range(len(calls)):
+            index, value, error = done.get()
+            if error:
+                six.reraise(*error)
+            yield index, value
+    finally:
+        pool.close()
+        pool.join()
+
+
+def map_parallel(func, items, **kwargs):
+    """Call func once per item in parallel and return the results in order.
+
+    :param func: function taking a single item
+    :param items: iterable of items
+    :param max_workers: (optional) upper bound of concurrent calls
+    :returns: a list with one result per item
+    """
+    return list(call_functions_parallel(
+        *[(func, (item,)) for item in items], **kwargs))
+
+
+def _call_for_error(call):
+    try:
+        call()
+    except Exception:
+        return sys.exc_info()
+    return None
+
+
+def bulk_delete(stages):
+    """Make deletions in dependency order, concurrently within a stage.
+
+    A deletion whose requirement failed is not made and fails the same
+    way. A stage starts once the one before it is done; its deletions run
+    through map_parallel().
+
+    :param stages: sequence of lists of (key, delete, requires) tuples,
+        where delete is a function taking no arguments and requires holds
+        the keys of deletions of earlier stages that have to succeed first
+    :returns: an OrderedDict mapping every key to None if the deletion
+        succeeded, or to the exc_info of its failure
+    """
+    results = collections.OrderedDict()
+    for stage in stages:
+        pending = []
+        for key, delete, requires in stage:
+            errors = [results[r] for r in requires
+                      if results.get(r) is not None]
+            # keys are added in order, the pending ones filled in below
+            results[key] = errors[0] if errors else None
+            if not errors:
+                pending.append((key, delete))
+        errors = map_parallel(_call_for_error,
+                              [delete for key, delete in pending])
+        results.update(zip([key for key, delete in pending], errors))
+    return results
+
+
+def bulk_create(calls):
+    """Make independent creations concurrently, through map_parallel().
+
+    :param calls: sequence of (key, create) tuples, where create is a
+        function taking no arguments
+    :returns: an OrderedDict mapping every key, in order, to None if the
+        creation succeeded, or to the exc_info of its failure
+    """
+    errors = map_parallel(_call_for_error,
+                          [create for key, create in calls])
+    return collections.OrderedDict(zip([key for key, create in calls],
+                                       errors))
+
+
+def page_params(request, params, marker=None, reversed_order=False):
+    """Return the page size and the list parameters asking for one page.
+
+    One resource more than the page size is asked for, to tell whether
+    there are more pages; see paginate().
+
+    :param params: dict of the other list parameters
+    :param marker: id of the resource the page starts after, or ends
+        before when reversed_order is set
+    :param reversed_order: the page preceding the marker is requested
+    :returns: a tuple of (page_size, params)
+    """
+    page_size = horizon_utils.get_page_size(request)
+    params = dict(params, limit=page_size + 1)
+    if marker:
+        params['marker'] = marker
+    if reversed_order:
+        params['page_reverse'] = True
+    return page_size, params
+
+
+def paginate(items, page_size, marker=None, reversed_order=False):
+    """Cut one page out of a listing requested with limit=page_size + 1.
+
+    Servers without pagination support ignore limit and marker and return
+    the whole collection, in which case the page is located here.
+
+    :param items: resources as returned by the server, ordered by id
+    :param page_size: number of resources on a page
+    :param marker: id of the resource the page starts after, or ends
+        before when reversed_order is set
+    :param reversed_order: the page preceding the marker was requested
+    :returns: a tuple of (items, has_more_data, has_prev_data)
+    """
+    ids = [item['id'] for item in items]
+    if len(items) > page_size + 1 or (marker is not None and marker in ids):
+        if reversed_order:
+            end = ids.index(marker) if marker in ids else len(items)
+            items = items[max(0, end - page_size - 1):end]
+        else:
+            start = ids.index(marker) + 1 if marker in ids else 0
+            items = items[start:start + page_size + 1]
+
+    if reversed_order:
+        if len(items) > page_size:
+            return items[1:], True, True
+        return items, marker is not None, False
+    if len(items) > page_size:
+        return items[:page_size], True, marker is not None
+    return items, False, marker is not None
@@ -18,6 +18,7 @@ from django import http
 from mox import IsA  # noqa
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers import tests as r_test
 from openstack_dashboard.test import helpers as test
 
@@ -27,6 +28,10 @@ class RouterTests(test.BaseAdminViewTests, r_test.RouterTests):
     INDEX_URL = reverse('horizon:%s:l3routers:index' % DASHBOARD)
     DETAIL_PATH = 'horizon:%s:l3routers:detail' % DASHBOARD
 
+    def setUp(self):
+        super(RouterTests, self).setUp()
+        contrail_quantum.project_names.clear()
+
     @test.create_stubs({api.neutron: ('router_list', 'network_list'),
                         api.keystone: ('tenant_list',)})
     def test_index(self):
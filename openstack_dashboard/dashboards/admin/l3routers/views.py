@@ -27,6 +27,8 @@ from contrail_openstack_dashboard.openstack_dashboard.dashboards.admin.l3routers
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.admin.l3routers import tabs as rtabs
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers import views as r_views
 
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
+
 
 class IndexView(r_views.IndexView, n_views.IndexView):
     table_class = rtbl.RoutersTable
@@ -34,6 +36,8 @@ class IndexView(r_views.IndexView, n_views.IndexView):
 
     def _get_routers(self, search_opts=None):
         try:
+            # instrument the client api.neutron calls are made with
+            api_utils.neutronclient(self.request)
             routers = api.neutron.router_list(self.request,
                                               search_opts=search_opts)
         except Exception:
@@ -41,12 +45,12 @@ class IndexView(r_views.IndexView, n_views.IndexView):
             exceptions.handle(self.request,
                               _('Unable to retrieve router list.'))
         if routers:
-            tenant_dict = self._get_tenant_list()
+            tenant_names = self._get_tenant_names(
+                [r.tenant_id for r in routers])
             ext_net_dict = self._list_external_networks()
             for r in routers:
                 # Set tenant name
-                tenant = tenant_dict.get(r.tenant_id, None)
-                r.tenant_name = getattr(tenant, 'name', None)
+                r.tenant_name = tenant_names.get(r.tenant_id)
                 # If name is empty use UUID as name
                 r.set_id_as_name_if_empty()
                 # Set external network name
@@ -25,6 +25,7 @@ from horizon import forms
 from horizon import messages
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
 
 
 LOG = logging.getLogger(__name__)
@@ -51,10 +52,8 @@ class CreateNetwork(forms.SelfHandlingForm):
     def __init__(self, request, *args, **kwargs):
         super(CreateNetwork, self).__init__(request, *args, **kwargs)
         tenant_choices = [('', _("Select a project"))]
-        tenants, has_more = api.keystone.tenant_list(request)
-        for tenant in tenants:
-            if tenant.enabled:
-                tenant_choices.append((tenant.id, tenant.name))
+        tenant_choices.extend(
+            contrail_quantum.project_names.enabled_projects(request))
         self.fields['tenant_id'].choices = tenant_choices
 
         if api.neutron.is_port_profiles_supported():
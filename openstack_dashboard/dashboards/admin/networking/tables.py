@@ -81,6 +81,8 @@ class NetworksTable(tables.DataTable):
     class Meta:
         name = "networks"
         verbose_name = _("Networks")
+        pagination_param = "networks_marker"
+        prev_pagination_param = "prev_networks_marker"
         table_actions = (project_tables.NetFilterAction,
                          CreateNetwork, DeleteNetwork)
         row_actions = (EditNetwork, DeleteNetwork)
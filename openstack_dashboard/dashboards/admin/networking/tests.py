@@ -19,9 +19,12 @@ from django import http
 
 from horizon.workflows import views
 
+from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from neutronclient.v2_0 import client as neutron_client
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking import tests
 from openstack_dashboard.test import helpers as test
 
@@ -30,12 +33,25 @@ INDEX_URL = reverse('horizon:admin:networking:index')
 
 
 class NetworkTests(test.BaseAdminViewTests):
-    @test.create_stubs({api.neutron: ('network_list',),
-                        api.keystone: ('tenant_list',)})
+    def setUp(self):
+        super(NetworkTests, self).setUp()
+        contrail_quantum.project_names.clear()
+
+    def _stub_neutronclient(self):
+        self.mox.StubOutWithMock(api.neutron, 'neutronclient')
+        neutronclient = self.mox.CreateMock(neutron_client.Client)
+        api.neutron.neutronclient(IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(neutronclient)
+        return neutronclient
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
     def test_index(self):
         tenants = self.tenants.list()
-        api.neutron.network_list(IsA(http.HttpRequest)) \
-            .AndReturn(self.networks.list())
+        neutronclient = self._stub_neutronclient()
+        neutronclient.list_networks(retrieve_all=False, limit=IgnoreArg()) \
+            .AndReturn(iter([{'networks': self.api_networks.list()}]))
+        neutronclient.list_subnets(id=IgnoreArg()) \
+            .AndReturn({'subnets': self.api_subnets.list()})
         api.keystone.tenant_list(IsA(http.HttpRequest))\
             .AndReturn([tenants, False])
 
@@ -47,9 +63,60 @@ class NetworkTests(test.BaseAdminViewTests):
         networks = res.context['networks_table'].data
         self.assertItemsEqual(networks, self.networks.list())
 
-    @test.create_stubs({api.neutron: ('network_list',)})
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_index_project_names_cached(self):
+        tenants = self.tenants.list()
+        neutronclient = self._stub_neutronclient()
+        for i in range(2):
+            neutronclient.list_networks(retrieve_all=False,
+                                        limit=IgnoreArg()) \
+                .AndReturn(iter([{'networks': self.api_networks.list()}]))
+            neutronclient.list_subnets(id=IgnoreArg()) \
+                .AndReturn({'subnets': self.api_subnets.list()})
+        # the projects are listed for the first page load only
+        api.keystone.tenant_list(IsA(http.HttpRequest))\
+            .AndReturn([tenants, False])
+
+        self.mox.ReplayAll()
+
+        self.client.get(INDEX_URL)
+        res = self.client.get(INDEX_URL)
+
+        tenant_names = dict((t.id, t.name) for t in tenants)
+        networks = res.context['networks_table'].data
+        for network in networks:
+            self.assertEqual(tenant_names.get(network.tenant_id),
+                             network.tenant_name)
+
+    @test.create_stubs({api.keystone: ('tenant_list',)})
+    def test_project_names_per_domain(self):
+        tenants = self.tenants.list()
+        api.keystone.tenant_list(IsA(http.HttpRequest))\
+            .AndReturn([tenants[:1], False])
+        api.keystone.tenant_list(IsA(http.HttpRequest))\
+            .AndReturn([tenants[1:], False])
+
+        self.mox.ReplayAll()
+
+        # admins of another domain do not get the projects of the first
+        self.request.user.user_domain_id = 'domain-1'
+        first = contrail_quantum.project_names.enabled_projects(self.request)
+        self.request.user.user_domain_id = 'domain-2'
+        second = contrail_quantum.project_names.enabled_projects(
+            self.request)
+        self.request.user.user_domain_id = 'domain-1'
+        cached = contrail_quantum.project_names.enabled_projects(
+            self.request)
+
+        self.assertEqual([(t.id, t.name) for t in tenants[:1] if t.enabled],
+                         first)
+        self.assertEqual([(t.id, t.name) for t in tenants[1:] if t.enabled],
+                         second)
+        self.assertEqual(first, cached)
+
     def test_index_network_list_exception(self):
-        api.neutron.network_list(IsA(http.HttpRequest)) \
+        neutronclient = self._stub_neutronclient()
+        neutronclient.list_networks(retrieve_all=False, limit=IgnoreArg()) \
             .AndRaise(self.exceptions.neutron)
 
         self.mox.ReplayAll()
@@ -15,14 +15,15 @@
 #    under the License.
 
 from django.core.urlresolvers import reverse_lazy  # noqa
-from django.utils.datastructures import SortedDict  # noqa
 from django.utils.translation import ugettext_lazy as _  # noqa
 
 from horizon import exceptions
 from horizon import forms
 from horizon import tables
 
-from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking \
+    import tabs as user_tabs
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking \
     import views as user_views
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.admin.networking \
@@ -39,32 +40,40 @@ class IndexView(tables.DataTableView):
     table_class = networks_tables.NetworksTable
     template_name = 'admin/networking/index.html'
 
-    def _get_tenant_list(self):
-        if not hasattr(self, "_tenants"):
-            try:
-                tenants, has_more = api.keystone.tenant_list(self.request)
-            except Exception:
-                tenants = []
-                msg = _('Unable to retrieve instance project information.')
-                exceptions.handle(self.request, msg)
+    def _get_tenant_names(self, tenant_ids):
+        try:
+            return contrail_quantum.project_names.names(self.request,
+                                                        tenant_ids)
+        except Exception:
+            msg = _('Unable to retrieve instance project information.')
+            exceptions.handle(self.request, msg)
+            return {}
 
-            tenant_dict = SortedDict([(t.id, t) for t in tenants])
-            self._tenants = tenant_dict
-        return self._tenants
+    def has_more_data(self, table):
+        return self._more
+
+    def has_prev_data(self, table):
+        return self._prev
 
     def get_data(self):
+        self._more = self._prev = False
+        marker, reversed_order = user_tabs.get_page_marker(
+            self.request, networks_tables.NetworksTable)
         try:
-            networks = api.neutron.network_list(self.request)
+            networks, self._more, self._prev = \
+                contrail_quantum.network_list_paged(
+                    self.request, marker=marker,
+                    reversed_order=reversed_order)
         except Exception:
             networks = []
             msg = _('Network list can not be retrieved.')
             exceptions.handle(self.request, msg)
         if networks:
-            tenant_dict = self._get_tenant_list()
+            tenant_names = self._get_tenant_names(
+                [n.tenant_id for n in networks])
             for n in networks:
                 # Set tenant name
-                tenant = tenant_dict.get(n.tenant_id, None)
-                n.tenant_name = getattr(tenant, 'name', None)
+                n.tenant_name = tenant_names.get(n.tenant_id)
                 # If name is empty use UUID as name
                 n.set_id_as_name_if_empty()
         return networks
@@ -76,57 +85,12 @@ class CreateView(forms.ModalFormView):
     success_url = reverse_lazy('horizon:admin:networking:index')
 
 
-class DetailView(tables.MultiTableView):
+class DetailView(user_views.DetailView):
     table_classes = (subnets_tables.SubnetsTable,
                      ports_tables.PortsTable)
     template_name = 'project/networking/detail.html'
     failure_url = reverse_lazy('horizon:admin:networking:index')
 
-    def get_subnets_data(self):
-        try:
-            network_id = self.kwargs['network_id']
-            subnets = api.neutron.subnet_list(self.request,
-                                              network_id=network_id)
-        except Exception:
-            subnets = []
-            msg = _('Subnet list can not be retrieved.')
-            exceptions.handle(self.request, msg)
-        for s in subnets:
-            s.set_id_as_name_if_empty()
-        return subnets
-
-    def get_ports_data(self):
-        try:
-            network_id = self.kwargs['network_id']
-            ports = api.neutron.port_list(self.request, network_id=network_id)
-        except Exception:
-            ports = []
-            msg = _('Port list can not be retrieved.')
-            exceptions.handle(self.request, msg)
-        for p in ports:
-            p.set_id_as_name_if_empty()
-        return ports
-
-    def _get_data(self):
-        if not hasattr(self, "_network"):
-            try:
-                network_id = self.kwargs['network_id']
-                network = api.neutron.network_get(self.request, network_id)
-                network.set_id_as_name_if_empty(length=0)
-            except Exception:
-                redirect = self.failure_url
-                exceptions.handle(self.request,
-                                  _('Unable to retrieve details for '
-                                    'network "%s".') % network_id,
-                                    redirect=redirect)
-            self._network = network
-        return self._network
-
-    def get_context_data(self, **kwargs):
-        context = super(DetailView, self).get_context_data(**kwargs)
-        context["network"] = self._get_data()
-        return context
-
 
 class UpdateView(user_views.UpdateView):
     form_class = project_forms.UpdateNetwork
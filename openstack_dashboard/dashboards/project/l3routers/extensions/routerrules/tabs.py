@@ -26,6 +26,68 @@ from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3route
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers.extensions.routerrules\
     import tables as rrtbl
 
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
+
+
+V4_ANY_WORDS = ['external', 'any']
+
+
+def _parse_cidr(cidr):
+    """Return the first and last address, prefix length and whether the
+    cidr is 0.0.0.0/0, as plain values.
+    """
+    net = netaddr.IPNetwork(cidr)
+    return (net.first, net.last, net.prefixlen, str(net) == '0.0.0.0/0')
+
+
+def _rulename(subnet):
+    # differentiate between external and any
+    if subnet['cidr'] == '0.0.0.0/0':
+        return subnet['subnetid']
+    return subnet['cidr']
+
+
+class RuleMatcher(object):
+    """Router rules parsed once for evaluating a connectivity matrix.
+
+    Each rule is parsed into integer address ranges a single time, and the
+    rules are kept ordered the way a cell picks the rule deciding it: the
+    most specific source, then destination, first. Rules that cannot
+    apply to a source subnet are filtered out once per matrix row.
+    """
+
+    def __init__(self, rules):
+        parsed = []
+        for rule in rules:
+            source = rule['source']
+            if source in V4_ANY_WORDS:
+                source = '0.0.0.0/0'
+            destination = rule['destination']
+            if destination in V4_ANY_WORDS:
+                destination = '0.0.0.0/0'
+            parsed.append((_parse_cidr(source), _parse_cidr(destination),
+                           rule))
+        # sorted() is stable with reverse=True as well, so rules of equal
+        # specificity keep their order
+        self.rules = sorted(parsed, key=lambda r: (r[0][2], r[1][2]),
+                            reverse=True)
+
+    def source_rules(self, src_net, src_rulename):
+        """Return the rules that can apply to traffic from a subnet."""
+        src_first, src_last, src_prefixlen, src_any = src_net
+        candidates = []
+        for parsed in self.rules:
+            rs_first, rs_last, rs_prefixlen, rs_any = parsed[0]
+            if src_first >= rs_last or src_last <= rs_first:
+                continue
+            if src_any and not rs_any:
+                continue
+            if (parsed[2]['source'] == 'external' and
+                    src_rulename not in V4_ANY_WORDS):
+                continue
+            candidates.append(parsed)
+        return candidates
+
 
 class RouterRulesTab(tabs.TableTab):
     table_classes = (rrtbl.RouterRulesTable,)
@@ -83,8 +145,10 @@ class RulesGridTab(tabs.Tab):
 
     def get_routerrulesgrid_data(self, rules):
         ports = self.tab_group.ports
-        networks = api.neutron.network_list_for_tenant(self.request,
-                                         self.request.user.tenant_id)
+        # instrument the client api.neutron calls are made with
+        api_utils.neutronclient(self.request)
+        networks = api.neutron.network_list_for_tenant(
+            self.request, self.request.user.tenant_id)
         for n in networks:
             n.set_id_as_name_if_empty()
         netnamemap = {}
@@ -120,90 +184,73 @@ class RulesGridTab(tabs.Tab):
                         'networkname': 'any',
                         'networkid': 'any',
                         'cidr': '0.0.0.0/0'})
-        for source in subnets:
+        matcher = RuleMatcher(rules)
+        networks = [_parse_cidr(sub['cidr']) for sub in subnets]
+        for source, src_net in zip(subnets, networks):
+            src_rulename = _rulename(source)
+            candidates = matcher.source_rules(src_net, src_rulename)
             row = {'source': dict(source),
                    'targets': []}
-            for target in subnets:
-                target.update(self._get_subnet_connectivity(
-                              source, target, rules))
-                row['targets'].append(dict(target))
+            for target, dst_net in zip(subnets, networks):
+                connectivity = self._get_subnet_connectivity(
+                    source, target, candidates, src_net, dst_net)
+                row['targets'].append(dict(target, **connectivity))
             matrix.append(row)
         return matrix
 
-    def _get_subnet_connectivity(self, src_sub, dst_sub, rules):
-        v4_any_words = ['external', 'any']
+    def _get_subnet_connectivity(self, src_sub, dst_sub, rules, src_net,
+                                 dst_net):
+        """Return the connectivity of one cell of the matrix.
+
+        rules are the candidates for the source subnet as returned by
+        RuleMatcher.source_rules(), src_net and dst_net the parsed cidrs.
+        """
         connectivity = {'reachable': '',
                         'inverse_rule': {},
                         'rule_to_delete': False}
-        src = src_sub['cidr']
-        dst = dst_sub['cidr']
-        # differentiate between external and any
-        src_rulename = src_sub['subnetid'] if src == '0.0.0.0/0' else src
-        dst_rulename = dst_sub['subnetid'] if dst == '0.0.0.0/0' else dst
-        if str(src) == str(dst):
+        src_rulename = _rulename(src_sub)
+        dst_rulename = _rulename(dst_sub)
+        if str(src_sub['cidr']) == str(dst_sub['cidr']):
             connectivity['reachable'] = 'full'
             return connectivity
-        matchingrules = []
 
-        for rule in rules:
-            rd = rule['destination']
-            if rule['destination'] in v4_any_words:
-                rd = '0.0.0.0/0'
-            rs = rule['source']
-            if rule['source'] in v4_any_words:
-                rs = '0.0.0.0/0'
-            rs = netaddr.IPNetwork(rs)
-            src = netaddr.IPNetwork(src)
-            rd = netaddr.IPNetwork(rd)
-            dst = netaddr.IPNetwork(dst)
+        dst_first, dst_last, dst_prefixlen, dst_any = dst_net
+        # the candidates are ordered most specific first, so the first one
+        # that applies decides
+        match = None
+        for (src_rule, dst_rule, rule) in rules:
+            rd_first, rd_last, rd_prefixlen, rd_any = dst_rule
             # check if cidrs are affected by rule first
-            if (int(dst.network) >= int(rd.broadcast) or
-                int(dst.broadcast) <= int(rd.network) or
-                int(src.network) >= int(rs.broadcast) or
-                   int(src.broadcast) <= int(rs.network)):
+            if dst_first >= rd_last or dst_last <= rd_first:
                 continue
-
             # skip matching rules for 'any' and 'external' networks
-            if (str(dst) == '0.0.0.0/0' and str(rd) != '0.0.0.0/0'):
-                continue
-            if (str(src) == '0.0.0.0/0' and str(rs) != '0.0.0.0/0'):
+            if dst_any and not rd_any:
                 continue
-
             # external network rules only affect external traffic
-            if (rule['source'] == 'external' and
-                    src_rulename not in v4_any_words):
-                continue
             if (rule['destination'] == 'external' and
-                    dst_rulename not in v4_any_words):
+                    dst_rulename not in V4_ANY_WORDS):
                 continue
+            match = (src_rule[2], rd_prefixlen, rule)
+            break
 
-            match = {'bitsinsrc': rs.prefixlen,
-                     'bitsindst': rd.prefixlen,
-                     'rule': rule}
-            matchingrules.append(match)
-
-        if not matchingrules:
+        if match is None:
             connectivity['reachable'] = 'none'
             connectivity['inverse_rule'] = {'source': src_rulename,
                                             'destination': dst_rulename,
                                             'action': 'permit'}
             return connectivity
 
-        sortedrules = sorted(matchingrules,
-                             key=lambda k: (k['bitsinsrc'], k['bitsindst']),
-                             reverse=True)
-        match = sortedrules[0]
-        if (match['bitsinsrc'] > src.prefixlen or
-               match['bitsindst'] > dst.prefixlen):
+        bitsinsrc, bitsindst, rule = match
+        if bitsinsrc > src_net[2] or bitsindst > dst_prefixlen:
             connectivity['reachable'] = 'partial'
-            connectivity['conflicting_rule'] = match['rule']
+            connectivity['conflicting_rule'] = rule
             return connectivity
 
-        if (match['rule']['source'] == src_rulename and
-                match['rule']['destination'] == dst_rulename):
-            connectivity['rule_to_delete'] = match['rule']
+        if (rule['source'] == src_rulename and
+                rule['destination'] == dst_rulename):
+            connectivity['rule_to_delete'] = rule
 
-        if match['rule']['action'] == 'permit':
+        if rule['action'] == 'permit':
             connectivity['reachable'] = 'full'
             inverseaction = 'deny'
         else:
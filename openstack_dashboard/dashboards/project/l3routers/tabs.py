@@ -47,8 +47,13 @@ class RouterDetailTabs(tabs.TabGroup):
             self.router = kwargs['router']
         else:
             self.router = api.neutron.router_get(request, rid)
+        # the detail view may have started fetching the ports already
+        prefetch = kwargs.get('prefetch')
         try:
-            self.ports = api.neutron.port_list(request, device_id=rid)
+            if prefetch is not None:
+                self.ports = prefetch.get('ports')
+            else:
+                self.ports = api.neutron.port_list(request, device_id=rid)
         except Exception:
             self.ports = []
             msg = _('Unable to retrieve router details.')
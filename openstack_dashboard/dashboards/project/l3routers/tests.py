@@ -21,6 +21,8 @@ from mox import IsA  # noqa
 from openstack_dashboard import api
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers.extensions.routerrules\
     import rulemanager
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers.extensions.routerrules\
+    import tabs as rrtabs
 from openstack_dashboard.test import helpers as test
 
 
@@ -503,6 +505,12 @@ class RouterActionTests(test.TestCase):
         self.assertRedirectsNoFollow(res, detail_url)
 
 
+class GridTabGroup(object):
+    def __init__(self, ports):
+        self.ports = ports
+        self.kwargs = {}
+
+
 class RouterRuleTests(test.TestCase):
     DASHBOARD = 'project'
     INDEX_URL = reverse('horizon:%s:l3routers:index' % DASHBOARD)
@@ -574,6 +582,78 @@ class RouterRuleTests(test.TestCase):
         rules = res.context['routerrules_table'].data
         self.assertItemsEqual(rules, router['router_rules'])
 
+    @test.create_stubs({api.neutron: ('network_list_for_tenant',)})
+    def test_routerrules_grid(self):
+        # overlapping subnets and rules, 'any' and 'external'
+        cidrs = ['10.0.0.0/24', '10.0.0.0/16', '10.1.0.0/24', '10.1.0.128/25']
+        networks = []
+        ports = []
+        for i, cidr in enumerate(cidrs, 1):
+            subnet = api.neutron.Subnet({'id': 'subnet-%d' % i,
+                                         'name': 'subnet-%d' % i,
+                                         'network_id': 'net-%d' % i,
+                                         'cidr': cidr,
+                                         'ip_version': 4})
+            networks.append(api.neutron.Network({'id': 'net-%d' % i,
+                                                 'name': 'net-%d' % i,
+                                                 'admin_state_up': True,
+                                                 'subnets': [subnet]}))
+            ports.append({'network_id': 'net-%d' % i,
+                          'fixed_ips': [{'subnet_id': 'subnet-%d' % i,
+                                         'ip_address': cidr.split('/')[0]}]})
+        rules = [{'id': '1', 'source': 'any', 'destination': 'any',
+                  'action': 'permit', 'nexthops': []},
+                 {'id': '2', 'source': '10.0.0.0/16',
+                  'destination': '10.1.0.0/24', 'action': 'deny',
+                  'nexthops': []},
+                 {'id': '3', 'source': '10.0.0.0/24',
+                  'destination': '10.1.0.0/24', 'action': 'permit',
+                  'nexthops': []},
+                 {'id': '4', 'source': '10.1.0.0/24',
+                  'destination': 'external', 'action': 'deny',
+                  'nexthops': []},
+                 {'id': '5', 'source': 'external',
+                  'destination': '10.0.0.0/16', 'action': 'deny',
+                  'nexthops': []}]
+        api.neutron.network_list_for_tenant(IsA(http.HttpRequest),
+                                            self.tenant.id)\
+            .AndReturn(networks)
+        self.mox.ReplayAll()
+
+        tab = rrtabs.RulesGridTab(GridTabGroup(ports))
+        tab.request = self.request
+        matrix = tab.get_routerrulesgrid_data(rules)
+
+        # the grid computed before the rules were parsed once per render
+        names = ['subnet-1', 'subnet-2', 'subnet-3', 'subnet-4',
+                 'external', 'any']
+        reachable = [
+            ['full', 'full', 'full', 'full', 'full', 'full'],
+            ['full', 'full', 'partial', 'partial', 'full', 'full'],
+            ['full', 'full', 'full', 'full', 'none', 'none'],
+            ['full', 'full', 'full', 'full', 'none', 'none'],
+            ['none', 'none', 'full', 'full', 'full', 'full'],
+            ['none', 'none', 'full', 'full', 'full', 'full']]
+        conflicting = {('subnet-2', 'subnet-3'): '3',
+                       ('subnet-2', 'subnet-4'): '3'}
+        to_delete = {('subnet-1', 'subnet-3'): '3',
+                     ('subnet-3', 'external'): '4',
+                     ('external', 'subnet-2'): '5'}
+        self.assertEqual(names, [row['source']['subnetid']
+                                 for row in matrix])
+        for row, expected in zip(matrix, reachable):
+            source = row['source']['subnetid']
+            self.assertEqual(names, [cell['subnetid']
+                                     for cell in row['targets']])
+            self.assertEqual(expected, [cell['reachable']
+                                        for cell in row['targets']])
+            for cell in row['targets']:
+                key = (source, cell['subnetid'])
+                self.assertEqual(conflicting.get(key),
+                                 cell.get('conflicting_rule', {}).get('id'))
+                self.assertEqual(to_delete.get(key),
+                                 (cell['rule_to_delete'] or {}).get('id'))
+
     def _test_router_addrouterrule(self, raise_error=False):
         pre_router = self.routers_with_rules.first()
         post_router = copy.deepcopy(pre_router)
@@ -29,6 +29,7 @@ from horizon import tables
 from horizon import tabs
 from horizon.utils import memoized
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers\
     import forms as project_forms
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.l3routers import tables as rtables
@@ -99,11 +100,26 @@ class DetailView(tabs.TabbedTableView):
     template_name = 'project/l3routers/detail.html'
     failure_url = reverse_lazy('horizon:project:l3routers:index')
 
+    @memoized.memoized_method
+    def _prefetch(self):
+        # the router, its ports and the features shown are fetched at once;
+        # the external network has to wait for the router
+        router_id = self.kwargs['router_id']
+        return contrail_quantum.Prefetch(
+            router=lambda: api.neutron.router_get(self.request, router_id),
+            ports=lambda: api.neutron.port_list(self.request,
+                                                device_id=router_id),
+            features=lambda: (
+                api.neutron.get_feature_permission(self.request, "dvr",
+                                                   "get"),
+                api.neutron.get_feature_permission(self.request, "l3-ha",
+                                                   "get")))
+
     @memoized.memoized_method
     def _get_data(self):
         try:
             router_id = self.kwargs['router_id']
-            router = api.neutron.router_get(self.request, router_id)
+            router = self._prefetch().get('router')
             router.set_id_as_name_if_empty(length=0)
         except Exception:
             msg = _('Unable to retrieve details for router "%s".') \
@@ -126,15 +142,14 @@ class DetailView(tabs.TabbedTableView):
     def get_context_data(self, **kwargs):
         context = super(DetailView, self).get_context_data(**kwargs)
         context["router"] = self._get_data()
-        context['dvr_supported'] = api.neutron.get_feature_permission(
-            self.request, "dvr", "get")
-        context['ha_supported'] = api.neutron.get_feature_permission(
-            self.request, "l3-ha", "get")
+        context['dvr_supported'], context['ha_supported'] = \
+            self._prefetch().get('features')
         return context
 
     def get(self, request, *args, **kwargs):
         router = self._get_data()
         self.kwargs['router'] = router
+        self.kwargs['prefetch'] = self._prefetch()
         return super(DetailView, self).get(request, *args, **kwargs)
 
 
@@ -18,12 +18,12 @@ from django.template import defaultfilters as filters
 from django.utils import http
 from django.utils.translation import ugettext_lazy as _
 
-from horizon import exceptions
 from horizon import tables
 
-from openstack_dashboard import api
 from openstack_dashboard import policy
 
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas import utils
+
 
 class AddPoolLink(tables.LinkAction):
     name = "addpool"
@@ -188,17 +188,13 @@ class AddPMAssociationLink(policy.PolicyTargetMixin,
     policy_rules = (("network", "create_pool_health_monitor"),)
 
     def allowed(self, request, datum=None):
+        # the monitors are listed once for all the rows
         try:
-            tenant_id = request.user.tenant_id
-            monitors = api.lbaas.pool_health_monitor_list(request,
-                                                          tenant_id=tenant_id)
-            for m in monitors:
-                if m.id not in datum['health_monitors']:
-                    return True
+            monitor_ids = utils.tenant_resources(request).monitor_ids()
         except Exception:
-            exceptions.handle(request,
-                              _('Failed to retrieve health monitors.'))
-        return False
+            # the monitors tab reports the failure
+            return False
+        return bool(monitor_ids.difference(datum['health_monitors']))
 
 
 class DeletePMAssociationLink(policy.PolicyTargetMixin,
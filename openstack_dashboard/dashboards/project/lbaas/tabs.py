@@ -32,9 +32,7 @@ class PoolsTab(tabs.TableTab):
 
     def get_poolstable_data(self):
         try:
-            tenant_id = self.request.user.tenant_id
-            pools = api.lbaas.pool_list(self.tab_group.request,
-                                        tenant_id=tenant_id)
+            pools = utils.tenant_resources(self.tab_group.request).pools()
         except Exception:
             pools = []
             exceptions.handle(self.tab_group.request,
@@ -52,9 +50,8 @@ class MembersTab(tabs.TableTab):
 
     def get_memberstable_data(self):
         try:
-            tenant_id = self.request.user.tenant_id
-            members = api.lbaas.member_list(self.tab_group.request,
-                                            tenant_id=tenant_id)
+            members = utils.tenant_resources(
+                self.tab_group.request).members()
         except Exception:
             members = []
             exceptions.handle(self.tab_group.request,
@@ -72,9 +69,8 @@ class MonitorsTab(tabs.TableTab):
 
     def get_monitorstable_data(self):
         try:
-            tenant_id = self.request.user.tenant_id
-            monitors = api.lbaas.pool_health_monitor_list(
-                self.tab_group.request, tenant_id=tenant_id)
+            monitors = utils.tenant_resources(
+                self.tab_group.request).monitors()
         except Exception:
             monitors = []
             exceptions.handle(self.tab_group.request,
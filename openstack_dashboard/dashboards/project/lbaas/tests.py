@@ -15,12 +15,14 @@ from mox import IsA  # noqa
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
 from django import http
+from django.test.utils import override_settings
 
 from horizon.workflows import views
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
 
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas import utils
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas import workflows
 
 
@@ -59,29 +61,29 @@ class LoadBalancerTests(test.TestCase):
             IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndReturn(self.pools.list())
 
-        # retrieves members
-        api.lbaas.member_list(
+        # retrieves members, named after the pools above
+        utils.member_list(
             IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndReturn(self.members.list())
 
-        # retrieves monitors
+        # retrieves monitors, once for the tab and all the pool rows
         api.lbaas.pool_health_monitor_list(
-            IsA(http.HttpRequest), tenant_id=self.tenant.id).MultipleTimes() \
+            IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndReturn(self.monitors.list())
 
     def set_up_expect_with_exception(self):
         api.lbaas.pool_list(
             IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndRaise(self.exceptions.neutron)
-        api.lbaas.member_list(
+        utils.member_list(
             IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndRaise(self.exceptions.neutron)
         api.lbaas.pool_health_monitor_list(
             IsA(http.HttpRequest), tenant_id=self.tenant.id) \
             .AndRaise(self.exceptions.neutron)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_pools(self):
         self.set_up_expect()
 
@@ -95,8 +97,8 @@ class LoadBalancerTests(test.TestCase):
         self.assertEqual(len(res.context['table'].data),
                          len(self.pools.list()))
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_members(self):
         self.set_up_expect()
 
@@ -109,9 +111,12 @@ class LoadBalancerTests(test.TestCase):
         self.assertTemplateUsed(res, 'horizon/common/_detail_table.html')
         self.assertEqual(len(res.context['memberstable_table'].data),
                          len(self.members.list()))
+        pool_names = dict((p.id, p.name_or_id) for p in self.pools.list())
+        for m in res.context['memberstable_table'].data:
+            self.assertEqual(pool_names[m.pool_id], m.pool_name)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_monitors(self):
         self.set_up_expect()
 
@@ -125,8 +130,8 @@ class LoadBalancerTests(test.TestCase):
         self.assertEqual(len(res.context['monitorstable_table'].data),
                          len(self.monitors.list()))
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_exception_pools(self):
         self.set_up_expect_with_exception()
 
@@ -141,8 +146,8 @@ class LoadBalancerTests(test.TestCase):
                                 'horizon/common/_detail_table.html')
         self.assertEqual(len(res.context['table'].data), 0)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_exception_members(self):
         self.set_up_expect_with_exception()
 
@@ -157,8 +162,8 @@ class LoadBalancerTests(test.TestCase):
                                 'horizon/common/_detail_table.html')
         self.assertEqual(len(res.context['memberstable_table'].data), 0)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list'),
+                        utils: ('member_list',)})
     def test_index_exception_monitors(self):
         self.set_up_expect_with_exception()
 
@@ -506,7 +511,8 @@ class LoadBalancerTests(test.TestCase):
                 {'fixed_ips': [{'ip_address': member.address,
                                 'subnet_id':
                                 'e8abc972-eb0c-41f1-9edd-4bc6e3bcd8c9'}],
-                 'network_id': '82288d84-e0a5-42ac-95be-e6af08727e42'})
+                 'network_id': '82288d84-e0a5-42ac-95be-e6af08727e42',
+                 'device_id': server1.id})
 
             api.lbaas.pool_get(
                 IsA(http.HttpRequest), pool.id).AndReturn(pool)
@@ -515,12 +521,13 @@ class LoadBalancerTests(test.TestCase):
                     {'fixed_ips': [{'ip_address': '172.16.88.12',
                                     'subnet_id':
                                     '3f7c5d79-ee55-47b0-9213-8e669fb03009'}],
-                     'network_id': '72c3ab6c-c80f-4341-9dc5-210fa31ac6c2'})
+                     'network_id': '72c3ab6c-c80f-4341-9dc5-210fa31ac6c2',
+                     'device_id': server1.id})
                 api.neutron.port_list(IsA(http.HttpRequest),
-                    device_id=server1.id).AndReturn([port1, port2])
+                    device_id=[server1.id]).AndReturn([port1, port2])
             else:
                 api.neutron.port_list(IsA(http.HttpRequest),
-                    device_id=server1.id).AndReturn([port1, ])
+                    device_id=[server1.id]).AndReturn([port1, ])
 
         form_data = {'pool_id': member.pool_id,
                      'protocol_port': member.protocol_port,
@@ -870,12 +877,16 @@ class LoadBalancerTests(test.TestCase):
             '<DeletePMAssociationStep: deletepmassociationaction>', ]
         self.assertQuerysetEqual(workflow.steps, expected_objs)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list',
-                                    'pool_delete')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'member_delete', 'pool_delete'),
+                        utils: ('member_list', 'pool_member_ids')})
     def test_delete_pool(self):
         self.set_up_expect()
         pool = self.pools.first()
+        member = self.members.first()
+        utils.pool_member_ids(IsA(http.HttpRequest), [pool.id])\
+            .AndReturn({pool.id: [member.id]})
+        api.lbaas.member_delete(IsA(http.HttpRequest), member.id)
         api.lbaas.pool_delete(IsA(http.HttpRequest), pool.id)
         self.mox.ReplayAll()
 
@@ -884,14 +895,65 @@ class LoadBalancerTests(test.TestCase):
 
         self.assertNoFormErrors(res)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list',
-                                    'pool_get', 'vip_delete')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'member_delete', 'pool_delete'),
+                        utils: ('member_list', 'pool_member_ids')})
+    def test_delete_pool_member_delete_error(self):
+        self.set_up_expect()
+        pool = self.pools.first()
+        member = self.members.first()
+        utils.pool_member_ids(IsA(http.HttpRequest), [pool.id])\
+            .AndReturn({pool.id: [member.id]})
+        api.lbaas.member_delete(IsA(http.HttpRequest), member.id)\
+            .AndRaise(self.exceptions.neutron)
+        # the pool is not deleted while one of its members is left
+        self.mox.ReplayAll()
+
+        form_data = {"action": "poolstable__deletepool__%s" % pool.id}
+        res = self.client.post(self.INDEX_URL, form_data)
+
+        self.assertNoFormErrors(res)
+        self.assertMessageCount(res, error=1)
+
+    # one worker, for the deletions to reach the stubs one at a time
+    @override_settings(CONTRAIL_API_MAX_WORKERS=1)
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'member_delete', 'pool_delete'),
+                        utils: ('member_list', 'pool_member_ids')})
+    def test_delete_pools_members_first(self):
+        self.set_up_expect()
+        pool1, pool2 = self.pools.list()[:2]
+        member1, member2 = self.members.list()[:2]
+        deleted = []
+        utils.pool_member_ids(IsA(http.HttpRequest), [pool1.id, pool2.id])\
+            .AndReturn({pool1.id: [member1.id], pool2.id: [member2.id]})
+        api.lbaas.member_delete(IsA(http.HttpRequest), member1.id)\
+            .InAnyOrder().WithSideEffects(lambda *args: deleted.append(args))
+        api.lbaas.member_delete(IsA(http.HttpRequest), member2.id)\
+            .InAnyOrder().AndRaise(self.exceptions.neutron)
+        # pool2 is kept, its member is left
+        api.lbaas.pool_delete(IsA(http.HttpRequest), pool1.id)\
+            .WithSideEffects(lambda *args: deleted.append(args))
+        self.mox.ReplayAll()
+
+        form_data = {"action": "poolstable__deletepool",
+                     "object_ids": [pool1.id, pool2.id]}
+        res = self.client.post(self.INDEX_URL, form_data)
+
+        self.assertNoFormErrors(res)
+        self.assertEqual([member1.id, pool1.id],
+                         [obj_id for request, obj_id in deleted])
+        self.assertMessageCount(res, success=1, error=1)
+
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'vip_delete'),
+                        utils: ('member_list', 'pool_vip_ids')})
     def test_delete_vip(self):
         self.set_up_expect()
         pool = self.pools.first()
         vip = self.vips.first()
-        api.lbaas.pool_get(IsA(http.HttpRequest), pool.id).AndReturn(pool)
+        utils.pool_vip_ids(IsA(http.HttpRequest), [pool.id])\
+            .AndReturn({pool.id: vip.id})
         api.lbaas.vip_delete(IsA(http.HttpRequest), vip.id)
         self.mox.ReplayAll()
 
@@ -900,9 +962,9 @@ class LoadBalancerTests(test.TestCase):
 
         self.assertNoFormErrors(res)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list',
-                                    'member_delete')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'member_delete'),
+                        utils: ('member_list',)})
     def test_delete_member(self):
         self.set_up_expect()
         member = self.members.first()
@@ -914,9 +976,9 @@ class LoadBalancerTests(test.TestCase):
 
         self.assertNoFormErrors(res)
 
-    @test.create_stubs({api.lbaas: ('pool_list', 'member_list',
-                                    'pool_health_monitor_list',
-                                    'pool_health_monitor_delete')})
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'pool_health_monitor_delete'),
+                        utils: ('member_list',)})
     def test_delete_monitor(self):
         self.set_up_expect()
         monitor = self.monitors.first()
@@ -927,3 +989,23 @@ class LoadBalancerTests(test.TestCase):
         res = self.client.post(self.INDEX_URL, form_data)
 
         self.assertNoFormErrors(res)
+
+    @test.create_stubs({api.lbaas: ('pool_list', 'pool_health_monitor_list',
+                                    'pool_health_monitor_delete'),
+                        utils: ('member_list',)})
+    def test_delete_monitors_partial_failure(self):
+        self.set_up_expect()
+        monitor1, monitor2 = self.monitors.list()[:2]
+        api.lbaas.pool_health_monitor_delete(
+            IsA(http.HttpRequest), monitor1.id).InAnyOrder()
+        api.lbaas.pool_health_monitor_delete(
+            IsA(http.HttpRequest), monitor2.id).InAnyOrder()\
+            .AndRaise(self.exceptions.neutron)
+        self.mox.ReplayAll()
+
+        form_data = {"action": "monitorstable__deletemonitor",
+                     "object_ids": [monitor1.id, monitor2.id]}
+        res = self.client.post(self.INDEX_URL, form_data)
+
+        self.assertNoFormErrors(res)
+        self.assertMessageCount(res, success=1, error=1)
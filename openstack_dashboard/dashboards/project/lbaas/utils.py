@@ -12,7 +12,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import sys
+
 from django.utils.translation import ugettext_lazy as _
+import six
+
+from horizon.utils import memoized
+
+from openstack_dashboard import api
+
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
 
 
 def get_monitor_display_name(monitor):
@@ -29,3 +38,99 @@ def get_monitor_display_name(monitor):
                  "timeout:%(timeout)d")
     params = dict((key, getattr(monitor, key)) for key in fields)
     return name % params
+
+
+def member_list(request, **kwargs):
+    """Return the members matching kwargs, without their pool names.
+
+    Unlike api.lbaas.member_list(), the pools are not listed again to
+    name them; see TenantResources.members().
+    """
+    members = api_utils.neutronclient(request).list_members(
+        **kwargs).get('members')
+    return [api.lbaas.Member(m) for m in members]
+
+
+def pool_vip_ids(request, pool_ids):
+    """Return a dict mapping pools to the ids of their VIPs.
+
+    Only the ids of the given pools are fetched, with a single call.
+    """
+    pools = api_utils.neutronclient(request).list_pools(
+        id=list(pool_ids), fields=['id', 'vip_id']).get('pools', [])
+    return dict((pool['id'], pool.get('vip_id')) for pool in pools)
+
+
+def pool_member_ids(request, pool_ids):
+    """Return a dict mapping pools to the ids of their members.
+
+    Only the ids of the members of the given pools are fetched, with a
+    single call.
+    """
+    members = api_utils.neutronclient(request).list_members(
+        pool_id=list(pool_ids), fields=['id', 'pool_id']).get('members', [])
+    member_ids = dict((pool_id, []) for pool_id in pool_ids)
+    for member in members:
+        member_ids.setdefault(member['pool_id'], []).append(member['id'])
+    return member_ids
+
+
+class TenantResources(object):
+    """The pools, members and health monitors of the tenant of a request.
+
+    Each is listed once, when first needed, and shared by the load
+    balancer tabs and the row actions of their tables. A failed listing
+    is raised again to every reader rather than retried.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._lists = {}
+
+    def _list(self, name, list_function):
+        if name not in self._lists:
+            try:
+                self._lists[name] = (list_function(
+                    self.request, tenant_id=self.request.user.tenant_id),
+                    None)
+            except Exception:
+                self._lists[name] = (None, sys.exc_info())
+        result, error = self._lists[name]
+        if error is not None:
+            six.reraise(*error)
+        return result
+
+    def pools(self):
+        return self._list('pools', api.lbaas.pool_list)
+
+    def monitors(self):
+        return self._list('monitors', api.lbaas.pool_health_monitor_list)
+
+    def members(self):
+        """Return the members, with the pool names of pools()."""
+        members = self._list('members', member_list)
+        try:
+            pool_names = self.pool_names()
+        except Exception:
+            # the pools tab reports the failure
+            pool_names = {}
+        for m in members:
+            m.pool_name = pool_names.get(m.pool_id, m.pool_id)
+        return members
+
+    @memoized.memoized_method
+    def pool_names(self):
+        return dict((pool.id, pool.name_or_id) for pool in self.pools())
+
+    @memoized.memoized_method
+    def monitor_ids(self):
+        return frozenset(monitor.id for monitor in self.monitors())
+
+
+def tenant_resources(request):
+    """Return the TenantResources of the request, made on first use."""
+    resources = getattr(request, '_lbaas_tenant_resources', None)
+    if resources is None:
+        resources = request._lbaas_tenant_resources = \
+            TenantResources(request)
+    return resources
@@ -12,8 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from django.core.urlresolvers import reverse_lazy
 from django.utils.translation import ugettext_lazy as _
+import six
 
 from horizon import exceptions
 from horizon import forms
@@ -23,20 +26,45 @@ from horizon.utils import memoized
 from horizon import workflows
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas \
     import forms as project_forms
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas \
     import tabs as project_tabs
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas \
+    import utils
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas \
     import workflows as project_workflows
 
 import re
 
 
+def _deletions(request, kind, delete, obj_ids, requires=None):
+    """Return a stage of api_utils.bulk_delete() deleting obj_ids.
+    requires optionally maps ids to the deletions they have to wait for.
+    """
+    requires = requires or {}
+    return [((kind, obj_id), functools.partial(delete, request, obj_id),
+             requires.get(obj_id, ()))
+            for obj_id in obj_ids]
+
+
 class IndexView(tabs.TabView):
     tab_group_class = (project_tabs.LoadBalancerTabs)
     template_name = 'project/lbaas/details_tabs.html'
 
+    def _report(self, request, kind, results, success, failure):
+        for (result_kind, obj_id), error in results.items():
+            if result_kind != kind:
+                continue
+            if error is None:
+                messages.success(request, success % obj_id)
+                continue
+            try:
+                six.reraise(*error)
+            except Exception as e:
+                exceptions.handle(request, failure % e)
+
     def post(self, request, *args, **kwargs):
         obj_ids = request.POST.getlist('object_ids')
         action = request.POST['action']
@@ -44,44 +72,55 @@ class IndexView(tabs.TabView):
         if obj_ids == []:
             obj_ids.append(re.search('([0-9a-z-]+)$', action).group(1))
         if m == 'monitor':
-            for obj_id in obj_ids:
-                try:
-                    api.lbaas.pool_health_monitor_delete(request, obj_id)
-                    messages.success(request, _('Deleted monitor %s') % obj_id)
-                except Exception as e:
-                    exceptions.handle(request,
-                                      _('Unable to delete monitor. %s') % e)
+            results = api_utils.bulk_delete([
+                _deletions(request, 'monitor',
+                           api.lbaas.pool_health_monitor_delete, obj_ids)])
+            self._report(request, 'monitor', results,
+                         _('Deleted monitor %s'),
+                         _('Unable to delete monitor. %s'))
         if m == 'pool':
-            for obj_id in obj_ids:
-                try:
-                    api.lbaas.pool_delete(request, obj_id)
-                    messages.success(request, _('Deleted pool %s') % obj_id)
-                except Exception as e:
-                    exceptions.handle(request,
-                                      _('Unable to delete pool. %s') % e)
+            # members go before their pool
+            try:
+                member_ids = utils.pool_member_ids(request, obj_ids)
+            except Exception as e:
+                member_ids = {}
+                exceptions.handle(request,
+                                  _('Unable to retrieve pool members. %s')
+                                    % e)
+            results = api_utils.bulk_delete([
+                _deletions(request, 'member', api.lbaas.member_delete,
+                           [member_id for obj_id in obj_ids
+                            for member_id in member_ids.get(obj_id, [])]),
+                _deletions(request, 'pool', api.lbaas.pool_delete, obj_ids,
+                           dict((obj_id, [('member', member_id)
+                                          for member_id
+                                          in member_ids.get(obj_id, [])])
+                                for obj_id in obj_ids))])
+            self._report(request, 'pool', results,
+                         _('Deleted pool %s'),
+                         _('Unable to delete pool. %s'))
         if m == 'member':
-            for obj_id in obj_ids:
-                try:
-                    api.lbaas.member_delete(request, obj_id)
-                    messages.success(request, _('Deleted member %s') % obj_id)
-                except Exception as e:
-                    exceptions.handle(request,
-                                      _('Unable to delete member. %s') % e)
+            results = api_utils.bulk_delete([
+                _deletions(request, 'member', api.lbaas.member_delete,
+                           obj_ids)])
+            self._report(request, 'member', results,
+                         _('Deleted member %s'),
+                         _('Unable to delete member. %s'))
         if m == 'vip':
-            for obj_id in obj_ids:
-                try:
-                    vip_id = api.lbaas.pool_get(request, obj_id).vip_id
-                except Exception as e:
-                    exceptions.handle(request,
-                                      _('Unable to locate VIP to delete. %s')
-                                        % e)
-                if vip_id is not None:
-                    try:
-                        api.lbaas.vip_delete(request, vip_id)
-                        messages.success(request, _('Deleted VIP %s') % vip_id)
-                    except Exception as e:
-                        exceptions.handle(request,
-                                          _('Unable to delete VIP. %s') % e)
+            try:
+                vip_ids = utils.pool_vip_ids(request, obj_ids)
+            except Exception as e:
+                vip_ids = {}
+                exceptions.handle(request,
+                                  _('Unable to locate VIP to delete. %s')
+                                    % e)
+            results = api_utils.bulk_delete([
+                _deletions(request, 'vip', api.lbaas.vip_delete,
+                           [vip_ids[obj_id] for obj_id in obj_ids
+                            if vip_ids.get(obj_id)])])
+            self._report(request, 'vip', results,
+                         _('Deleted VIP %s'),
+                         _('Unable to delete VIP. %s'))
         return self.get(request, *args, **kwargs)
 
 
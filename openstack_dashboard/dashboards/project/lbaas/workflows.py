@@ -12,16 +12,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import logging
 
 from django.utils.translation import ugettext_lazy as _
 
 from horizon import exceptions
 from horizon import forms
+from horizon import messages
 from horizon.utils import validators
 from horizon import workflows
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.lbaas import utils
 
 
@@ -32,6 +35,23 @@ AVAILABLE_METHODS = ('ROUND_ROBIN', 'LEAST_CONNECTIONS', 'SOURCE_IP')
 LOG = logging.getLogger(__name__)
 
 
+def _select_member_ports(ports, subnet_id):
+    """Return a dict mapping servers to the port to add as pool member.
+    A port on the pool subnet is preferred; otherwise, and between several
+    ports, the one on the first network by id is taken so that the choice
+    does not depend on the order ports are listed in.
+    """
+    selected = {}
+    for port in sorted(ports, key=lambda port: port.network_id):
+        on_subnet = any(ip['subnet_id'] == subnet_id
+                        for ip in port.fixed_ips)
+        current = selected.get(port.device_id)
+        if current is None or (on_subnet and not current[1]):
+            selected[port.device_id] = (port, on_subnet)
+    return dict((device_id, port)
+                for device_id, (port, on_subnet) in selected.items())
+
+
 class AddPoolAction(workflows.Action):
     name = forms.CharField(max_length=80, label=_("Name"))
     description = forms.CharField(
@@ -428,6 +448,24 @@ class AddMember(workflows.Workflow):
     success_url = "horizon:project:lbaas:index"
     default_steps = (AddMemberStep,)
 
+    def _report(self, request, results):
+        """Report the members which could not be added, and which could.
+        Returns True if every member was added.
+        """
+        errors = dict((m, error) for m, error in results.items()
+                      if error is not None)
+        for m, error in errors.items():
+            LOG.info('%s: %s' % (self.failure_message, error[1]))
+            messages.error(request, _('Unable to add instance %(server)s '
+                                      'to the pool: %(reason)s')
+                           % {'server': m, 'reason': error[1]})
+        if errors:
+            for m in results:
+                if m not in errors:
+                    messages.success(request, _('Added instance %s to the '
+                                                'pool.') % m)
+        return not errors
+
     def handle(self, request, context):
         if context['member_type'] == 'server_list':
             try:
@@ -437,38 +475,22 @@ class AddMember(workflows.Workflow):
                 self.failure_message = _('Unable to retrieve '
                                          'the specified pool.')
                 return False
+            try:
+                ports = api.neutron.port_list(
+                    request, device_id=list(context['members']))
+            except Exception:
+                return False
+            selected_ports = _select_member_ports(ports, subnet_id)
+
+            calls = []
             for m in context['members']:
-                params = {'device_id': m}
-                try:
-                    plist = api.neutron.port_list(request, **params)
-                except Exception:
-                    return False
-
-                # Sort port list for each member. This is needed to avoid
-                # attachment of random ports in case of creation of several
-                # members attached to several networks.
-                plist = sorted(plist, key=lambda port: port.network_id)
-                psubnet = [p for p in plist for ips in p.fixed_ips
-                           if ips['subnet_id'] == subnet_id]
-
-                # If possible, select a port on pool subnet.
-                if psubnet:
-                    selected_port = psubnet[0]
-                elif plist:
-                    selected_port = plist[0]
-                else:
-                    selected_port = None
-
-                if selected_port:
-                    context['address'] = \
-                        selected_port.fixed_ips[0]['ip_address']
-                    try:
-                        api.lbaas.member_create(request, **context).id
-                    except Exception as e:
-                        msg = self.failure_message
-                        LOG.info('%s: %s' % (msg, e))
-                        return False
-            return True
+                if m in selected_ports:
+                    member = dict(context, address=selected_ports[m]
+                                  .fixed_ips[0]['ip_address'])
+                    calls.append((m, functools.partial(
+                        api.lbaas.member_create, request, **member)))
+            results = api_utils.bulk_create(calls)
+            return self._report(request, results)
         else:
             try:
                 context['member_id'] = api.lbaas.member_create(
@@ -203,37 +203,28 @@ class UpdateIpam(forms.SelfHandlingForm):
 
     def __init__(self, *args, **kwargs):
         ipam_obj = kwargs.pop('ipam_obj', {})
-        mgmt = ipam_obj.__dict__['_apidict']['mgmt']
+        mgmt = ipam_obj.mgmt_info
         super(UpdateIpam, self).__init__(*args, **kwargs)
-        if mgmt['ipam_dns_method'] == 'default-dns-server':
+        if mgmt.dns_method == 'default-dns-server':
             self.fields['dnsmethod'].initial = 'default'
 
-        if mgmt['ipam_dns_method'] == 'tenant-dns-server':
+        if mgmt.dns_method == 'tenant-dns-server':
             self.fields['dnsmethod'].initial = 'tenantdns'
-            if 'ipam_dns_server' in mgmt and \
-                'tenant_dns_server_address' in mgmt['ipam_dns_server'] and \
-                'ip_address' in mgmt['ipam_dns_server']['tenant_dns_server_address'] :
-                for ip in mgmt['ipam_dns_server']['tenant_dns_server_address']['ip_address']:
-                    self.fields['tenantdns'].initial = ip
+            if mgmt.tenant_dns_servers:
+                self.fields['tenantdns'].initial = mgmt.tenant_dns_servers[-1]
 
-        if mgmt['ipam_dns_method'] == 'virtual-dns-server':
+        if mgmt.dns_method == 'virtual-dns-server':
             self.fields['dnsmethod'].initial = 'vdns'
-            if 'ipam_dns_server' in mgmt and \
-                'virtual_dns_server_name' in mgmt['ipam_dns_server'] and \
-                mgmt['ipam_dns_server']['virtual_dns_server_name'] != None :
-                self.fields['vdns'].initial = mgmt['ipam_dns_server']['virtual_dns_server_name'] 
+            if mgmt.virtual_dns_server is not None:
+                self.fields['vdns'].initial = mgmt.virtual_dns_server
 
-        if mgmt['ipam_dns_method'] == 'none':
+        if mgmt.dns_method == 'none':
             self.fields['dnsmethod'].initial = 'none'
 
-        if 'dhcp_option_list' in mgmt:
-            dhcp_list = mgmt['dhcp_option_list']
-            if dhcp_list and 'dhcp_option' in dhcp_list:
-                for entry in mgmt['dhcp_option_list']['dhcp_option']:
-                    if entry['dhcp_option_name'] == '4':
-                        self.fields['ntpip'].initial = entry['dhcp_option_value']
-                    if entry['dhcp_option_name'] == '15':
-                        self.fields['domainname'].initial = entry['dhcp_option_value']
+        if mgmt.ntp_servers:
+            self.fields['ntpip'].initial = ' '.join(mgmt.ntp_servers)
+        if mgmt.domain_names:
+            self.fields['domainname'].initial = ' '.join(mgmt.domain_names)
 
     def clean(self):
         cleaned_data = super(UpdateIpam, self).clean()
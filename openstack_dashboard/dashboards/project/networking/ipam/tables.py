@@ -61,71 +61,40 @@ class EditIpam(tables.LinkAction):
     classes = ("ajax-modal", "btn-edit")
 
 
-def get_dns_details(ipam_obj):
-    dns_detail_str = ''
-
-    ipam = ipam_obj.__dict__['_apidict']['mgmt']
+def _option_display(values):
+    if not values:
+        return ''
+    return ' ' + ' '.join(values)
 
+def get_dns_details(ipam_obj):
+    mgmt = ipam_obj.mgmt_info
 
-    if not 'ipam_dns_method' in ipam:
+    if mgmt.dns_method is None:
         return 'None'
 
-    if ipam['ipam_dns_method'] == 'default-dns-server':
+    dns_detail_str = ''
+    if mgmt.dns_method == 'default-dns-server':
         dns_detail_str += 'Default DNS Server'
 
-    if ipam['ipam_dns_method'] == 'none':
+    if mgmt.dns_method == 'none':
         dns_detail_str += 'None'
 
-    if ipam['ipam_dns_method'] == 'tenant-dns-server':
+    if mgmt.dns_method == 'tenant-dns-server':
         dns_detail_str += 'Tenant DNS'
-        if 'ipam_dns_server' in ipam and \
-           'tenant_dns_server_address' in ipam['ipam_dns_server'] and \
-           'ip_address' in ipam['ipam_dns_server']['tenant_dns_server_address']:
-            for ip in ipam['ipam_dns_server']['tenant_dns_server_address']['ip_address']:
-                 dns_detail_str += ' ' + str(ip)
+        dns_detail_str += _option_display(mgmt.tenant_dns_servers)
 
-    if ipam['ipam_dns_method'] == 'virtual-dns-server':
+    if mgmt.dns_method == 'virtual-dns-server':
         dns_detail_str += 'Virtual DNS'
-        if 'ipam_dns_server' in ipam and \
-           'virtual_dns_server_name' in ipam['ipam_dns_server']:
-            dns_detail_str += ' ' + ipam['ipam_dns_server']['virtual_dns_server_name']
-
-    if 'dhcp_option_list' in ipam:
-        dhcp_list = ipam['dhcp_option_list']
-        if dhcp_list and 'dhcp_option' in dhcp_list:
-            for dhcp_opt in ipam['dhcp_option_list']['dhcp_option']:
-                if dhcp_opt['dhcp_option_name'] == '6' :
-                    dns_detail_str += ' ' + dhcp_opt['dhcp_option_value']
+        if mgmt.virtual_dns_server:
+            dns_detail_str += ' ' + mgmt.virtual_dns_server
 
-    return dns_detail_str
+    return dns_detail_str + _option_display(mgmt.dns_servers)
 
 def get_ntp_servers(ipam_obj):
-    ntp_details = ''
-
-    ipam = ipam_obj.__dict__['_apidict']['mgmt']
-
-    if 'dhcp_option_list' in ipam:
-        dhcp_list = ipam['dhcp_option_list']
-        if dhcp_list and 'dhcp_option' in dhcp_list:
-            for dhcp_opt in ipam['dhcp_option_list']['dhcp_option']:
-                if dhcp_opt['dhcp_option_name'] == '4' :
-                    ntp_details += ' ' + dhcp_opt['dhcp_option_value']
-
-    return ntp_details
+    return _option_display(ipam_obj.mgmt_info.ntp_servers)
 
 def get_domains(ipam_obj):
-    domain_details = ''
-
-    ipam = ipam_obj.__dict__['_apidict']['mgmt']
-
-    if 'dhcp_option_list' in ipam:
-        dhcp_list = ipam['dhcp_option_list']
-        if dhcp_list and 'dhcp_option' in dhcp_list:
-            for dhcp_opt in ipam['dhcp_option_list']['dhcp_option']:
-                if dhcp_opt['dhcp_option_name'] == '15' :
-                    domain_details += ' ' + dhcp_opt['dhcp_option_value']
-
-    return domain_details
+    return _option_display(ipam_obj.mgmt_info.domain_names)
 
 class NetworkIpamTable(tables.DataTable):
     name = tables.Column("name", verbose_name=_("Name"))
@@ -139,5 +108,7 @@ class NetworkIpamTable(tables.DataTable):
     class Meta:
         name = "ipam"
         verbose_name = _("Network IPAMs")
+        pagination_param = "ipam_marker"
+        prev_pagination_param = "prev_ipam_marker"
         table_actions = (IpamFilterAction, CreateIpam, DeleteIpam,)
         row_actions = (EditIpam, DeleteIpam)
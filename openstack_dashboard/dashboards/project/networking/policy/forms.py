@@ -30,6 +30,8 @@ from horizon import messages
 from horizon.forms import fields
 from horizon.utils import validators as utils_validators
 
+from neutronclient.common import exceptions as neutron_exc
+
 from openstack_dashboard import api
 from contrail_openstack_dashboard.openstack_dashboard.api.contrail_quantum import *
 from openstack_dashboard.utils import filters
@@ -83,6 +85,8 @@ class UpdatePolicy(forms.SelfHandlingForm):
 
 class AddRule(forms.SelfHandlingForm):
     id = forms.CharField(widget=forms.HiddenInput())
+    entries_hash = forms.CharField(widget=forms.HiddenInput(),
+                                   required=False)
     sequence_id = forms.ChoiceField(label=_('Sequence Id'),
                                     help_text=_("Choose the Sequence Id for "
                                                 " this rule."))
@@ -228,6 +232,7 @@ class AddRule(forms.SelfHandlingForm):
                 seq_val_lbl = "{0}".format(rule['rule_sequence'])
                 seq_list.append((seq_val, seq_val_lbl))
             sequence_id_choices.append(('After Rule', seq_list))
+            self.fields['entries_hash'].initial = pol_obj.entries_hash
         except:
             pol_obj = {}
 
@@ -346,29 +351,28 @@ class AddRule(forms.SelfHandlingForm):
                                  'network_policy': data['dstpols']
                                }]
 
+        if data['sequence_id'] == 'last':
+            position = None
+        elif data['sequence_id'] == 'first':
+            position = 0
+        else:
+            position = int(data['sequence_id'].split(':')[1])
+
         try:
-            policy_obj = policy_show(request, policy_id=policy_id)
-            if not policy_obj['entries']:
-                policy_obj['entries'] = {}
-                policy_obj['entries']['policy_rule'] = []
-            if data['sequence_id'] == 'last':
-                policy_obj['entries']['policy_rule'].append(rule)
-            elif data['sequence_id'] == 'first':
-                policy_obj['entries']['policy_rule'].insert(0, rule)
-            else:
-                seq = int(data['sequence_id'].split(':')[1])
-                policy_obj['entries']['policy_rule'].insert(seq, rule)
-
-            policy_update_dict = policy_obj.__dict__['_apidict']['entries']
-
-            for rule in policy_update_dict['policy_rule']:
-                rule['rule_sequence'] =  {'major':-1, 'minor':-1}
-
-            policy = policy_modify(request, policy_id=policy_id,
-                                   entries=policy_update_dict)
+            policy = policy_rule_insert(request, policy_id, rule,
+                                        position=position,
+                                        expected_hash=data['entries_hash']
+                                        or None)
             messages.success(request,
                              _('Successfully added rule to policy : %s') % policy.name)
             return policy
+        except neutron_exc.Conflict:
+            redirect = reverse("horizon:project:networking:"
+                               "policy:detail", args=[data['id']])
+            exceptions.handle(request, _('Unable to add rule to policy, '
+                                         'its rules have been changed by '
+                                         'another user.'),
+                              redirect=redirect)
         except:
             redirect = reverse("horizon:project:networking:"
                                "policy:detail", args=[data['id']])
@@ -14,15 +14,18 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import ast
-
 from django.conf import settings  # noqa
 from django.core.urlresolvers import reverse  # noqa
 from django.utils.translation import ugettext_lazy as _  # noqa
+from django import shortcuts
 from django import template
 
+from horizon import exceptions
+from horizon import messages
 from horizon import tables
 
+from neutronclient.common import exceptions as neutron_exc
+
 from openstack_dashboard import api
 from openstack_dashboard.utils import filters
 
@@ -75,169 +78,27 @@ def get_associated_nets(policy):
     else:
         return '-'
 
-def policy_net_display(nets):
-    net_disp_all = ''
-    for net in nets:
-        net_disp = ''
-        if not net['security_group'] == None:
-            net_disp += 'security-group ' + str(net['security_group'])
-        if not net['subnet'] == None:
-            net_disp += str(net['subnet']['ip_prefix']) + "/" + \
-                        str(net['subnet']['ip_prefix_len'])
-
-        if not net['virtual_network'] == None:
-            net_disp += 'network '
-            net_fqn = net['virtual_network'].split(':')
-            if len(net_fqn) == 3:
-                net_disp += "{0} ({1})".format(net_fqn[2],
-                                             net_fqn[1])
-            else:
-                net_disp += net_fqn[0].upper()
-
-        if 'network_policy' in net:
-            if not net['network_policy'] == None:
-                net_disp += 'policy '
-                pol_fqn = net['network_policy'].split(':')
-                if len(pol_fqn) == 3:
-                    net_disp += "{0} ({1})".format(pol_fqn[2],
-                                                 pol_fqn[1])
-                else:
-                    net_disp += pol_fqn[0].upper()
-
-    return net_disp
-
-def policy_ports_display(ports):
-    ports_str = ''
-    if len(ports) == 1 and ports[0]['start_port'] == -1:
-        ports_str += "ANY"
-    else:
-        for p in ports:
-           ports_str += " " + str(p['start_port'])
-           if p['start_port'] != p ['end_port']:
-               ports_str += "-" + str(p['end_port'])
-           if not p == ports[-1]:
-               ports_str += ","
-
-    return ports_str
-
-def get_policy_rule_action(rule):
-    rule_display = ''
-    if 'simple_action' in rule and rule['simple_action'] != None:
-        rule_display += rule['simple_action']
-    elif rule['action_list']:
-        if rule['action_list']['simple_action']:
-            rule_display += rule['action_list']['simple_action']
-        else:
-            rule_display += 'pass'
-    return rule_display.upper()
-
-def get_policy_rule_protocol(rule):
-    return rule['protocol'].upper()
-
-def format_policy_rule(rule):
-    rule_display = ''
-    if 'simple_action' in rule and rule['simple_action'] != None:
-        rule_display += rule['simple_action']
-    elif rule['action_list']:
-        if rule['action_list']['simple_action']:
-            rule_display += rule['action_list']['simple_action']
-        else:
-            rule_display += 'pass'
-
-    if not len(rule['application']):
-        rule_display += " protocol " + rule['protocol']
-        rule_display += " " + policy_net_display(rule['src_addresses']).lower()
-        rule_display += ' ports ' + policy_ports_display(rule['src_ports']).lower()
-        rule_display += " " + rule['direction']
-        rule_display += " " + policy_net_display(rule['dst_addresses']).lower()
-        rule_display += ' ports ' + policy_ports_display(rule['dst_ports']).lower()
-
-    if rule['action_list']:
-        if rule['action_list']['gateway_name'] or \
-           rule['action_list']['apply_service'] or \
-           rule['action_list']['assign_routing_instance'] or \
-           rule['action_list']['mirror_to']:
-            rule_display += " action "
-        if rule['action_list']['gateway_name']:
-            rule_display += 'gateway ' + rule['action_list']['gateway']
-        if rule['action_list']['assign_routing_instance']:
-            rule_display += 'route ' + rule['action_list']['assign_routing_instance']
-        if rule['action_list']['apply_service']:
-            rule_display += "services "
-            for service in rule['action_list']['apply_service']:
-                service_fqn = service.split(':')
-                rule_display += " " + service_fqn[2] + ' ('+\
-                                service_fqn[1] + ')'
-        if rule['action_list']['mirror_to']:
-            rule_display += "mirrors "
-            ana_fqn = rule['action_list']['mirror_to']['analyzer_name'].split(':')
-            rule_display += " " + ana_fqn[2] + ' ('+\
-                                ana_fqn[1] + ')'
-    return rule_display
-
 def get_rule_source(rule):
     template_name = 'project/networking/policy/_rule_source_format.html'
-    rule_nets = policy_net_display(rule['src_addresses']).split()
-    context = {'nets': rule_nets}
+    context = {'nets': rule.source}
     return template.loader.render_to_string(template_name, context)
 
 def get_rule_dest(rule):
     template_name = 'project/networking/policy/_rule_source_format.html'
-    rule_nets = policy_net_display(rule['dst_addresses']).split()
-    context = {'nets': rule_nets}
+    context = {'nets': rule.destination}
     return template.loader.render_to_string(template_name, context)
 
-def get_source_port_range(rule):
-    return policy_ports_display(rule['src_ports'])
-
-def get_dest_port_range(rule):
-    return policy_ports_display(rule['dst_ports'])
-
-def format_rule_actions(rule):
-    rule_display = ''
-    if rule['action_list']:
-        if rule['action_list']['gateway_name']:
-            rule_display += 'gateway ' + rule['action_list']['gateway']
-        if rule['action_list']['assign_routing_instance']:
-            rule_display += 'route ' + rule['action_list']['assign_routing_instance']
-        if rule['action_list']['apply_service']:
-            rule_display += "services "
-            for service in rule['action_list']['apply_service']:
-                service_fqn = service.split(':')
-                rule_display += " " + service_fqn[2] + ' ('+\
-                                service_fqn[1] + ')'
-        if rule['action_list']['mirror_to']:
-            rule_display += "mirrors "
-            ana_fqn = rule['action_list']['mirror_to']['analyzer_name'].split(':')
-            rule_display += " " + ana_fqn[2] + ' ('+\
-                                ana_fqn[1] + ')'
-    if not len(rule_display):
-        return '-'
-    return rule_display
-
 def get_rule_actions(rule):
     template_name = 'project/networking/policy/_rule_action_format.html'
-    rule_actions = format_rule_actions(rule).split()
-    context = {'actions': rule_actions}
+    context = {'actions': rule.actions or ('-',)}
     return template.loader.render_to_string(template_name, context)
 
-def format_policy_rule_sequence(rule):
-    sequence = rule['rule_sequence']
-    if sequence:
-        return "{0}".format(sequence)
-    return "None"
-
 
 def get_policy_rules(policy):
     template_name = 'project/networking/policy/_rule_format.html'
-    if hasattr(policy, 'entries'):
-        rule_arr = []
-        try:
-            for rule in policy.entries['policy_rule']:
-                rule_arr.append(format_policy_rule(rule).split(' '))
-        except:
-            pass
-    else:
+    try:
+        rule_arr = [rule.words for rule in policy.rule_displays]
+    except:
         rule_arr = []
     context = {'rules': rule_arr}
     if not len(rule_arr):
@@ -255,6 +116,8 @@ class NetworkPolicyTable(tables.DataTable):
     class Meta:
         name = "policy"
         verbose_name = _("Network Policies")
+        pagination_param = "policy_marker"
+        prev_pagination_param = "prev_policy_marker"
         table_actions = (PolicyFilterAction, CreatePolicy, DeletePolicy,)
         row_actions = (EditRules, DeletePolicy)
 
@@ -269,71 +132,132 @@ class CreateRule(tables.LinkAction):
         return reverse(self.url, args=[self.table.kwargs['policy_id']])
 
 
+def _rules_url(table):
+    return reverse("horizon:project:networking:policy:detail",
+                   args=[table.kwargs['policy_id']])
+
+
+def _entries_hash(request):
+    # entries_hash of the rules the table was rendered with, see
+    # RulesTable.get_full_url()
+    return request.GET.get('entries_hash') or None
+
+
 class DeleteRule(tables.DeleteAction):
     data_type_singular = _("Rule")
     data_type_plural = _("Rules")
 
     def get_success_url(self, request):
-        pol_id = self.table.kwargs['policy_id']
-        return reverse("horizon:project:networking:"
-                       "policy:detail", args=[pol_id])
+        return _rules_url(self.table)
+
+    def handle(self, table, request, obj_ids):
+        # All the selected rules go in a single update of the policy,
+        # checked against the rules the table was rendered with.
+        policy_id = table.kwargs['policy_id']
+        displays = dict((table.get_object_id(rule),
+                         table.get_object_display(rule))
+                        for rule in table.data)
+        names = ", ".join(displays.get(obj_id, obj_id) for obj_id in obj_ids)
+        try:
+            policy_rule_delete(request, policy_id, obj_ids,
+                               expected_hash=_entries_hash(request))
+            messages.success(request, _('Deleted Rules: %s') % names)
+        except neutron_exc.Conflict:
+            exceptions.handle(request, _('Unable to delete rules from '
+                                         'policy, its rules have been '
+                                         'changed by another user.'))
+        except Exception:
+            exceptions.handle(request,
+                              _('Unable to delete Rules: %s') % names)
+        return shortcuts.redirect(self.get_success_url(request))
+
+
+class MoveRule(tables.Action):
+    """Moves a rule of the policy offset positions down."""
+    offset = 0
+
+    def allowed(self, request, rule=None):
+        if rule is None:
+            return False
+        position = rule.sequence - 1 + self.offset
+        return 0 <= position < len(self.table.data)
+
+    def single(self, table, request, obj_id):
+        policy_id = table.kwargs['policy_id']
+        positions = dict((table.get_object_id(rule), rule.sequence - 1)
+                         for rule in table.data)
+        try:
+            if obj_id not in positions:
+                # the rule was deleted since the table was rendered
+                raise neutron_exc.Conflict()
+            policy_rule_move(request, policy_id, obj_id,
+                             positions[obj_id] + self.offset,
+                             expected_hash=_entries_hash(request))
+            messages.success(request, _('Successfully moved rule.'))
+        except neutron_exc.Conflict:
+            exceptions.handle(request, _('Unable to move rule, the rules '
+                                         'of the policy have been changed '
+                                         'by another user.'))
+        except Exception:
+            exceptions.handle(request, _('Unable to move rule.'))
+        return shortcuts.redirect(_rules_url(table))
+
+
+class MoveRuleUp(MoveRule):
+    name = "move_up"
+    verbose_name = _("Move Up")
+    offset = -1
+
+
+class MoveRuleDown(MoveRule):
+    name = "move_down"
+    verbose_name = _("Move Down")
+    offset = 1
 
-    def delete(self, request, obj_id):
-        policy_id = self.table.kwargs['policy_id']
-        policy = policy_show(request, policy_id=policy_id)
-        rules  = policy['entries']['policy_rule']
-        rule_obj = ast.literal_eval(obj_id)
-        rule_obj.pop('policy_id', None)
-        rule_obj['rule_sequence'] = {}
-        for r in rules:
-            r['rule_sequence'] = {}
-            if cmp(rule_obj, r) == 0:
-                rules.remove(r)
-                break
-        for r in rules:
-            r['rule_sequence'] = {'major': -1,
-                                  'minor': -1}
-
-        rules_dict = policy.__dict__['_apidict']['entries']
-        pol    = policy_modify(request, policy_id=policy_id,
-                               entries=rules_dict)
-
-        return reverse("horizon:project:networking:"
-                       "policy:detail", args=[policy_id])
 
 class RulesTable(tables.DataTable):
-    sequence = tables.Column(format_policy_rule_sequence,
+    """Lists the PolicyRuleDisplay records of a policy."""
+    sequence = tables.Column("sequence",
                              verbose_name=_("#"))
-    action = tables.Column(get_policy_rule_action,
+    action = tables.Column("action",
                            verbose_name=_("Action"))
-    protocol = tables.Column(get_policy_rule_protocol,
+    protocol = tables.Column("protocol",
                               verbose_name=_("Protocol"))
     source = tables.Column(get_rule_source,
                            verbose_name=_("Source"))
-    source_port = tables.Column(get_source_port_range,
+    source_port = tables.Column("source_ports",
                                verbose_name=_("Ports"))
     direction = tables.Column("direction",
                                verbose_name=_("Direction"))
     destination = tables.Column(get_rule_dest,
                                verbose_name=_("Destination"))
-    dest_port = tables.Column(get_dest_port_range,
+    dest_port = tables.Column("destination_ports",
                               verbose_name=_("Ports"))
     servcies = tables.Column(get_rule_actions,
                               verbose_name=_("Rule Actions"))
 
-    #def sanitize_id(self, obj_id):
-    #    return filters.get_int_or_uuid(obj_id)
+    def get_object_display(self, rule):
+        return rule.text
 
-    def get_object_display(self, rules):
-        return str(format_policy_rule(rules))
+    def get_object_name(self, rule):
+        return str(rule.sequence)
 
-    def get_object_name(self, rules):
-        return str(format_policy_rule_sequence(rules))
+    def get_object_id(self, rule):
+        return rule.key
 
-    def get_object_id(self, rules):
-        return unicode(rules)
+    def get_full_url(self):
+        # The actions are posted along with the entries_hash of the rules
+        # shown, so that changes made since are refused. The view sets
+        # entries_hash once the policy is loaded.
+        entries_hash = getattr(self, 'entries_hash', None)
+        if not entries_hash:
+            return super(RulesTable, self).get_full_url()
+        params = self.request.GET.copy()
+        params['entries_hash'] = entries_hash
+        return "%s?%s" % (self.request.path, params.urlencode())
 
     class Meta:
         name = "rules"
         verbose_name = _("Network Policy Rules")
         table_actions = (CreateRule, DeleteRule)
+        row_actions = (MoveRuleUp, MoveRuleDown)
@@ -58,11 +58,9 @@ class DetailView(tables.DataTableView):
     def get_data(self):
         rules     = []
         try:
-            entries = self._get_data().entries
-            if entries:
-                rules = entries['policy_rule']
-                for r in rules:
-                    r['policy_id'] = self._get_data().id
+            policy = self._get_data()
+            rules = list(policy.rule_displays)
+            self.table.entries_hash = policy.entries_hash
         except:
             self.object  = None
             exceptions.handle(self.request,
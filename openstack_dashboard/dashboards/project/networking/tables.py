@@ -13,18 +13,23 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import functools
 import logging
+import sys
 
 from django.core.urlresolvers import reverse  # noqa
 from django import template
 from django.template import defaultfilters as filters
 from django.utils.translation import ugettext_lazy as _  # noqa
 from django.utils.translation import pgettext_lazy
+import six
 
 from horizon import exceptions
+from horizon import messages
 from horizon import tables
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
 
 
 LOG = logging.getLogger(__name__)
@@ -66,17 +71,67 @@ class DeleteNetwork(CheckNetworkEditable, tables.DeleteAction):
     data_type_singular = _("Network")
     data_type_plural = _("Networks")
 
+    def _delete_networks(self, request, network_ids):
+        """Delete networks and their subnets, subnets first.
+        Returns a dict mapping each network id to None if it was deleted,
+        or to the exc_info of the failure.
+        """
+        try:
+            # Retrieve existing subnets belonging to the networks.
+            subnets = api.neutron.subnet_list(request,
+                                              network_id=network_ids,
+                                              fields=['id', 'network_id'])
+        except Exception:
+            return dict((network_id, sys.exc_info())
+                        for network_id in network_ids)
+        network_subnets = dict((network_id, []) for network_id in network_ids)
+        for s in subnets:
+            network_subnets[s.network_id].append(('subnet', s.id))
+        LOG.debug('Networks have subnets: %s' % network_subnets)
+        results = api_utils.bulk_delete([
+            [(('subnet', s.id),
+              functools.partial(api.neutron.subnet_delete, request, s.id),
+              ())
+             for s in subnets],
+            [(('network', network_id),
+              functools.partial(api.neutron.network_delete, request,
+                                network_id),
+              network_subnets[network_id])
+             for network_id in network_ids]])
+        return dict((network_id, results[('network', network_id)])
+                    for network_id in network_ids)
+
+    def handle(self, table, request, obj_ids):
+        # Delete all the networks allowed at once; BatchAction then goes
+        # through them one by one, and delete() reports their results.
+        found_ids = []
+        missing_ids = []
+        network_ids = []
+        for obj_id in obj_ids:
+            try:
+                datum = table.get_object_by_id(obj_id)
+            except exceptions.Http302:
+                missing_ids.append(obj_id)
+                continue
+            found_ids.append(obj_id)
+            if self.allowed(request, datum):
+                network_ids.append(obj_id)
+        if missing_ids:
+            messages.error(request, _('Unable to find networks: %s')
+                           % ', '.join(missing_ids))
+        request._deleted_networks = (
+            self._delete_networks(request, network_ids) if network_ids
+            else {})
+        return super(DeleteNetwork, self).handle(table, request, found_ids)
+
     def delete(self, request, network_id):
         try:
-            # Retrieve existing subnets belonging to the network.
-            subnets = api.neutron.subnet_list(request, network_id=network_id)
-            LOG.debug('Network %s has subnets: %s' %
-                      (network_id, [s.id for s in subnets]))
-            for s in subnets:
-                api.neutron.subnet_delete(request, s.id)
-                LOG.debug('Deleted subnet %s' % s.id)
-
-            api.neutron.network_delete(request, network_id)
+            deleted = request.__dict__.setdefault('_deleted_networks', {})
+            if network_id not in deleted:
+                deleted.update(self._delete_networks(request, [network_id]))
+            error = deleted[network_id]
+            if error is not None:
+                six.reraise(*error)
             LOG.debug('Deleted network %s successfully' % network_id)
         except Exception:
             msg = _('Failed to delete network %s') % network_id
@@ -142,5 +197,7 @@ class NetworksTable(tables.DataTable):
     class Meta:
         name = "networks"
         verbose_name = _("Networks")
+        pagination_param = "networks_marker"
+        prev_pagination_param = "prev_networks_marker"
         table_actions = (NetFilterAction, CreateNetwork, DeleteNetwork)
         row_actions = (EditNetwork, CreateSubnet, ModifyAttachedPolicies, DeleteNetwork)
@@ -25,7 +25,6 @@ from horizon import exceptions
 from horizon import messages
 from horizon import tabs
 
-from openstack_dashboard import api
 from contrail_openstack_dashboard.openstack_dashboard.api.contrail_quantum import *
 
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
@@ -37,17 +36,43 @@ from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
     networking.ipam.tables import NetworkIpamTable
 
-class NetworksTab(tabs.TableTab):
+def get_page_marker(request, table_class):
+    """Return the marker of the requested page of a table and whether it
+    is the page before the marker.
+    """
+    meta = table_class._meta
+    prev_marker = request.GET.get(meta.prev_pagination_param, None)
+    if prev_marker is not None:
+        return prev_marker, True
+    return request.GET.get(meta.pagination_param, None), False
+
+
+class PaginatedTableTab(tabs.TableTab):
+    """TableTab whose table is paged by the data method."""
+    _has_more_data = False
+    _has_prev_data = False
+
+    def has_more_data(self, table):
+        return self._has_more_data
+
+    def has_prev_data(self, table):
+        return self._has_prev_data
+
+
+class NetworksTab(PaginatedTableTab):
     table_classes = (NetworksTable,)
     name = _("Networks")
     slug = "networks_tab"
     template_name = "horizon/common/_detail_table.html"
 
     def get_networks_data(self):
+        marker, reversed_order = get_page_marker(self.request, NetworksTable)
         try:
             tenant_id = self.request.user.tenant_id
-            networks = api.neutron.network_list_for_tenant(self.request,
-                                                           tenant_id)
+            networks, self._has_more_data, self._has_prev_data = \
+                network_list_for_tenant_paged(self.request, tenant_id,
+                                              marker=marker,
+                                              reversed_order=reversed_order)
         except Exception:
             networks = []
             msg = _('Network list can not be retrieved.')
@@ -57,7 +82,7 @@ class NetworksTab(tabs.TableTab):
         return networks
 
 
-class NetworkPolicyTab(tabs.TableTab):
+class NetworkPolicyTab(PaginatedTableTab):
     table_classes = (NetworkPolicyTable,)
     name = _("Network Policies")
     slug = "policy_tab"
@@ -65,8 +90,13 @@ class NetworkPolicyTab(tabs.TableTab):
 
     def get_policy_data(self):
         tenant_id = self.request.user.tenant_id
+        marker, reversed_order = get_page_marker(self.request,
+                                                 NetworkPolicyTable)
         try:
-            policy = policy_summary_for_tenant(self.request, tenant_id)
+            policy, self._has_more_data, self._has_prev_data = \
+                policy_summary_for_tenant(self.request, tenant_id,
+                                          marker=marker, paginate=True,
+                                          reversed_order=reversed_order)
         except Exception:
             policy = []
             exceptions.handle(self.request,
@@ -74,7 +104,7 @@ class NetworkPolicyTab(tabs.TableTab):
         return policy
 
 
-class NetworkIpamTab(tabs.TableTab):
+class NetworkIpamTab(PaginatedTableTab):
     table_classes = (NetworkIpamTable,)
     name = _("Network IPAMs")
     slug = "ipam_tab"
@@ -82,8 +112,13 @@ class NetworkIpamTab(tabs.TableTab):
 
     def get_ipam_data(self):
         tenant_id = self.request.user.tenant_id
+        marker, reversed_order = get_page_marker(self.request,
+                                                 NetworkIpamTable)
         try:
-            ipam = ipam_summary_for_tenant(self.request, tenant_id)
+            ipam, self._has_more_data, self._has_prev_data = \
+                ipam_summary_for_tenant(self.request, tenant_id,
+                                        marker=marker, paginate=True,
+                                        reversed_order=reversed_order)
         except Exception:
             ipam = []
             exceptions.handle(self.request,
@@ -20,15 +20,24 @@ from django.utils.html import escape  # noqa
 
 from horizon.workflows import views
 
+from mox import IgnoreArg  # noqa
 from mox import IsA  # noqa
+from neutronclient.common import exceptions as neutron_exc
+from neutronclient.v2_0 import client as neutron_client
 
 from openstack_dashboard import api
 from openstack_dashboard.test import helpers as test
 
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
+    networking.policy import tables as policy_tables
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
+    networking.policy import views as policy_views
 from openstack_dashboard.dashboards.project.networking import workflows
 
 
 INDEX_URL = reverse('horizon:project:networking:index')
+POLICY_ID = '5b9d3e0a-1f2c-4a8e-9d7b-3c6e2f1a4b5d'
 
 
 def form_data_subnet(subnet,
@@ -95,15 +104,46 @@ def _str_host_routes(host_routes):
 
 class NetworkTests(test.TestCase):
 
-    @test.create_stubs({api.neutron: ('network_list',)})
+    def _stub_neutronclient(self):
+        self.mox.StubOutWithMock(api.neutron, 'neutronclient')
+        neutronclient = self.mox.CreateMock(neutron_client.Client)
+        api.neutron.neutronclient(IsA(http.HttpRequest)) \
+            .MultipleTimes().AndReturn(neutronclient)
+        return neutronclient
+
+    def _stub_network_page(self, owned, shared=()):
+        neutronclient = self._stub_neutronclient()
+        neutronclient.list_networks(
+            retrieve_all=False,
+            tenant_id=self.tenant.id,
+            shared=False,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': list(owned)}]))
+        neutronclient.list_networks(
+            retrieve_all=False,
+            shared=True,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': list(shared)}]))
+        neutronclient.list_subnets(id=IgnoreArg()) \
+            .AndReturn({'subnets': self.api_subnets.list()})
+
     def test_index(self):
-        api.neutron.network_list(
-            IsA(http.HttpRequest),
+        networks = self.api_networks.list()
+        subnets = self.api_subnets.list()
+        neutronclient = self._stub_neutronclient()
+        neutronclient.list_networks(
+            retrieve_all=False,
             tenant_id=self.tenant.id,
-            shared=False).AndReturn(self.networks.list())
-        api.neutron.network_list(
-            IsA(http.HttpRequest),
-            shared=True).AndReturn([])
+            shared=False,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': networks}]))
+        neutronclient.list_networks(
+            retrieve_all=False,
+            shared=True,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': []}]))
+        neutronclient.list_subnets(id=IgnoreArg()) \
+            .AndReturn({'subnets': subnets})
 
         self.mox.ReplayAll()
 
@@ -113,12 +153,45 @@ class NetworkTests(test.TestCase):
         networks = res.context['networks_table'].data
         self.assertItemsEqual(networks, self.networks.list())
 
-    @test.create_stubs({api.neutron: ('network_list',)})
+    def test_index_shared_networks_paged(self):
+        networks = sorted(self.api_networks.list(), key=lambda n: n['id'])
+        neutronclient = self._stub_neutronclient()
+        # the shared networks are paged with the same marker and limit as
+        # the networks of the project, and listed once if in both
+        neutronclient.list_networks(
+            retrieve_all=False,
+            tenant_id=self.tenant.id,
+            shared=False,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': networks[:1]}]))
+        neutronclient.list_networks(
+            retrieve_all=False,
+            shared=True,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': networks}]))
+        neutronclient.list_subnets(id=IgnoreArg()) \
+            .AndReturn({'subnets': self.api_subnets.list()})
+
+        self.mox.ReplayAll()
+
+        res = self.client.get(INDEX_URL)
+
+        table = res.context['networks_table'].data
+        self.assertEqual([n['id'] for n in networks], [n.id for n in table])
+
     def test_index_network_list_exception(self):
-        api.neutron.network_list(
-            IsA(http.HttpRequest),
+        neutronclient = self._stub_neutronclient()
+        neutronclient.list_networks(
+            retrieve_all=False,
             tenant_id=self.tenant.id,
-            shared=False).AndRaise(self.exceptions.neutron)
+            shared=False,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndRaise(self.exceptions.neutron)
+        neutronclient.list_networks(
+            retrieve_all=False,
+            shared=True,
+            limit=IgnoreArg()).InAnyOrder() \
+            .AndReturn(iter([{'networks': []}]))
         self.mox.ReplayAll()
 
         res = self.client.get(INDEX_URL)
@@ -602,19 +675,14 @@ class NetworkTests(test.TestCase):
 
         self.assertRedirectsNoFollow(res, INDEX_URL)
 
-    @test.create_stubs({api.neutron: ('network_list',
-                                      'subnet_list',
+    @test.create_stubs({api.neutron: ('subnet_list',
                                       'network_delete')})
     def test_delete_network_no_subnet(self):
         network = self.networks.first()
-        api.neutron.network_list(IsA(http.HttpRequest),
-                                 tenant_id=network.tenant_id,
-                                 shared=False)\
-            .AndReturn([network])
-        api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True)\
-            .AndReturn([])
-        api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network.id)\
+        self._stub_network_page([self.api_networks.first()])
+        api.neutron.subnet_list(IsA(http.HttpRequest),
+                                network_id=[network.id],
+                                fields=['id', 'network_id'])\
             .AndReturn([])
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)
 
@@ -625,20 +693,16 @@ class NetworkTests(test.TestCase):
 
         self.assertRedirectsNoFollow(res, INDEX_URL)
 
-    @test.create_stubs({api.neutron: ('network_list',
-                                      'subnet_list',
+    @test.create_stubs({api.neutron: ('subnet_list',
                                       'network_delete',
                                       'subnet_delete')})
     def test_delete_network_with_subnet(self):
         network = self.networks.first()
         subnet = self.subnets.first()
-        api.neutron.network_list(IsA(http.HttpRequest),
-                                 tenant_id=network.tenant_id,
-                                 shared=False)\
-            .AndReturn([network])
-        api.neutron.network_list(IsA(http.HttpRequest), shared=True)\
-            .AndReturn([])
-        api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network.id)\
+        self._stub_network_page([self.api_networks.first()])
+        api.neutron.subnet_list(IsA(http.HttpRequest),
+                                network_id=[network.id],
+                                fields=['id', 'network_id'])\
             .AndReturn([subnet])
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet.id)
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)
@@ -650,21 +714,16 @@ class NetworkTests(test.TestCase):
 
         self.assertRedirectsNoFollow(res, INDEX_URL)
 
-    @test.create_stubs({api.neutron: ('network_list',
-                                      'subnet_list',
+    @test.create_stubs({api.neutron: ('subnet_list',
                                       'network_delete',
                                       'subnet_delete')})
     def test_delete_network_exception(self):
         network = self.networks.first()
         subnet = self.subnets.first()
-        api.neutron.network_list(IsA(http.HttpRequest),
-                                 tenant_id=network.tenant_id,
-                                 shared=False)\
-            .AndReturn([network])
-        api.neutron.network_list(IsA(http.HttpRequest),
-                                 shared=True)\
-            .AndReturn([])
-        api.neutron.subnet_list(IsA(http.HttpRequest), network_id=network.id)\
+        self._stub_network_page([self.api_networks.first()])
+        api.neutron.subnet_list(IsA(http.HttpRequest),
+                                network_id=[network.id],
+                                fields=['id', 'network_id'])\
             .AndReturn([subnet])
         api.neutron.subnet_delete(IsA(http.HttpRequest), subnet.id)
         api.neutron.network_delete(IsA(http.HttpRequest), network.id)\
@@ -677,6 +736,40 @@ class NetworkTests(test.TestCase):
 
         self.assertRedirectsNoFollow(res, INDEX_URL)
 
+    @test.create_stubs({api.neutron: ('subnet_list',
+                                      'network_delete')})
+    def test_delete_networks_not_found(self):
+        network = self.networks.first()
+        self._stub_network_page([self.api_networks.first()])
+        api.neutron.subnet_list(IsA(http.HttpRequest),
+                                network_id=[network.id],
+                                fields=['id', 'network_id'])\
+            .AndReturn([])
+        api.neutron.network_delete(IsA(http.HttpRequest), network.id)
+
+        self.mox.ReplayAll()
+
+        # the networks no longer listed are reported, the others deleted
+        form_data = {'action': 'networking__delete',
+                     'object_ids': [network.id, 'gone']}
+        res = self.client.post(INDEX_URL, form_data)
+
+        self.assertRedirectsNoFollow(res, INDEX_URL)
+        self.assertMessageCount(success=1, error=1)
+
+    def test_delete_network_shared(self):
+        network = dict(self.api_networks.first(), shared=True)
+        self._stub_network_page([], [network])
+
+        self.mox.ReplayAll()
+
+        # nothing is listed nor deleted for a network not allowed
+        form_data = {'action': 'networking__delete__%s' % network['id']}
+        res = self.client.post(INDEX_URL, form_data)
+
+        self.assertRedirectsNoFollow(res, INDEX_URL)
+        self.assertMessageCount(success=0, error=1)
+
 
 class NetworkSubnetTests(test.TestCase):
 
@@ -1482,3 +1575,209 @@ class NetworkPortTests(test.TestCase):
         redir_url = reverse('horizon:project:networking:detail',
                             args=[port.network_id])
         self.assertRedirectsNoFollow(res, redir_url)
+
+
+def policy_rule(rule_uuid, port):
+    ports = [{'start_port': port, 'end_port': port}]
+    return {'rule_uuid': rule_uuid,
+            'simple_action': 'pass',
+            'direction': '<>',
+            'protocol': 'tcp',
+            'src_addresses': [{'virtual_network': 'any'}],
+            'dst_addresses': [{'virtual_network': 'any'}],
+            'src_ports': [{'start_port': -1, 'end_port': -1}],
+            'dst_ports': ports,
+            'action_list': None}
+
+
+class NetworkPolicyTests(test.TestCase):
+
+    def _rules(self):
+        return [policy_rule('rule-1', 22),
+                policy_rule('rule-2', 80),
+                policy_rule('rule-3', 443)]
+
+    def _policy(self, rules):
+        return contrail_quantum.ExtensionsContrailPolicy(
+            {'id': POLICY_ID,
+             'name': 'policy-1',
+             'fq_name': ['default-domain', 'demo', 'policy-1'],
+             'tenant_id': self.tenant.id,
+             'entries': {'policy_rule': rules}})
+
+    def _saved(self, rules):
+        # the rules as written back by the rule operations
+        return {'policy_rule': [dict(rule,
+                                     rule_sequence={'major': -1,
+                                                    'minor': -1})
+                                for rule in rules]}
+
+    def test_policy_rule_key(self):
+        rule = policy_rule('rule-1', 22)
+        self.assertEqual('rule-1', contrail_quantum.policy_rule_key(rule))
+
+        rule.pop('rule_uuid')
+        key = contrail_quantum.policy_rule_key(rule)
+        # the display position is not part of the rule
+        rule['rule_sequence'] = 3
+        self.assertEqual(key, contrail_quantum.policy_rule_key(rule))
+        rule['dst_ports'] = [{'start_port': 23, 'end_port': 23}]
+        self.assertNotEqual(key, contrail_quantum.policy_rule_key(rule))
+
+    def test_policy_entries_hash(self):
+        rules = self._rules()
+        entries_hash = contrail_quantum.policy_entries_hash(rules)
+
+        self.assertEqual(entries_hash, self._policy(rules).entries_hash)
+        self.assertNotEqual(entries_hash,
+                            contrail_quantum.policy_entries_hash(
+                                list(reversed(self._rules()))))
+        self.assertNotEqual(entries_hash,
+                            contrail_quantum.policy_entries_hash(
+                                self._rules()[:2]))
+
+    @test.create_stubs({contrail_quantum: ('policy_show', 'policy_modify')})
+    def test_policy_rule_insert(self):
+        rules = self._rules()
+        rule = policy_rule('rule-4', 8080)
+        contrail_quantum.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(self._policy(self._rules()))
+        contrail_quantum.policy_modify(
+            IsA(http.HttpRequest), POLICY_ID,
+            entries=self._saved([rules[0], rule, rules[1], rules[2]])) \
+            .AndReturn(self._policy(self._rules()))
+        self.mox.ReplayAll()
+
+        contrail_quantum.policy_rule_insert(
+            self.request, POLICY_ID, rule, position=1,
+            expected_hash=contrail_quantum.policy_entries_hash(rules))
+
+    @test.create_stubs({contrail_quantum: ('policy_show',)})
+    def test_policy_rule_insert_conflict(self):
+        contrail_quantum.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(self._policy(self._rules()))
+        # the rules are not written back
+        self.mox.ReplayAll()
+
+        expected_hash = contrail_quantum.policy_entries_hash(
+            self._rules()[:2])
+        self.assertRaises(neutron_exc.Conflict,
+                          contrail_quantum.policy_rule_insert,
+                          self.request, POLICY_ID,
+                          policy_rule('rule-4', 8080),
+                          expected_hash=expected_hash)
+
+    @test.create_stubs({contrail_quantum: ('policy_show', 'policy_modify')})
+    def test_policy_rule_delete(self):
+        rules = self._rules()
+        contrail_quantum.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(self._policy(self._rules()))
+        contrail_quantum.policy_modify(IsA(http.HttpRequest), POLICY_ID,
+                                       entries=self._saved([rules[1]])) \
+            .AndReturn(self._policy([rules[1]]))
+        self.mox.ReplayAll()
+
+        contrail_quantum.policy_rule_delete(
+            self.request, POLICY_ID, ['rule-1', 'rule-3'],
+            expected_hash=contrail_quantum.policy_entries_hash(rules))
+
+    @test.create_stubs({contrail_quantum: ('policy_show',)})
+    def test_policy_rule_delete_not_found(self):
+        contrail_quantum.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(self._policy(self._rules()))
+        self.mox.ReplayAll()
+
+        self.assertRaises(neutron_exc.NotFound,
+                          contrail_quantum.policy_rule_delete,
+                          self.request, POLICY_ID, ['rule-1', 'rule-4'])
+
+    @test.create_stubs({contrail_quantum: ('policy_show', 'policy_modify')})
+    def test_policy_rule_move(self):
+        rules = self._rules()
+        contrail_quantum.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(self._policy(self._rules()))
+        contrail_quantum.policy_modify(
+            IsA(http.HttpRequest), POLICY_ID,
+            entries=self._saved([rules[1], rules[2], rules[0]])) \
+            .AndReturn(self._policy(self._rules()))
+        self.mox.ReplayAll()
+
+        contrail_quantum.policy_rule_move(
+            self.request, POLICY_ID, 'rule-1', 2,
+            expected_hash=contrail_quantum.policy_entries_hash(rules))
+
+    @test.create_stubs({policy_views: ('policy_show',)})
+    def test_rules_table_entries_hash(self):
+        policy = self._policy(self._rules())
+        policy_views.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .MultipleTimes().AndReturn(policy)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:networking:policy:detail',
+                      args=[POLICY_ID])
+        res = self.client.get(url)
+
+        # the actions are posted with the version of the rules shown
+        self.assertContains(res, 'entries_hash=%s' % policy.entries_hash)
+
+    @test.create_stubs({policy_views: ('policy_show',),
+                        policy_tables: ('policy_rule_delete',)})
+    def test_delete_rules(self):
+        policy = self._policy(self._rules())
+        policy_views.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(policy)
+        # the selected rules are deleted with a single update
+        policy_tables.policy_rule_delete(
+            IsA(http.HttpRequest), POLICY_ID, ['rule-1', 'rule-3'],
+            expected_hash=policy.entries_hash).AndReturn(policy)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:networking:policy:detail',
+                      args=[POLICY_ID])
+        res = self.client.post(
+            '%s?entries_hash=%s' % (url, policy.entries_hash),
+            {'action': 'rules__delete',
+             'object_ids': ['rule-1', 'rule-3']})
+
+        self.assertRedirectsNoFollow(res, url)
+        self.assertMessageCount(success=1)
+
+    @test.create_stubs({policy_views: ('policy_show',),
+                        policy_tables: ('policy_rule_delete',)})
+    def test_delete_rules_conflict(self):
+        policy = self._policy(self._rules())
+        policy_views.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(policy)
+        policy_tables.policy_rule_delete(
+            IsA(http.HttpRequest), POLICY_ID, ['rule-2'],
+            expected_hash='stale').AndRaise(neutron_exc.Conflict())
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:networking:policy:detail',
+                      args=[POLICY_ID])
+        res = self.client.post('%s?entries_hash=stale' % url,
+                               {'action': 'rules__delete',
+                                'object_ids': ['rule-2']})
+
+        self.assertRedirectsNoFollow(res, url)
+        self.assertMessageCount(error=1)
+
+    @test.create_stubs({policy_views: ('policy_show',),
+                        policy_tables: ('policy_rule_move',)})
+    def test_move_rule_down(self):
+        policy = self._policy(self._rules())
+        policy_views.policy_show(IsA(http.HttpRequest), POLICY_ID) \
+            .AndReturn(policy)
+        policy_tables.policy_rule_move(
+            IsA(http.HttpRequest), POLICY_ID, 'rule-1', 1,
+            expected_hash=policy.entries_hash).AndReturn(policy)
+        self.mox.ReplayAll()
+
+        url = reverse('horizon:project:networking:policy:detail',
+                      args=[POLICY_ID])
+        res = self.client.post(
+            '%s?entries_hash=%s' % (url, policy.entries_hash),
+            {'action': 'rules__move_down__rule-1'})
+
+        self.assertRedirectsNoFollow(res, url)
+        self.assertMessageCount(success=1)
@@ -27,8 +27,10 @@ from horizon import forms
 from horizon import tables
 from horizon import workflows
 from horizon import tabs
+from horizon.utils import memoized
 
 from openstack_dashboard import api
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
 
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking \
     import forms as project_forms
@@ -93,11 +95,21 @@ class DetailView(tables.MultiTableView):
     template_name = 'project/networking/detail.html'
     failure_url = reverse_lazy('horizon:project:networking:index')
 
+    @memoized.memoized_method
+    def _prefetch(self):
+        # the network, its subnets and its ports are fetched at once
+        network_id = self.kwargs['network_id']
+        return contrail_quantum.Prefetch(
+            network=lambda: api.neutron.network_get(self.request,
+                                                    network_id),
+            subnets=lambda: api.neutron.subnet_list(self.request,
+                                                    network_id=network_id),
+            ports=lambda: api.neutron.port_list(self.request,
+                                                network_id=network_id))
+
     def get_subnets_data(self):
         try:
-            network = self._get_data()
-            subnets = api.neutron.subnet_list(self.request,
-                                              network_id=network.id)
+            subnets = self._prefetch().get('subnets')
         except Exception:
             subnets = []
             msg = _('Subnet list can not be retrieved.')
@@ -108,8 +120,7 @@ class DetailView(tables.MultiTableView):
 
     def get_ports_data(self):
         try:
-            network_id = self.kwargs['network_id']
-            ports = api.neutron.port_list(self.request, network_id=network_id)
+            ports = self._prefetch().get('ports')
         except Exception:
             ports = []
             msg = _('Port list can not be retrieved.')
@@ -122,7 +133,7 @@ class DetailView(tables.MultiTableView):
         if not hasattr(self, "_network"):
             try:
                 network_id = self.kwargs['network_id']
-                network = api.neutron.network_get(self.request, network_id)
+                network = self._prefetch().get('network')
                 network.set_id_as_name_if_empty(length=0)
             except Exception:
                 msg = _('Unable to retrieve details for network "%s".') \
@@ -12,10 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import copy
+
 from django.core.urlresolvers import reverse
 from django import http
 import django.test
 
+import mock
 from mox3.mox import IsA  # noqa
 from oslo_serialization import jsonutils
 
@@ -25,6 +29,9 @@ from openstack_dashboard.dashboards.project.network_topology.views import \
 from openstack_dashboard.test import helpers as test
 from openstack_dashboard.usage import quotas
 
+from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.\
+    networking_topology import views
+
 JSON_URL = reverse('horizon:project:network_topology:json')
 INDEX_URL = reverse('horizon:project:network_topology:index')
 
@@ -78,7 +85,8 @@ class NetworkTopologyTests(test.TestCase):
 
         res = self.client.get(JSON_URL)
         self.assertEqual('text/json', res['Content-Type'])
-        data = jsonutils.loads(res.content)
+        self.assertTrue(res.streaming)
+        data = jsonutils.loads(b''.join(res.streaming_content))
 
         # servers
         # result_server_urls = [(server['id'], server['url'])
@@ -89,9 +97,13 @@ class NetworkTopologyTests(test.TestCase):
              'status': self.trans.instance[server.status],
              'original_status': server.status,
              'task': None,
+             'console': '?tab=instance_details__console',
              'url': '/project/instances/%s/' % server.id}
             for server in self.servers.list()]
         self.assertEqual(expect_server_urls, data['servers'])
+        self.assertEqual(set(['servers', 'networks', 'ports', 'routers']),
+                         set(data['timings']))
+        self.assertTrue(data['version'])
 
         # routers
         # result_router_urls = [(router['id'], router['url'])
@@ -162,6 +174,171 @@ class NetworkTopologyTests(test.TestCase):
         self.assertEqual(expect_port_urls, data['ports'])
 
 
+class TopologyJSONViewTests(test.TestCase):
+    """JSONView with its collectors replaced by a fixed topology."""
+
+    def setUp(self):
+        super(TopologyJSONViewTests, self).setUp()
+        self.factory = django.test.RequestFactory()
+        self.topology = {
+            'servers': [{'id': 'server-1', 'name': 'vm1'}],
+            'networks': [{'id': 'net-1', 'name': 'net1'},
+                         {'id': 'net-2', 'name': 'net2'}],
+            'ports': [{'id': 'port-1', 'network_id': 'net-1',
+                       'device_id': 'server-1'}],
+            'routers': [{'id': 'router-1', 'name': 'router1',
+                         'external_gateway_info': None}]}
+        for kind in views.JSONView.kinds:
+            patcher = mock.patch.object(
+                views.JSONView, '_get_%s' % kind,
+                side_effect=lambda request, kind=kind: copy.deepcopy(
+                    self.topology[kind]))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(views.JSONView, 'snapshots',
+                                    views.TopologySnapshots())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, query=None, **headers):
+        request = self.factory.get('/project/networking_topology/json',
+                                   query or {}, **headers)
+        request.user = mock.Mock(tenant_id=self.tenant.id)
+        return views.JSONView.as_view()(request)
+
+    def _content(self, response):
+        self.assertTrue(response.streaming)
+        return jsonutils.loads(b''.join(response.streaming_content),
+                               object_pairs_hook=collections.OrderedDict)
+
+    @django.test.utils.override_settings(TOPOLOGY_STREAM_CHUNK_SIZE=1)
+    def test_stream_chunks(self):
+        response = self._get()
+
+        self.assertFalse(response.has_header('ETag'))
+        chunks = list(response.streaming_content)
+        # a chunk per resource and for the end of each list, then the
+        # version, the timings and the closing brace
+        self.assertEqual(5 + 4 + 3, len(chunks))
+        data = jsonutils.loads(b''.join(chunks),
+                               object_pairs_hook=collections.OrderedDict)
+        self.assertEqual(['version', 'timings'], list(data)[-2:])
+        self.assertEqual(self.topology['networks'], data['networks'])
+        self.assertEqual(self.topology['ports'], data['ports'])
+
+    def test_conditional_changed(self):
+        first = self._content(self._get())
+        self.topology['networks'][1]['name'] = 'renamed'
+
+        response = self._get(HTTP_IF_NONE_MATCH='"%s"' % first['version'])
+
+        self.assertEqual(200, response.status_code)
+        data = self._content(response)
+        self.assertEqual('"%s"' % data['version'], response['ETag'])
+        self.assertNotEqual(first['version'], data['version'])
+        self.assertEqual(self.topology['networks'], data['networks'])
+        self.assertEqual(set(views.JSONView.kinds), set(data['timings']))
+
+    @django.test.utils.override_settings(TOPOLOGY_STREAM_CHUNK_SIZE=1)
+    def test_conditional_chunks(self):
+        response = self._get(HTTP_IF_NONE_MATCH='"unknown"')
+
+        self.assertGreater(len(list(response.streaming_content)), 6)
+
+    def test_not_modified(self):
+        version = self._content(self._get())['version']
+
+        response = self._get(HTTP_IF_NONE_MATCH='"%s"' % version)
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual('"%s"' % version, response['ETag'])
+
+    def test_etag(self):
+        first = self._content(self._get())
+
+        response = self._get(HTTP_IF_NONE_MATCH='"other"')
+        data = self._content(response)
+
+        # the version only depends on the resources
+        self.assertEqual(first['version'], data['version'])
+        self.assertEqual('"%s"' % first['version'], response['ETag'])
+        view = views.JSONView()
+        self.assertEqual(view._snapshot(self.topology)[0], data['version'])
+
+    def test_since(self):
+        version = self._content(self._get())['version']
+        self.topology['servers'].append({'id': 'server-2', 'name': 'vm2'})
+        self.topology['networks'][0]['name'] = 'renamed'
+        del self.topology['ports'][0]
+
+        response = self._get({'since': version})
+
+        data = self._content(response)
+        self.assertEqual(version, data['since'])
+        self.assertEqual('"%s"' % data['version'], response['ETag'])
+        self.assertEqual({'servers': [{'id': 'server-2', 'name': 'vm2'}],
+                          'networks': [], 'ports': [], 'routers': []},
+                         data['added'])
+        self.assertEqual({'servers': [],
+                          'networks': [self.topology['networks'][0]],
+                          'ports': [], 'routers': []},
+                         data['changed'])
+        self.assertEqual({'servers': [], 'networks': [],
+                          'ports': ['port-1'], 'routers': []},
+                         data['removed'])
+        self.assertNotIn('networks', data)
+
+        # the new version is a base for the next delta
+        data = self._content(self._get({'since': data['version']}))
+        self.assertEqual(
+            {'servers': [], 'networks': [], 'ports': [], 'routers': []},
+            data['changed'])
+
+    def test_since_unknown(self):
+        # e.g. a version handed out by another process
+        response = self._get({'since': 'unknown'})
+
+        data = self._content(response)
+        self.assertNotIn('since', data)
+        self.assertNotIn('added', data)
+        self.assertEqual(self.topology['servers'], data['servers'])
+        self.assertEqual(self.topology['networks'], data['networks'])
+        self.assertEqual('"%s"' % data['version'], response['ETag'])
+
+    @django.test.utils.override_settings(TOPOLOGY_SNAPSHOT_CACHE_SIZE=2)
+    def test_since_evicted(self):
+        version = self._content(self._get())['version']
+        for name in ('vm2', 'vm3'):
+            self.topology['servers'][0]['name'] = name
+            self._content(self._get())
+
+        data = self._content(self._get({'since': version}))
+
+        self.assertNotIn('since', data)
+        self.assertEqual(self.topology['servers'], data['servers'])
+
+
+class TopologySnapshotsTests(test.TestCase):
+    @django.test.utils.override_settings(TOPOLOGY_SNAPSHOT_CACHE_SIZE=2)
+    def test_eviction(self):
+        snapshots = views.TopologySnapshots()
+        snapshots.add('tenant-1', 'v1', {'servers': {}})
+        snapshots.add('tenant-2', 'v1', {'networks': {}})
+        # adding a known version again makes it the most recent
+        snapshots.add('tenant-1', 'v1', {'servers': {}})
+        snapshots.add('tenant-1', 'v2', {'ports': {}})
+
+        self.assertEqual({'servers': {}}, snapshots.get('tenant-1', 'v1'))
+        self.assertIsNone(snapshots.get('tenant-2', 'v1'))
+        self.assertEqual({'ports': {}}, snapshots.get('tenant-1', 'v2'))
+
+    def test_per_tenant(self):
+        snapshots = views.TopologySnapshots()
+        snapshots.add('tenant-1', 'v1', {'servers': {}})
+
+        self.assertIsNone(snapshots.get('tenant-2', 'v1'))
+
+
 class NetworkTopologyCreateTests(test.TestCase):
 
     def _test_new_button_disabled_when_quota_exceeded(
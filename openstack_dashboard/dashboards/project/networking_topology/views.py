@@ -16,23 +16,30 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import hashlib
 import json
 import six
+import threading
+import time
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
-from django.http import HttpResponse  # noqa
+from django.http import HttpResponseNotModified  # noqa
+from django.http import StreamingHttpResponse  # noqa
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View  # noqa
 
-from horizon import exceptions
 from horizon.utils.lazy_encoder import LazyTranslationEncoder
 from horizon import views
 
 from openstack_dashboard import api
 from openstack_dashboard.usage import quotas
 
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+from contrail_openstack_dashboard.openstack_dashboard.api import utils as api_utils
+
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking_topology.instances \
     import tables as instances_tables
 from contrail_openstack_dashboard.openstack_dashboard.dashboards.project.networking_topology.networks \
@@ -218,8 +225,40 @@ class NetworkTopologyView(views.HorizonTemplateView):
         return context
 
 
+class TopologySnapshots(object):
+    """Recent versions of the topology of each tenant.
+
+    A snapshot maps each kind of resource to the content hash of every
+    resource by id, which is all that is needed to tell what changed
+    since that version. The number of snapshots kept is bounded by
+    TOPOLOGY_SNAPSHOT_CACHE_SIZE.
+
+    Snapshots are kept per process. A version handed out by another
+    process, or evicted since, is unknown here, and the request it comes
+    with gets the whole topology instead of a delta.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = collections.OrderedDict()
+
+    def add(self, tenant_id, version, hashes):
+        size = getattr(settings, 'TOPOLOGY_SNAPSHOT_CACHE_SIZE', 1000)
+        with self._lock:
+            self._snapshots.pop((tenant_id, version), None)
+            self._snapshots[(tenant_id, version)] = hashes
+            while len(self._snapshots) > size:
+                self._snapshots.popitem(last=False)
+
+    def get(self, tenant_id, version):
+        with self._lock:
+            return self._snapshots.get((tenant_id, version))
+
+
 class JSONView(View):
     trans = TranslationHelper()
+    kinds = ('servers', 'networks', 'ports', 'routers')
+    snapshots = TopologySnapshots()
 
     @property
     def is_router_enabled(self):
@@ -244,19 +283,23 @@ class JSONView(View):
     def _get_servers(self, request):
         # Get nova data
         try:
-            servers, more = api.nova.server_list(request)
+            with instrumentation.timed(request, 'nova', 'server_list'):
+                servers, more = api.nova.server_list(request)
         except Exception:
             servers = []
         data = []
+        # Looking up which console a server offers costs Nova round trips
+        # per server, so it is left to the console page. A configured
+        # console type is appended to the instance URL as is, lowercase,
+        # otherwise the link goes to the console tab of the instance.
         console_type = getattr(settings, 'CONSOLE_TYPE', 'AUTO')
-        # lowercase of the keys will be used at the end of the console URL.
+        if console_type == 'AUTO':
+            console = '?tab=instance_details__console'
+        elif console_type in i_console.CONSOLES:
+            console = console_type.lower()
+        else:
+            console = None
         for server in servers:
-            try:
-                console = i_console.get_console(
-                    request, console_type, server)[0].lower()
-            except exceptions.NotAvailable:
-                console = None
-
             server_data = {'name': server.name,
                            'status': self.trans.instance[server.status],
                            'original_status': server.status,
@@ -390,12 +433,181 @@ class JSONView(View):
                          'fixed_ips': []}
             ports.append(fake_port)
 
+    def _collect_as_completed(self, request):
+        """Run the data collectors concurrently.
+
+        Yields the name of each collector, the data it collected and the
+        time it took in milliseconds, in the order the collectors finish.
+        """
+        collectors = (('servers', self._get_servers),
+                      ('networks', self._get_networks),
+                      ('ports', self._get_ports),
+                      ('routers', self._get_routers))
+        # the api.neutron calls of the collectors share the client of the
+        # request, instrument it before they start
+        api_utils.neutronclient(request)
+
+        def timed(collector):
+            start = time.time()
+            result = collector(request)
+            return result, int((time.time() - start) * 1000)
+
+        for index, (result, elapsed) in api_utils.call_functions_as_completed(
+                *[(timed, (collector,)) for name, collector in collectors]):
+            yield collectors[index][0], result, elapsed
+
+    def _collect(self, request):
+        """Return the collected data and the time each collector took."""
+        data = {}
+        timings = {}
+        for name, result, elapsed in self._collect_as_completed(request):
+            data[name] = result
+            timings[name] = elapsed
+        return data, timings
+
+    def _collect_streaming(self, request):
+        """Yield the sections of the topology as the collectors finish.
+
+        The gateway ports are made up from the routers, so ports and
+        routers are yielded together once both are collected. The version
+        and the timings come last, when everything is known.
+        """
+        pending = {}
+        hashes = {}
+        timings = {}
+        for name, result, elapsed in self._collect_as_completed(request):
+            pending[name] = result
+            timings[name] = elapsed
+            if name in ('ports', 'routers'):
+                if 'ports' not in pending or 'routers' not in pending:
+                    continue
+                self._prepare_gateway_ports(pending['routers'],
+                                            pending['ports'])
+                ready = ('routers', 'ports')
+            else:
+                ready = (name,)
+            for kind in ready:
+                resources = pending.pop(kind)
+                hashes[kind] = self._hashes(resources)
+                yield kind, resources
+        version = self._hash(hashes)
+        self.snapshots.add(request.user.tenant_id, version, hashes)
+        yield 'version', version
+        yield 'timings', timings
+
+    def _encode(self, sections):
+        """Encode (key, value) pairs as a JSON object, in chunks.
+
+        Lists are encoded an item at a time and flushed every
+        TOPOLOGY_STREAM_CHUNK_SIZE characters, and every section is
+        flushed once complete, so neither the whole document nor a whole
+        list of resources is held as a string.
+        """
+        encoder = LazyTranslationEncoder(ensure_ascii=False)
+        chunk_size = getattr(settings, 'TOPOLOGY_STREAM_CHUNK_SIZE', 65536)
+        separator = '{'
+        for key, value in sections:
+            chunk = ['%s%s: ' % (separator, encoder.encode(key))]
+            separator = ', '
+            if not isinstance(value, list):
+                chunk.append(encoder.encode(value))
+                yield ''.join(chunk)
+                continue
+            chunk.append('[')
+            size = 0
+            for i, item in enumerate(value):
+                encoded = encoder.encode(item)
+                chunk.append(', %s' % encoded if i else encoded)
+                size += len(encoded)
+                if size >= chunk_size:
+                    yield ''.join(chunk)
+                    chunk = []
+                    size = 0
+            chunk.append(']')
+            yield ''.join(chunk)
+        yield '{}' if separator == '{' else '}'
+
+    def _hash(self, content):
+        return hashlib.sha1(json.dumps(
+            content, cls=LazyTranslationEncoder,
+            sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _hashes(self, resources):
+        return dict((resource['id'], self._hash(resource))
+                    for resource in resources)
+
+    def _snapshot(self, data):
+        """Return the version of the topology and its resource hashes."""
+        hashes = dict((kind, self._hashes(data[kind])) for kind in self.kinds)
+        return self._hash(hashes), hashes
+
+    def _delta(self, data, hashes, since):
+        """Return the resources added, changed and removed since a version.
+
+        Returns None if that version is no longer known.
+        """
+        previous = self.snapshots.get(self.request.user.tenant_id, since)
+        if previous is None:
+            return None
+        delta = {'added': {}, 'changed': {}, 'removed': {}}
+        for kind in self.kinds:
+            old = previous.get(kind, {})
+            new = hashes[kind]
+            delta['added'][kind] = [resource for resource in data[kind]
+                                    if resource['id'] not in old]
+            delta['changed'][kind] = [
+                resource for resource in data[kind]
+                if resource['id'] in old and
+                old[resource['id']] != new[resource['id']]]
+            delta['removed'][kind] = [resource_id for resource_id in old
+                                      if resource_id not in new]
+        return delta
+
     def get(self, request, *args, **kwargs):
-        data = {'servers': self._get_servers(request),
-                'networks': self._get_networks(request),
-                'ports': self._get_ports(request),
-                'routers': self._get_routers(request)}
+        """Return the topology of the tenant.
+
+        A plain request is answered while the data is being collected:
+        each kind of resource is streamed as soon as its collector
+        finishes, followed by the version of the topology.
+
+        Conditional requests need the whole topology before they can be
+        answered, since the version is only known once every collector
+        has finished. With If-None-Match, an unchanged topology is
+        answered with 304 Not Modified; the version is also sent as the
+        ETag. With ?since=<version>, where version comes from an earlier
+        response, only the resources added, changed or removed since then
+        are returned, provided that version is still known; otherwise the
+        whole topology is. The body of a conditional response is encoded
+        in chunks as well, but its first byte only goes out once all the
+        data is collected.
+
+        The topology page polls with If-None-Match, so only its first
+        load is streamed as the data comes in.
+        """
+        since = request.GET.get('since')
+        if not since and 'HTTP_IF_NONE_MATCH' not in request.META:
+            return StreamingHttpResponse(
+                self._encode(self._collect_streaming(request)),
+                content_type='text/json')
+
+        data, timings = self._collect(request)
         self._prepare_gateway_ports(data['routers'], data['ports'])
-        json_string = json.dumps(data, cls=LazyTranslationEncoder,
-                                 ensure_ascii=False)
-        return HttpResponse(json_string, content_type='text/json')
+
+        version, hashes = self._snapshot(data)
+        self.snapshots.add(request.user.tenant_id, version, hashes)
+        etag = '"%s"' % version
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        delta = self._delta(data, hashes, since) if since else None
+        if delta is not None:
+            data = delta
+            data['since'] = since
+        data['version'] = version
+        data['timings'] = timings
+        response = StreamingHttpResponse(self._encode(data.items()),
+                                         content_type='text/json')
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,106 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import logging
+
+from django.conf import settings
+
+from contrail_openstack_dashboard.openstack_dashboard.api import contrail_quantum
+from contrail_openstack_dashboard.openstack_dashboard.api import instrumentation
+
+LOG = logging.getLogger(__name__)
+
+# The API call budgets of the views known to be on the hot path, as
+# counted with the benchmarks. API_CALL_BUDGETS entries take precedence.
+DEFAULT_CALL_BUDGETS = {
+    # server_list, and the network, subnet, router and port lists; the
+    # calls made while streaming the body are not counted.
+    'horizon:project:networking_topology:json': {'nova': 1, 'neutron': 8},
+    # the tenant and shared networks with their subnets, policies and ipams
+    'horizon:project:networking:index': {'neutron': 6},
+    'horizon:project:networking:policy:detail': {'neutron': 2},
+    # the router, its ports, the feature checks and the networks the
+    # router rules refer to
+    'horizon:project:l3routers:detail': {'neutron': 10},
+    # a page of load balancers, their listeners, pools and monitors, and
+    # the members of the pools of a default page of 20 load balancers
+    'horizon:project:loadbalancersv2:index': {'neutron': 24},
+}
+
+
+class APIMetricsMiddleware(object):
+    """Report the API calls made while serving a request.
+
+    The calls recorded in request.api_calls are summed up per service into
+    a Server-Timing response header and a log line. Calls made after the
+    response is returned, like in the body of a streaming response, are
+    not included. When the policy and IPAM summary cache is enabled, its
+    counters for the process are logged along.
+
+    Views are checked against a call budget, a dict of {service: maximum
+    number of calls} where the key 'total' bounds all services together.
+    DEFAULT_CALL_BUDGETS covers the views on the hot path, the
+    API_CALL_BUDGETS setting adds or replaces budgets by view name (e.g.
+    'horizon:project:networking:index'), and a budget of None disables
+    the check. An exceeded budget is logged, or raises CallBudgetExceeded
+    when API_CALL_BUDGET_STRICT is set, which makes the tests of the view
+    fail.
+
+    Enable it by adding
+    'contrail_openstack_dashboard.openstack_dashboard.middleware.'
+    'APIMetricsMiddleware' to MIDDLEWARE_CLASSES.
+    """
+
+    def process_response(self, request, response):
+        usage = getattr(request, 'neutronclient_usage', None)
+        if usage:
+            response['X-Neutron-Client-Usage'] = (
+                'created=%(created)d, reused=%(reused)d' % usage)
+
+        calls = getattr(request, 'api_calls', None)
+        if not calls:
+            return response
+        summary = instrumentation.summarize(calls)
+        response['Server-Timing'] = ', '.join(
+            '%s;dur=%.1f;desc="%d calls, %d bytes"' % (
+                service, values['elapsed'] * 1000, values['count'],
+                values['size'])
+            for service, values in summary.items())
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = match.view_name if match else None
+        entry = {
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'services': dict(
+                (service, {'count': values['count'],
+                           'ms': round(values['elapsed'] * 1000, 1),
+                           'bytes': values['size']})
+                for service, values in summary.items())}
+        if contrail_quantum.summary_cache.ttl:
+            # counters of the process, not of the request
+            entry['summary_cache'] = contrail_quantum.summary_cache_stats()
+        LOG.info('API calls: %s', json.dumps(entry))
+
+        budgets = dict(DEFAULT_CALL_BUDGETS,
+                       **getattr(settings, 'API_CALL_BUDGETS', {}))
+        budget = budgets.get(view_name)
+        if budget:
+            try:
+                instrumentation.check_budget(view_name, summary, budget)
+            except instrumentation.CallBudgetExceeded as e:
+                if getattr(settings, 'API_CALL_BUDGET_STRICT', False):
+                    raise
+                LOG.warning(e)
+        return response
@@ -25,6 +25,7 @@ contrail.network_topology = {
   network_index: {},
   balloon_id:null,
   reload_duration: 300000,
+  version: null,
   draw_mode:'normal',
   network_height : 0,
   previous_message : null,
@@ -122,15 +123,30 @@ contrail.network_topology = {
     if($('#contrailnetworktopology').length === 0) {
       return;
     }
-    $.getJSON($('#contrailnetworktopology').data('networktopology') + '?' + $.now(),
-      function(data) {
-        self.model = data;
-        self.data_convert();
+    // The version of the topology shown is sent back as If-None-Match, so
+    // an unchanged topology comes back as an empty 304 and the graph is
+    // neither parsed nor redrawn. The first load is streamed without an
+    // ETag, which is why the version is taken from the body.
+    var headers = {};
+    if (self.version) {
+      headers['If-None-Match'] = '"' + self.version + '"';
+    }
+    $.ajax({
+      url: $('#contrailnetworktopology').data('networktopology'),
+      dataType: 'json',
+      cache: false,
+      headers: headers,
+      success: function(data, status) {
+        if (status !== 'notmodified' && data) {
+          self.version = data.version;
+          self.model = data;
+          self.data_convert();
+        }
         setTimeout(function(){
           self.load_network_info();
         }, self.reload_duration);
       }
-    );
+    });
   },
   select_draw_mode:function() {
     var self = this;
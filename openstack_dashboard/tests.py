@@ -0,0 +1,124 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import django.test
+import mock
+
+from django import http
+
+from openstack_dashboard.test import helpers as test
+
+from contrail_openstack_dashboard.openstack_dashboard.api import \
+    instrumentation
+from contrail_openstack_dashboard.openstack_dashboard import middleware
+
+INDEX_VIEW = 'horizon:project:networking:index'
+
+
+class APIMetricsMiddlewareTests(test.TestCase):
+    def setUp(self):
+        super(APIMetricsMiddlewareTests, self).setUp()
+        self.middleware = middleware.APIMetricsMiddleware()
+        self.request = http.HttpRequest()
+        self.request.path = '/project/networks/'
+        self.request.resolver_match = mock.Mock(view_name=INDEX_VIEW)
+        patcher = mock.patch.object(middleware, 'LOG')
+        self.log = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _record(self, service, count, elapsed=0.01, size=100):
+        for i in range(count):
+            instrumentation.record(self.request, service, 'call %d' % i,
+                                   elapsed, size)
+
+    def test_headers(self):
+        self.request.neutronclient_usage = {'created': 1, 'reused': 2}
+        self._record('neutron', 2)
+        self._record('nova', 1, elapsed=0.5, size=None)
+
+        response = self.middleware.process_response(self.request,
+                                                    http.HttpResponse())
+
+        self.assertEqual('created=1, reused=2',
+                         response['X-Neutron-Client-Usage'])
+        self.assertEqual('neutron;dur=20.0;desc="2 calls, 200 bytes", '
+                         'nova;dur=500.0;desc="1 calls, 0 bytes"',
+                         response['Server-Timing'])
+
+    def test_log(self):
+        self._record('neutron', 2)
+
+        self.middleware.process_response(self.request,
+                                         http.HttpResponse(status=201))
+
+        self.log.info.assert_called_once_with('API calls: %s', mock.ANY)
+        self.assertEqual(
+            {'path': '/project/networks/',
+             'view': INDEX_VIEW,
+             'status': 201,
+             'services': {'neutron': {'count': 2, 'ms': 20.0,
+                                      'bytes': 200}}},
+            json.loads(self.log.info.call_args[0][1]))
+        self.assertFalse(self.log.warning.called)
+
+    @django.test.utils.override_settings(CONTRAIL_SUMMARY_CACHE_TTL=60)
+    @mock.patch.object(middleware.contrail_quantum, 'summary_cache_stats')
+    def test_log_summary_cache(self, summary_cache_stats):
+        stats = {'hits': 3, 'misses': 1, 'invalidations': 0, 'entries': 1}
+        summary_cache_stats.return_value = stats
+        self._record('neutron', 1)
+
+        self.middleware.process_response(self.request, http.HttpResponse())
+
+        self.assertEqual(
+            stats, json.loads(self.log.info.call_args[0][1])['summary_cache'])
+
+    def test_no_calls(self):
+        response = self.middleware.process_response(self.request,
+                                                    http.HttpResponse())
+
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertFalse(response.has_header('X-Neutron-Client-Usage'))
+        self.assertFalse(self.log.info.called)
+
+    @django.test.utils.override_settings(API_CALL_BUDGET_STRICT=False)
+    def test_default_budget_exceeded(self):
+        self._record('neutron', 7)
+
+        response = self.middleware.process_response(self.request,
+                                                    http.HttpResponse())
+
+        self.assertTrue(response.has_header('Server-Timing'))
+        self.log.warning.assert_called_once_with(mock.ANY)
+        self.assertIn('neutron 7/6', str(self.log.warning.call_args[0][0]))
+
+    @django.test.utils.override_settings(
+        API_CALL_BUDGETS={INDEX_VIEW: {'neutron': 1}},
+        API_CALL_BUDGET_STRICT=True)
+    def test_budget_exceeded_strict(self):
+        self._record('neutron', 2)
+
+        self.assertRaises(instrumentation.CallBudgetExceeded,
+                          self.middleware.process_response,
+                          self.request, http.HttpResponse())
+
+    @django.test.utils.override_settings(
+        API_CALL_BUDGETS={INDEX_VIEW: None},
+        API_CALL_BUDGET_STRICT=True)
+    def test_budget_disabled(self):
+        self._record('neutron', 20)
+
+        self.middleware.process_response(self.request, http.HttpResponse())
+
+        self.assertFalse(self.log.warning.called)